@@ -1,22 +1,25 @@
 """Maintenance routes."""
 from __future__ import annotations
 
-import csv
-import io
+from datetime import date
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Header, Query
 from sqlalchemy.orm import Session
 
 from erp.backend.core.auth import require_any
 from erp.backend.core.database import get_db_session
+from erp.backend.core.compression import negotiate_encoding
+from erp.backend.core.export import ExportFormat, export_response
+from erp.backend.core.pagination import build_cursor_page
+from erp.backend.models.maintenance import WorkOrderStatus, WorkOrderType
 from erp.backend.models.user import User, UserRole
 from erp.backend.schemas.maintenance import (
     EquipmentCreate,
     EquipmentRead,
     GenerateDueResponse,
     MaintenanceHistoryRead,
+    PMGenerationRunRead,
     PMPlanCreate,
     PMPlanRead,
     PMTemplateCreate,
@@ -96,16 +99,37 @@ def generate_due(
     service: MaintenanceService = Depends(get_service),
     current_user: User = Depends(require_any(UserRole.ADMIN, UserRole.ROOT)),
 ) -> GenerateDueResponse:
-    return service.generate_due_work_orders()
+    return service.generate_due_now()
 
 
-@router.get("/work-orders", response_model=list[WorkOrderRead])
+@router.get("/pm/runs", response_model=list[PMGenerationRunRead])
+def list_generation_runs(
+    limit: int = Query(default=20, ge=1, le=200),
+    service: MaintenanceService = Depends(get_service),
+    _current_user: User = Depends(require_any(UserRole.ADMIN, UserRole.ROOT)),
+) -> list[PMGenerationRunRead]:
+    return [PMGenerationRunRead.model_validate(run) for run in service.list_pm_generation_runs(limit)]
+
+
+@router.get("/work-orders", response_model=dict)
 def list_work_orders(
+    status: Optional[list[WorkOrderStatus]] = Query(default=None, description="Defaults to Open and InProgress"),
+    equipment_id: Optional[int] = Query(default=None),
+    type: Optional[WorkOrderType] = Query(default=None),
+    due_from: Optional[date] = Query(default=None),
+    due_to: Optional[date] = Query(default=None),
+    cursor: Optional[str] = Query(default=None, description="Keyset cursor from a previous page"),
+    page_size: int = Query(default=50, ge=1, le=200),
     service: MaintenanceService = Depends(get_service),
     _current_user: User = Depends(require_any(UserRole.USER, UserRole.ADMIN, UserRole.ROOT)),
-) -> list[WorkOrderRead]:
-    work_orders = service.list_work_orders()
-    return [WorkOrderRead.model_validate(wo) for wo in work_orders]
+) -> dict:
+    work_orders, next_cursor, prev_cursor = service.list_work_orders(
+        status, equipment_id, type, due_from, due_to, cursor, page_size
+    )
+    page = build_cursor_page(
+        [WorkOrderRead.model_validate(wo) for wo in work_orders], page_size, next_cursor, prev_cursor
+    )
+    return page.model_dump()
 
 
 @router.post("/work-orders", response_model=WorkOrderRead)
@@ -132,25 +156,13 @@ def update_work_order(
 @router.get("/history", response_model=list[MaintenanceHistoryRead])
 def history(
     export: bool = Query(default=False),
+    format: ExportFormat = Query(default=ExportFormat.CSV),
+    accept_encoding: Optional[str] = Header(default=None),
     service: MaintenanceService = Depends(get_service),
     _current_user: User = Depends(require_any(UserRole.USER, UserRole.ADMIN, UserRole.ROOT)),
 ):
-    records = service.list_history()
     if export:
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["work_order_id", "equipment_id", "summary", "downtime_min", "recorded_at"])
-        for record in records:
-            writer.writerow([
-                record.work_order_id,
-                record.equipment_id,
-                record.summary,
-                str(record.downtime_min),
-                record.recorded_at.isoformat(),
-            ])
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={"Content-Disposition": "attachment; filename=maintenance_history.csv"},
-        )
-    return [MaintenanceHistoryRead.model_validate(record) for record in records]
+        encoding = negotiate_encoding(accept_encoding)
+        chunks = service.export_history(format, content_encoding=encoding)
+        return export_response(chunks, format, "maintenance_history", encoding)
+    return [MaintenanceHistoryRead.model_validate(record) for record in service.list_history()]
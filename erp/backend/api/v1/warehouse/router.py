@@ -2,17 +2,44 @@
 from __future__ import annotations
 
 import json
-from typing import Optional
+from typing import Optional, Union
 
-from fastapi import APIRouter, Depends, File, Query, UploadFile
+from fastapi import APIRouter, Depends, File, Header, Query, Request, Response, UploadFile, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from erp.backend.core.auth import require_any, require_role
+from erp.backend.core.conditional import etag_matches
 from erp.backend.core.database import get_db_session
-from erp.backend.core.pagination import build_page, paginate
+from erp.backend.core.compression import negotiate_encoding
+from erp.backend.core.export import ExportFormat, export_response
+from erp.backend.core.pagination import build_cursor_page, build_page, paginate
 from erp.backend.models.user import User, UserRole
-from erp.backend.schemas.warehouse import AuditLogRead, ImportResult, PartCreate, PartRead, PartUpdate
+from erp.backend.models.warehouse import ImportMode
+from erp.backend.schemas.warehouse import (
+    AuditLogRead,
+    CacheStats,
+    CategoryRead,
+    ImportJobRead,
+    ImportResult,
+    InventoryValuation,
+    ImportValidationReport,
+    LocationRead,
+    PartBulkUpdate,
+    PartBulkUpdateResult,
+    PartChanges,
+    PartCreate,
+    PartExportColumns,
+    PartFacets,
+    PartRead,
+    PartSuggestion,
+    PartUpdate,
+    StockAdjustmentRequest,
+    StockAdjustmentResult,
+    ValuationReconcileResult,
+    VendorRead,
+)
+from erp.backend.services.import_jobs import import_job_runner
 from erp.backend.services.warehouse import WarehouseService
 
 router = APIRouter(prefix="/api/v1/warehouse", tags=["Warehouse"])
@@ -24,32 +51,173 @@ def get_service(session: Session = Depends(get_db_session)) -> WarehouseService:
 
 @router.get("/parts", response_model=dict)
 def list_parts(
+    request: Request,
+    response: Response,
     q: Optional[str] = Query(default=None),
     category_id: Optional[int] = Query(default=None),
     location_id: Optional[int] = Query(default=None),
     vendor_id: Optional[int] = Query(default=None),
     low_stock: bool = Query(default=False),
-    sort_field: str = Query(default="name"),
+    sort_field: str = Query(default="name", description="name, part_code, qty_on_hand, price or relevance"),
     sort_dir: str = Query(default="asc"),
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="Keyset cursor; pass an empty value for the first page to enable cursor mode",
+    ),
+    with_total: bool = Query(default=False, description="Include total count in cursor mode"),
+    if_none_match: Optional[str] = Header(default=None),
     _current_user: User = Depends(require_any(UserRole.USER, UserRole.ADMIN, UserRole.ROOT)),
     service: WarehouseService = Depends(get_service),
-) -> dict:
+):
+    service.validate_parts_cursor(sort_field, cursor)
+    etag = service.parts_list_etag(q, category_id, location_id, vendor_id, low_stock, str(request.query_params))
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    if cursor is not None:
+        items, next_cursor, prev_cursor, total = service.list_parts_keyset(
+            q,
+            category_id,
+            location_id,
+            vendor_id,
+            low_stock,
+            sort_field,
+            sort_dir,
+            cursor,
+            page_size,
+            with_total=with_total,
+        )
+        cursor_page = build_cursor_page(
+            [PartRead.model_validate(item) for item in items], page_size, next_cursor, prev_cursor, total
+        )
+        return cursor_page.model_dump()
     query = service.list_parts(q, category_id, location_id, vendor_id, low_stock, sort_field, sort_dir)
     items, total = paginate(query, page, page_size)
     page_model = build_page([PartRead.model_validate(item) for item in items], total, page, page_size)
     return page_model.model_dump()
 
 
+@router.get("/parts/facets", response_model=PartFacets)
+def part_facets(
+    q: Optional[str] = Query(default=None),
+    category_id: Optional[int] = Query(default=None),
+    location_id: Optional[int] = Query(default=None),
+    vendor_id: Optional[int] = Query(default=None),
+    low_stock: bool = Query(default=False),
+    _current_user: User = Depends(require_any(UserRole.USER, UserRole.ADMIN, UserRole.ROOT)),
+    service: WarehouseService = Depends(get_service),
+) -> PartFacets:
+    return service.part_facets(q, category_id, location_id, vendor_id, low_stock)
+
+
+@router.get("/parts/low-stock", response_model=dict)
+def list_low_stock(
+    cursor: Optional[str] = Query(default=None),
+    page_size: int = Query(default=20, ge=1, le=100),
+    _current_user: User = Depends(require_any(UserRole.USER, UserRole.ADMIN, UserRole.ROOT)),
+    service: WarehouseService = Depends(get_service),
+) -> dict:
+    items, next_cursor, prev_cursor, total = service.list_low_stock(cursor, page_size)
+    cursor_page = build_cursor_page(
+        [PartRead.model_validate(item) for item in items], page_size, next_cursor, prev_cursor, total
+    )
+    return cursor_page.model_dump()
+
+
+@router.get("/parts/changes", response_model=PartChanges)
+def part_changes(
+    since: Optional[str] = Query(default=None, description="Token from the previous sync; omit for a full download"),
+    limit: int = Query(default=1000, ge=1, le=5000),
+    _current_user: User = Depends(require_any(UserRole.USER, UserRole.ADMIN, UserRole.ROOT)),
+    service: WarehouseService = Depends(get_service),
+) -> PartChanges:
+    return service.part_changes(since, limit)
+
+
+@router.get("/parts/suggest", response_model=list[PartSuggestion])
+def suggest_parts(
+    prefix: str = Query(..., min_length=1, max_length=64),
+    limit: int = Query(default=10, ge=1, le=50),
+    _current_user: User = Depends(require_any(UserRole.USER, UserRole.ADMIN, UserRole.ROOT)),
+    service: WarehouseService = Depends(get_service),
+) -> list[PartSuggestion]:
+    return service.suggest_parts(prefix, limit)
+
+
+@router.post("/parts/import/jobs", response_model=ImportJobRead, status_code=status.HTTP_202_ACCEPTED)
+def submit_import_job(
+    mapping: str = Query(..., description="JSON mapping of columns"),
+    mode: ImportMode = Query(default=ImportMode.ADD),
+    upload: UploadFile = File(...),
+    current_user: User = Depends(require_any(UserRole.ADMIN, UserRole.ROOT)),
+    service: WarehouseService = Depends(get_service),
+) -> ImportJobRead:
+    mapping_dict = json.loads(mapping)
+    job = service.submit_import_job(
+        upload, mapping_dict, user_id=current_user.id, storage_dir=import_job_runner.storage_dir, mode=mode
+    )
+    import_job_runner.submit(job.id)
+    return service.import_job_progress(job)
+
+
+@router.get("/parts/import/{job_id}", response_model=ImportJobRead)
+def get_import_job(
+    job_id: int,
+    _current_user: User = Depends(require_any(UserRole.ADMIN, UserRole.ROOT)),
+    service: WarehouseService = Depends(get_service),
+) -> ImportJobRead:
+    return service.import_job_progress(service.get_import_job(job_id))
+
+
+@router.post("/parts/import/{job_id}/resume", response_model=ImportJobRead, status_code=status.HTTP_202_ACCEPTED)
+def resume_import_job(
+    job_id: int,
+    _current_user: User = Depends(require_any(UserRole.ADMIN, UserRole.ROOT)),
+    service: WarehouseService = Depends(get_service),
+) -> ImportJobRead:
+    job = service.requeue_import_job(job_id)
+    import_job_runner.submit(job.id)
+    return service.import_job_progress(job)
+
+
+@router.get("/parts/export")
+def export_parts(
+    q: Optional[str] = Query(default=None),
+    category_id: Optional[int] = Query(default=None),
+    location_id: Optional[int] = Query(default=None),
+    vendor_id: Optional[int] = Query(default=None),
+    low_stock: bool = Query(default=False),
+    sort_field: str = Query(default="name"),
+    sort_dir: str = Query(default="asc"),
+    format: ExportFormat = Query(default=ExportFormat.CSV),
+    columns: PartExportColumns = Query(default=PartExportColumns.BASIC),
+    accept_encoding: Optional[str] = Header(default=None),
+    _current_user: User = Depends(require_any(UserRole.USER, UserRole.ADMIN, UserRole.ROOT)),
+    service: WarehouseService = Depends(get_service),
+) -> StreamingResponse:
+    query = service.list_parts(q, category_id, location_id, vendor_id, low_stock, sort_field, sort_dir)
+    encoding = negotiate_encoding(accept_encoding)
+    chunks = service.export_parts(query, export_format=format, content_encoding=encoding, column_set=columns)
+    return export_response(chunks, format, "parts", encoding)
+
+
 @router.get("/parts/{part_id}", response_model=PartRead)
 def get_part(
     part_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
     _current_user: User = Depends(require_any(UserRole.USER, UserRole.ADMIN, UserRole.ROOT)),
     service: WarehouseService = Depends(get_service),
-) -> PartRead:
-    part = service.get_part(part_id)
-    return PartRead.model_validate(part)
+):
+    version = service.part_version(part_id)
+    if version is not None:
+        etag = service.part_etag(part_id, version)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+    return service.get_part_detail(part_id, version)
 
 
 @router.post("/parts", response_model=PartRead)
@@ -62,6 +230,24 @@ def create_part(
     return PartRead.model_validate(part)
 
 
+@router.patch("/parts", response_model=PartBulkUpdateResult)
+def bulk_update_parts(
+    payload: PartBulkUpdate,
+    current_user: User = Depends(require_any(UserRole.ADMIN, UserRole.ROOT)),
+    service: WarehouseService = Depends(get_service),
+) -> PartBulkUpdateResult:
+    return service.bulk_update_parts(payload, user_id=current_user.id)
+
+
+@router.post("/parts/stock-adjustments", response_model=StockAdjustmentResult)
+def adjust_stock(
+    payload: StockAdjustmentRequest,
+    current_user: User = Depends(require_any(UserRole.ADMIN, UserRole.ROOT)),
+    service: WarehouseService = Depends(get_service),
+) -> StockAdjustmentResult:
+    return service.adjust_stock(payload, user_id=current_user.id)
+
+
 @router.put("/parts/{part_id}", response_model=PartRead)
 def update_part(
     part_id: int,
@@ -82,43 +268,79 @@ def delete_part(
     service.delete_part(part_id, user_id=current_user.id)
 
 
-@router.post("/parts/import", response_model=ImportResult)
+@router.post("/parts/import", response_model=Union[ImportResult, ImportValidationReport])
 def import_parts(
     mapping: str = Query(..., description="JSON mapping of columns"),
+    mode: ImportMode = Query(default=ImportMode.ADD),
+    dry_run: bool = Query(default=False, description="Validate the file without importing it"),
     upload: UploadFile = File(...),
     current_user: User = Depends(require_any(UserRole.ADMIN, UserRole.ROOT)),
     service: WarehouseService = Depends(get_service),
-) -> ImportResult:
+) -> Union[ImportResult, ImportValidationReport]:
     mapping_dict = json.loads(mapping)
-    return service.import_parts(upload, mapping_dict)
+    if dry_run:
+        return service.validate_import(upload, mapping_dict, mode)
+    return service.import_parts(upload, mapping_dict, mode)
 
 
-@router.get("/parts/export")
-def export_parts(
-    q: Optional[str] = Query(default=None),
-    category_id: Optional[int] = Query(default=None),
-    location_id: Optional[int] = Query(default=None),
-    vendor_id: Optional[int] = Query(default=None),
-    low_stock: bool = Query(default=False),
-    sort_field: str = Query(default="name"),
-    sort_dir: str = Query(default="asc"),
+@router.get("/parts/{part_id}/audit", response_model=dict)
+def audit_logs(
+    part_id: int,
+    cursor: Optional[str] = Query(default=None, description="Keyset cursor from a previous page"),
+    page_size: int = Query(default=50, ge=1, le=200),
+    field: Optional[str] = Query(default=None, description="Only entries that changed this field"),
+    action: Optional[str] = Query(default=None),
     _current_user: User = Depends(require_any(UserRole.USER, UserRole.ADMIN, UserRole.ROOT)),
     service: WarehouseService = Depends(get_service),
-) -> StreamingResponse:
-    parts = service.list_parts(q, category_id, location_id, vendor_id, low_stock, sort_field, sort_dir).all()
-    csv_content = service.export_parts(parts)
-    return StreamingResponse(
-        iter([csv_content]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=parts.csv"},
-    )
+) -> dict:
+    logs, next_cursor, prev_cursor = service.list_audit_logs(part_id, cursor, page_size, field, action)
+    page = build_cursor_page([AuditLogRead.model_validate(log) for log in logs], page_size, next_cursor, prev_cursor)
+    return page.model_dump()
 
 
-@router.get("/parts/{part_id}/audit", response_model=list[AuditLogRead])
-def audit_logs(
-    part_id: int,
+@router.get("/categories", response_model=list[CategoryRead])
+def list_categories(
+    _current_user: User = Depends(require_any(UserRole.USER, UserRole.ADMIN, UserRole.ROOT)),
+    service: WarehouseService = Depends(get_service),
+) -> list[CategoryRead]:
+    return service.list_lookup("categories")
+
+
+@router.get("/locations", response_model=list[LocationRead])
+def list_locations(
+    _current_user: User = Depends(require_any(UserRole.USER, UserRole.ADMIN, UserRole.ROOT)),
+    service: WarehouseService = Depends(get_service),
+) -> list[LocationRead]:
+    return service.list_lookup("locations")
+
+
+@router.get("/vendors", response_model=list[VendorRead])
+def list_vendors(
     _current_user: User = Depends(require_any(UserRole.USER, UserRole.ADMIN, UserRole.ROOT)),
     service: WarehouseService = Depends(get_service),
-) -> list[AuditLogRead]:
-    logs = service.list_audit_logs(part_id)
-    return [AuditLogRead.model_validate(log) for log in logs]
+) -> list[VendorRead]:
+    return service.list_lookup("vendors")
+
+
+@router.get("/valuation", response_model=InventoryValuation)
+def inventory_valuation(
+    _current_user: User = Depends(require_any(UserRole.ADMIN, UserRole.ROOT)),
+    service: WarehouseService = Depends(get_service),
+) -> InventoryValuation:
+    return service.inventory_valuation()
+
+
+@router.post("/valuation/reconcile", response_model=ValuationReconcileResult)
+def reconcile_valuation(
+    _current_user: User = Depends(require_any(UserRole.ADMIN, UserRole.ROOT)),
+    service: WarehouseService = Depends(get_service),
+) -> ValuationReconcileResult:
+    return ValuationReconcileResult(corrected=service.reconcile_valuation_now())
+
+
+@router.get("/cache/stats", response_model=dict[str, CacheStats])
+def cache_stats(
+    _current_user: User = Depends(require_any(UserRole.ADMIN, UserRole.ROOT)),
+    service: WarehouseService = Depends(get_service),
+) -> dict[str, CacheStats]:
+    return service.cache_stats()
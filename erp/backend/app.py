@@ -12,6 +12,10 @@ from erp.backend.api.v1.users.router import router as users_router
 from erp.backend.api.v1.warehouse.router import router as warehouse_router
 from erp.backend.config import get_settings
 from erp.backend.core.database import create_database_schema, render_database_url
+from erp.backend.services.import_jobs import import_job_runner
+from erp.backend.services.pm_scheduler import pm_scheduler
+from erp.backend.services.suggestion_jobs import suggestion_refresher
+from erp.backend.services.valuation_jobs import valuation_reconciler
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -29,6 +33,20 @@ def on_startup() -> None:
         logger.info(
             "Ensured %s tables exist in %s", table_count, render_database_url()
         )
+    import_job_runner.start()
+    valuation_reconciler.start()
+    suggestion_refresher.start()
+    pm_scheduler.start()
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    """Application shutdown hook."""
+
+    import_job_runner.shutdown()
+    valuation_reconciler.shutdown()
+    suggestion_refresher.shutdown()
+    pm_scheduler.shutdown()
 
 
 @app.get("/health", tags=["Health"])
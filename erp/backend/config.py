@@ -26,6 +26,16 @@ class Settings(BaseSettings):
     login_rate_limit_window_minutes: int = Field(default=1, alias="LOGIN_RATE_LIMIT_WINDOW_MINUTES")
     user_soft_delete_enabled: bool = Field(default=True, alias="USER_SOFT_DELETE_ENABLED")
     auto_create_db_schema: bool = Field(default=False, alias="AUTO_CREATE_DB_SCHEMA")
+    import_storage_dir: str = Field(default="./import_jobs", alias="IMPORT_STORAGE_DIR")
+    import_job_workers: int = Field(default=2, alias="IMPORT_JOB_WORKERS")
+    import_job_sweep_interval_seconds: float = Field(default=60, alias="IMPORT_JOB_SWEEP_INTERVAL_SECONDS")
+    import_job_stale_seconds: float = Field(default=300, alias="IMPORT_JOB_STALE_SECONDS")
+    part_facets_cache_ttl_seconds: float = Field(default=30, alias="PART_FACETS_CACHE_TTL_SECONDS")
+    part_detail_cache_size: int = Field(default=1024, alias="PART_DETAIL_CACHE_SIZE")
+    lookup_cache_ttl_seconds: float = Field(default=300, alias="LOOKUP_CACHE_TTL_SECONDS")
+    part_suggestions_refresh_seconds: float = Field(default=300, alias="PART_SUGGESTIONS_REFRESH_SECONDS")
+    valuation_reconcile_interval_seconds: float = Field(default=3600, alias="VALUATION_RECONCILE_INTERVAL_SECONDS")
+    pm_scheduler_interval_seconds: float = Field(default=900, alias="PM_SCHEDULER_INTERVAL_SECONDS")
     seed_root_password: str | None = Field(default=None, alias="SEED_ROOT_PASSWORD")
     seed_admin_password: str | None = Field(default=None, alias="SEED_ADMIN_PASSWORD")
     seed_user_password: str | None = Field(default=None, alias="SEED_USER_PASSWORD")
@@ -0,0 +1,124 @@
+"""Streaming response compression negotiated from ``Accept-Encoding``."""
+from __future__ import annotations
+
+import logging
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Return supported content codings in server preference order."""
+
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return ("gzip",)
+    return ("zstd", "gzip")
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the content coding for a response, or ``None`` for identity.
+
+    The client's highest ``q`` value wins; ties go to the server preference
+    from :func:`available_encodings`.
+    """
+
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if name.strip():
+            weights[name.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for encoding in available_encodings():
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+@dataclass
+class CompressionStats:
+    """Bytes in and out and CPU time spent compressing one response."""
+
+    encoding: str
+    raw_bytes: int = 0
+    compressed_bytes: int = 0
+    cpu_seconds: float = 0.0
+
+    @property
+    def ratio(self) -> float:
+        return self.raw_bytes / self.compressed_bytes if self.compressed_bytes else 0.0
+
+
+def _compressor(encoding: str) -> tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    """Return ``(compress_chunk, finish)`` callables for ``encoding``.
+
+    ``compress_chunk`` flushes a complete block after every chunk so the
+    client receives data as soon as each export chunk is produced.
+    """
+
+    if encoding == "gzip":
+        gzip = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return lambda data: gzip.compress(data) + gzip.flush(zlib.Z_SYNC_FLUSH), gzip.flush
+    if encoding == "zstd":
+        import zstandard
+
+        zstd = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        return lambda data: zstd.compress(data) + zstd.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK), zstd.flush
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def compress_chunks(chunks: Iterable[str | bytes], encoding: str, label: str) -> Iterator[bytes]:
+    """Compress a streamed body chunk by chunk.
+
+    The compression ratio and the CPU time spent in the compressor are logged
+    under ``label`` once the stream ends.
+    """
+
+    stats = CompressionStats(encoding)
+    compress, finish = _compressor(encoding)
+    try:
+        for chunk in chunks:
+            data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+            if not data:
+                continue
+            started = time.thread_time()
+            output = compress(data)
+            stats.cpu_seconds += time.thread_time() - started
+            stats.raw_bytes += len(data)
+            stats.compressed_bytes += len(output)
+            if output:
+                yield output
+        started = time.thread_time()
+        tail = finish()
+        stats.cpu_seconds += time.thread_time() - started
+        stats.compressed_bytes += len(tail)
+        if tail:
+            yield tail
+    finally:
+        logger.info(
+            "Compressed %s export with %s: %d -> %d bytes (ratio %.2f, %.1f ms CPU)",
+            label,
+            stats.encoding,
+            stats.raw_bytes,
+            stats.compressed_bytes,
+            stats.ratio,
+            stats.cpu_seconds * 1000,
+        )
@@ -0,0 +1,23 @@
+"""Helpers for HTTP conditional requests."""
+from __future__ import annotations
+
+import hashlib
+from typing import Optional
+
+
+def make_etag(*parts: object) -> str:
+    """Build a weak ETag from the string form of ``parts``."""
+
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Return whether an ``If-None-Match`` header matches ``etag`` (weak comparison)."""
+
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
@@ -3,11 +3,11 @@
 from __future__ import annotations
 
 from contextlib import contextmanager
-from typing import Generator
+from typing import Callable, Generator
 
-from sqlalchemy import MetaData, create_engine
+from sqlalchemy import MetaData, create_engine, event
 from sqlalchemy.engine import Engine
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.orm import Session, SessionTransaction, sessionmaker
 
 from erp.backend.config import get_settings
 from erp.backend.models.base import Base
@@ -17,6 +17,8 @@ settings = get_settings()
 engine = create_engine(settings.database_url, echo=False, future=True)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False, class_=Session)
 
+_AFTER_COMMIT_CALLBACKS = "after_commit_callbacks"
+
 
 def create_database_schema(
     target_engine: Engine | None = None,
@@ -45,6 +47,19 @@ def render_database_url(target_engine: Engine | None = None, *, hide_password: b
     return engine_obj.url.render_as_string(hide_password=hide_password)
 
 
+def dialect_insert(session: Session, model):
+    """Return an ``INSERT`` for ``model`` that supports ``ON CONFLICT``."""
+
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upsert is not supported on {dialect}")
+    return insert(model)
+
+
 @contextmanager
 def session_scope() -> Generator[Session, None, None]:
     """Provide a transactional scope around a series of operations."""
@@ -65,3 +80,27 @@ def get_db_session() -> Generator[Session, None, None]:
 
     with session_scope() as session:
         yield session
+
+
+def run_after_commit(session: Session, callback: Callable[[], None]) -> None:
+    """Run ``callback`` once the session's outermost transaction commits.
+
+    Callbacks are discarded if the transaction is rolled back, which keeps
+    in-process caches and indexes from observing uncommitted writes.
+    """
+
+    session.info.setdefault(_AFTER_COMMIT_CALLBACKS, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_callbacks(session: Session) -> None:
+    if session.in_nested_transaction():
+        return
+    for callback in session.info.pop(_AFTER_COMMIT_CALLBACKS, []):
+        callback()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_after_commit_callbacks(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_AFTER_COMMIT_CALLBACKS, None)
@@ -0,0 +1,262 @@
+"""Streaming writers for tabular exports."""
+from __future__ import annotations
+
+import csv
+import io
+import tempfile
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Iterable, Iterator, Sequence
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Boolean, Date, DateTime, Integer, Numeric, String
+from sqlalchemy.orm import Session
+
+
+class ExportFormat(str, Enum):
+    """File formats supported by bulk export endpoints."""
+
+    CSV = "csv"
+    PARQUET = "parquet"
+    ARROW = "arrow"
+    XLSX = "xlsx"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+    ExportFormat.ARROW: "application/vnd.apache.arrow.file",
+    ExportFormat.XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+COLUMNAR_FORMATS = (ExportFormat.PARQUET, ExportFormat.ARROW)
+
+# The finished workbook stays in memory up to this size before spilling to disk.
+XLSX_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+XLSX_READ_SIZE = 256 * 1024
+
+
+def export_filename(stem: str, export_format: ExportFormat) -> str:
+    return f"{stem}.{export_format.value}"
+
+
+def _drain(buffer: io.StringIO) -> str:
+    """Return buffered text and reset the buffer for reuse."""
+
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate(0)
+    return value
+
+
+def export_response(
+    chunks: Iterable[str | bytes], export_format: ExportFormat, stem: str, content_encoding: str | None = None
+) -> StreamingResponse:
+    """Wrap an export body in a download response with the matching headers."""
+
+    headers = {
+        "Content-Disposition": f"attachment; filename={export_filename(stem, export_format)}",
+        "Vary": "Accept-Encoding",
+    }
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+    return StreamingResponse(chunks, media_type=EXPORT_MEDIA_TYPES[export_format], headers=headers)
+
+
+def require_export_support(export_format: ExportFormat) -> None:
+    """Fail the request before streaming starts if the format's writer is missing."""
+
+    if export_format in COLUMNAR_FORMATS:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise HTTPException(status_code=500, detail="pyarrow required for Parquet/Arrow export") from exc
+    elif export_format == ExportFormat.XLSX:
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise HTTPException(status_code=500, detail="openpyxl required for XLSX export") from exc
+
+
+def iter_export(
+    export_format: ExportFormat, columns: Sequence, batches: Iterable[Sequence[Sequence[object]]], title: str
+) -> Iterator[str | bytes]:
+    """Dispatch ``batches`` of column tuples to the writer for ``export_format``."""
+
+    if export_format == ExportFormat.XLSX:
+        return iter_xlsx(columns, batches, title)
+    if export_format in COLUMNAR_FORMATS:
+        return iter_columnar(export_format, columns, batches)
+    return iter_csv(columns, batches)
+
+
+def iter_csv(columns: Sequence, batches: Iterable[Sequence[Sequence[object]]]) -> Iterator[str]:
+    """Yield a CSV document with one chunk per batch; datetimes are written in ISO format."""
+
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow([column.key for column in columns])
+    yield _drain(output)
+    for rows in batches:
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row] for row in rows
+        )
+        yield _drain(output)
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back in chunks."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def arrow_type(column):
+    """Map a SQLAlchemy column to the Arrow type that preserves its values."""
+
+    import pyarrow as pa
+
+    column_type = column.type
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Numeric) and column_type.asdecimal and column_type.precision is not None:
+        return pa.decimal128(column_type.precision, column_type.scale or 0)
+    if isinstance(column_type, Numeric):
+        return pa.float64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us", tz="UTC" if column_type.timezone else None)
+    if isinstance(column_type, Date):
+        return pa.date32()
+    return pa.string()
+
+
+def iter_columnar(
+    export_format: ExportFormat, columns: Sequence, batches: Iterable[Sequence[Sequence[object]]]
+) -> Iterator[bytes]:
+    """Yield a Parquet or Arrow IPC file built from row ``batches``.
+
+    Every batch becomes one typed record batch (a row group for Parquet) and is
+    flushed to the output before the next batch is read.
+    """
+
+    import pyarrow as pa
+
+    schema = pa.schema([pa.field(column.key, arrow_type(column)) for column in columns])
+    sink = _ChunkSink()
+    if export_format == ExportFormat.PARQUET:
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(sink, schema)
+    with writer:
+        for rows in batches:
+            values = [[] for _ in columns]
+            for row in rows:
+                for index, value in enumerate(row):
+                    values[index].append(value)
+            arrays = [pa.array(column_values, type=field.type) for column_values, field in zip(values, schema)]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    tail = sink.drain()
+    if tail:
+        yield tail
+
+
+def _xlsx_number_format(column) -> str | None:
+    column_type = column.type
+    if isinstance(column_type, String):
+        return "@"
+    if isinstance(column_type, Numeric):
+        return "0." + "0" * column_type.scale if column_type.scale else "0"
+    if isinstance(column_type, DateTime):
+        return "yyyy-mm-dd hh:mm:ss"
+    if isinstance(column_type, Date):
+        return "yyyy-mm-dd"
+    return None
+
+
+def _xlsx_value(value: object) -> object:
+    # Excel has no time zones; aware datetimes are written as naive UTC.
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def iter_xlsx(columns: Sequence, batches: Iterable[Sequence[Sequence[object]]], title: str) -> Iterator[bytes]:
+    """Yield an XLSX workbook written with openpyxl's write-only mode.
+
+    Cells are typed from the column definitions: text columns are forced to
+    string cells with a text format so codes such as ``00123`` survive, and
+    numeric and date columns get explicit number formats. Rows go to the
+    worksheet's temporary file as they arrive; the zipped workbook is saved to a
+    spooled temporary file and streamed back in blocks.
+    """
+
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title[:31])
+    text_columns = [isinstance(column.type, String) for column in columns]
+    number_formats = [_xlsx_number_format(column) for column in columns]
+    sheet.append([column.key for column in columns])
+    for rows in batches:
+        for row in rows:
+            cells = []
+            for value, is_text, number_format in zip(row, text_columns, number_formats):
+                cell = WriteOnlyCell(sheet, value=_xlsx_value(value))
+                if is_text and value is not None:
+                    # Never let a value that looks like a formula or number be reinterpreted.
+                    cell.data_type = "s"
+                if number_format:
+                    cell.number_format = number_format
+                cells.append(cell)
+            sheet.append(cells)
+    with tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX_SIZE) as spool:
+        workbook.save(spool)
+        spool.seek(0)
+        while chunk := spool.read(XLSX_READ_SIZE):
+            yield chunk
+
+
+def close_when_done(session: Session, chunks: Iterable[object]) -> Iterator[object]:
+    """Yield ``chunks`` and close ``session`` once the stream ends.
+
+    Streaming bodies are produced after request dependencies have exited, so
+    the connection held by a server-side cursor is released here instead.
+    """
+
+    try:
+        yield from chunks
+    finally:
+        session.close()
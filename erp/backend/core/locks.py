@@ -0,0 +1,103 @@
+"""Cluster-wide locks that keep a background job to one worker at a time."""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import zlib
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, func, select, update
+from sqlalchemy.orm import Session, SessionTransaction
+
+from erp.backend.core.database import dialect_insert
+from erp.backend.models.jobs import JobLease
+
+logger = logging.getLogger(__name__)
+
+# A lease outlives a crashed holder only this long.
+JOB_LEASE_TTL_SECONDS = 900
+
+_LEASES_TO_RELEASE = "job_leases_to_release"
+
+
+def lock_holder() -> str:
+    """Identify the calling worker thread in lease rows."""
+
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def advisory_lock_key(name: str) -> int:
+    """Map a lock name to a stable PostgreSQL advisory lock key."""
+
+    return zlib.crc32(name.encode("utf-8"))
+
+
+def try_job_lock(session: Session, name: str, ttl_seconds: float = JOB_LEASE_TTL_SECONDS) -> bool:
+    """Take the lock ``name`` for the current transaction without waiting.
+
+    PostgreSQL uses a transaction-scoped advisory lock that is released on
+    commit or rollback. Other databases claim the ``job_leases`` row for
+    ``name`` when it is free or expired, in a short transaction of its own
+    that commits straight away, so other workers see the lease and skip
+    rather than wait on the caller's transaction. Call it before the caller's
+    transaction writes anything, and hand the lease back with
+    :func:`release_job_lock`; a crashed holder's lease lapses after
+    ``ttl_seconds``.
+    """
+
+    if session.get_bind().dialect.name == "postgresql":
+        return bool(session.execute(select(func.pg_try_advisory_xact_lock(advisory_lock_key(name)))).scalar())
+    now = datetime.now(timezone.utc)
+    values = {"holder": lock_holder(), "expires_at": now + timedelta(seconds=ttl_seconds)}
+    with session.get_bind().connect() as connection:
+        taken = connection.execute(
+            update(JobLease).where(JobLease.name == name, JobLease.expires_at <= now).values(**values)
+        ).rowcount
+        if not taken:
+            taken = connection.execute(
+                dialect_insert(session, JobLease)
+                .values(name=name, **values)
+                .on_conflict_do_nothing(index_elements=[JobLease.name])
+            ).rowcount
+        connection.commit()
+    return bool(taken)
+
+
+def release_job_lock(session: Session, name: str) -> None:
+    """Expire this worker's lease on ``name`` once the caller's transaction ends.
+
+    Releasing only after commit or rollback keeps another worker from taking
+    the lease while this transaction's writes are still pending. Advisory
+    locks end with the transaction by themselves.
+    """
+
+    if session.get_bind().dialect.name == "postgresql":
+        return
+    if session.in_transaction():
+        session.info.setdefault(_LEASES_TO_RELEASE, set()).add(name)
+    else:
+        _expire_leases(session, {name})
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _release_job_leases(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is not None:
+        return
+    names = session.info.pop(_LEASES_TO_RELEASE, None)
+    if names:
+        _expire_leases(session, names)
+
+
+def _expire_leases(session: Session, names: set[str]) -> None:
+    try:
+        with session.get_bind().connect() as connection:
+            connection.execute(
+                update(JobLease)
+                .where(JobLease.name.in_(names), JobLease.holder == lock_holder())
+                .values(expires_at=datetime.now(timezone.utc))
+            )
+            connection.commit()
+    except Exception:  # noqa: BLE001
+        logger.exception("Could not release job leases %s; they lapse after their TTL", sorted(names))
@@ -1,15 +1,24 @@
 """Pagination utilities."""
 from __future__ import annotations
 
+import base64
+import binascii
+import json
+from datetime import datetime
 from math import ceil
-from typing import Generic, Iterable, Sequence, TypeVar
+from typing import Any, Generic, Iterable, Optional, Sequence, TypeVar
 
 from pydantic import BaseModel
+from sqlalchemy import tuple_
 
 
 T = TypeVar("T")
 
 
+class InvalidCursorError(ValueError):
+    """Raised when a keyset cursor cannot be decoded."""
+
+
 class Page(BaseModel, Generic[T]):
     """Represents a paginated response."""
 
@@ -20,6 +29,16 @@ class Page(BaseModel, Generic[T]):
     pages: int
 
 
+class CursorPage(BaseModel, Generic[T]):
+    """Represents a keyset-paginated response."""
+
+    items: Sequence[T]
+    page_size: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
 def paginate(query, page: int, page_size: int) -> tuple[Iterable[T], int]:
     """Apply offset/limit pagination to SQLAlchemy query."""
 
@@ -35,3 +54,183 @@ def build_page(items: Sequence[T], total: int, page: int, page_size: int) -> Pag
 
     pages = ceil(total / page_size) if page_size else 1
     return Page(items=items, total=total, page=page, page_size=page_size, pages=pages)
+
+
+def _encode_token(payload: dict[str, Any]) -> str:
+    data = json.dumps(payload, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_token(token: str) -> Any:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, ValueError, UnicodeError) as exc:
+        raise InvalidCursorError("Invalid cursor") from exc
+
+
+def encode_cursor(key: Sequence[Any], direction: str) -> str:
+    """Encode a keyset position into an opaque URL-safe token."""
+
+    return _encode_token({"k": list(key), "d": direction})
+
+
+def decode_cursor(cursor: str) -> tuple[list[Any], str]:
+    """Decode a token produced by :func:`encode_cursor`.
+
+    Raises:
+        InvalidCursorError: If the token is malformed.
+    """
+
+    payload = _decode_token(cursor)
+    try:
+        key, direction = payload["k"], payload["d"]
+    except (KeyError, TypeError) as exc:
+        raise InvalidCursorError("Invalid cursor") from exc
+    if not isinstance(key, list) or direction not in {"next", "prev"}:
+        raise InvalidCursorError("Invalid cursor")
+    return key, direction
+
+
+def encode_sync_token(
+    watermark: int, next_watermark: Optional[int] = None, after: Optional[Sequence[int]] = None
+) -> str:
+    """Encode a delta-sync position.
+
+    ``watermark`` is the lowest change sequence not yet delivered. While a sync
+    is paging, ``after`` is the last ``(change_seq, id)`` returned and
+    ``next_watermark`` the watermark to hand out once the pages are drained.
+    """
+
+    payload: dict[str, Any] = {"w": watermark}
+    if after is not None:
+        payload.update(n=next_watermark, a=list(after))
+    return _encode_token(payload)
+
+
+def decode_sync_token(token: str) -> tuple[int, Optional[int], Optional[tuple[int, int]]]:
+    """Decode a token produced by :func:`encode_sync_token`.
+
+    Raises:
+        InvalidCursorError: If the token is malformed.
+    """
+
+    payload = _decode_token(token)
+    try:
+        watermark, next_watermark, after = payload["w"], payload.get("n"), payload.get("a")
+    except (AttributeError, KeyError, TypeError) as exc:
+        raise InvalidCursorError("Invalid sync token") from exc
+    if type(watermark) is not int:
+        raise InvalidCursorError("Invalid sync token")
+    if after is None:
+        return watermark, None, None
+    if not isinstance(after, list) or len(after) != 2 or any(type(value) is not int for value in [next_watermark, *after]):
+        raise InvalidCursorError("Invalid sync token")
+    return watermark, next_watermark, (after[0], after[1])
+
+
+def decode_keyset_cursor(cursor: str, columns: Sequence[Any]) -> tuple[list[Any], str]:
+    """Decode ``cursor`` into a sort key typed for ``columns`` and its direction.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or does not match ``columns``.
+    """
+
+    raw_key, direction = decode_cursor(cursor)
+    if len(raw_key) != len(columns):
+        raise InvalidCursorError("Invalid cursor")
+    try:
+        key = [_coerce_key_value(column, value) for column, value in zip(columns, raw_key)]
+    except (ArithmeticError, TypeError, ValueError) as exc:
+        raise InvalidCursorError("Invalid cursor") from exc
+    return key, direction
+
+
+def keyset_paginate(
+    query,
+    columns: Sequence[Any],
+    descending: bool,
+    cursor: Optional[str],
+    page_size: int,
+) -> tuple[list[Any], Optional[str], Optional[str]]:
+    """Apply keyset pagination to an unordered SQLAlchemy query.
+
+    Rows are ordered by ``columns`` (the last one must be unique, e.g. the
+    primary key) so each page is a single index range scan regardless of depth.
+
+    Args:
+        query: Filtered query without ``ORDER BY``.
+        columns: Mapped columns forming the sort key.
+        descending: Whether the key is sorted in descending order.
+        cursor: Token returned by a previous call, or ``None`` for the first page.
+        page_size: Maximum number of rows to return.
+
+    Returns:
+        The page items with the next and previous cursors (``None`` at either end).
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or does not match ``columns``.
+    """
+
+    page_size = max(page_size, 1)
+    direction = "next"
+    if cursor:
+        key, direction = decode_keyset_cursor(cursor, columns)
+        forward = direction == "next"
+        row_key = tuple_(*columns)
+        if forward != descending:
+            query = query.filter(row_key > tuple_(*key))
+        else:
+            query = query.filter(row_key < tuple_(*key))
+    # Walking backwards flips the sort order; the page is reversed afterwards.
+    reverse = (direction == "prev") != descending
+    query = query.order_by(*[column.desc() if reverse else column.asc() for column in columns])
+    rows = query.limit(page_size + 1).all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == "prev":
+        rows.reverse()
+    if not rows:
+        return rows, None, None
+
+    def _key(row: Any) -> list[Any]:
+        return [getattr(row, column.key) for column in columns]
+
+    if direction == "next":
+        next_cursor = encode_cursor(_key(rows[-1]), "next") if has_more else None
+        prev_cursor = encode_cursor(_key(rows[0]), "prev") if cursor else None
+    else:
+        next_cursor = encode_cursor(_key(rows[-1]), "next")
+        prev_cursor = encode_cursor(_key(rows[0]), "prev") if has_more else None
+    return rows, next_cursor, prev_cursor
+
+
+def build_cursor_page(
+    items: Sequence[T],
+    page_size: int,
+    next_cursor: Optional[str],
+    prev_cursor: Optional[str],
+    total: Optional[int] = None,
+) -> CursorPage[T]:
+    """Build a CursorPage model from sequence data."""
+
+    return CursorPage(
+        items=items,
+        page_size=page_size,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+        total=total,
+    )
+
+
+def _coerce_key_value(column: Any, value: Any) -> Any:
+    """Convert a JSON-decoded key value back to the column's Python type."""
+
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if isinstance(value, python_type):
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
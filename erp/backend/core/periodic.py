@@ -0,0 +1,41 @@
+"""Daemon-thread loop for in-process periodic jobs."""
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Call ``func`` every ``interval_seconds`` on a daemon thread until shut down."""
+
+    def __init__(self, name: str, func: Callable[[], object], interval_seconds: float):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the loop unless it is disabled or already running."""
+
+        if self.interval_seconds <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+        self._thread.start()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.func()
+            except Exception:  # noqa: BLE001
+                logger.exception("Periodic task %s failed", self.name)
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._stop.set()
+        if self._thread is not None and wait:
+            self._thread.join()
+        self._thread = None
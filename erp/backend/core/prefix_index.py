@@ -0,0 +1,224 @@
+"""In-process prefix index for type-ahead lookups."""
+from __future__ import annotations
+
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable, Generic, Iterable, Optional, Sequence, TypeVar
+
+
+T = TypeVar("T")
+
+
+class PrefixIndex(Generic[T]):
+    """Sorted-array index answering case-insensitive prefix queries.
+
+    Keys are kept in one sorted list with a parallel compact array of item ids,
+    so a lookup is a binary search followed by a short forward scan. The index
+    is safe to share between request threads: writers are serialized by their
+    own lock, and searches only wait while a writer edits or swaps the arrays.
+    Changes made while :meth:`load` reads its items are queued and replayed on
+    top of the loaded contents, so none are lost to a concurrent (re)load.
+    """
+
+    # Batches at least this large are merged into new arrays rather than insorted.
+    BATCH_MERGE_THRESHOLD = 64
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._write_lock = threading.RLock()
+        self._load_lock = threading.RLock()
+        # ``(item_id, keys, payload)`` changes queued during a load; ``keys`` is
+        # ``None`` for a removal.
+        self._pending: Optional[list[tuple[int, Optional[tuple[str, ...]], Optional[T]]]] = None
+        self._keys: list[str] = []
+        self._ids = array("q")
+        self._keys_by_id: dict[int, tuple[str, ...]] = {}
+        self._payloads: dict[int, T] = {}
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def load(self, items: Iterable[tuple[int, Sequence[str], T]]) -> None:
+        """Replace the index contents with ``(item_id, keys, payload)`` items.
+
+        ``items`` may be a lazy database read; searches keep using the old
+        contents until it is consumed, and writes made meanwhile are replayed
+        afterwards. Concurrent loads run one at a time.
+        """
+
+        with self._load_lock:
+            with self._write_lock:
+                self._pending = []
+            keys_by_id: dict[int, tuple[str, ...]] = {}
+            payloads: dict[int, T] = {}
+            pairs: list[tuple[str, int]] = []
+            try:
+                for item_id, keys, payload in items:
+                    normalized = self._normalize(keys)
+                    keys_by_id[item_id] = normalized
+                    payloads[item_id] = payload
+                    pairs.extend((key, item_id) for key in normalized)
+            except BaseException:
+                with self._write_lock, self._lock:
+                    self._replay_pending()
+                raise
+            pairs.sort()
+            with self._write_lock, self._lock:
+                self._keys = [key for key, _ in pairs]
+                self._ids = array("q", (item_id for _, item_id in pairs))
+                self._keys_by_id = keys_by_id
+                self._payloads = payloads
+                self._replay_pending()
+                self.loaded = True
+
+    def ensure_loaded(self, items: Callable[[], Iterable[tuple[int, Sequence[str], T]]]) -> None:
+        """Load from ``items()`` unless loaded; concurrent first callers share one load."""
+
+        if self.loaded:
+            return
+        with self._load_lock:
+            if not self.loaded:
+                self.load(items())
+
+    def add(self, item_id: int, keys: Sequence[str], payload: T) -> None:
+        """Insert or replace a single item."""
+
+        normalized = self._normalize(keys)
+        with self._write_lock:
+            if self._pending is not None:
+                self._pending.append((item_id, normalized, payload))
+                return
+            with self._lock:
+                self._insert(item_id, normalized, payload)
+
+    def add_many(self, items: Iterable[tuple[int, Sequence[str], T]]) -> None:
+        """Insert or replace a batch of items.
+
+        Large batches are merged into new arrays by copying the runs of
+        existing keys between the sorted new keys, which costs no re-sort of
+        the index. The merge runs under the writer lock only; searches are
+        blocked just for the final swap.
+        """
+
+        latest = {item_id: (self._normalize(keys), payload) for item_id, keys, payload in items}
+        if len(latest) < self.BATCH_MERGE_THRESHOLD:
+            for item_id, (keys, payload) in latest.items():
+                self.add(item_id, keys, payload)
+            return
+        new_pairs = sorted((key, item_id) for item_id, (keys, _) in latest.items() for key in keys)
+        with self._write_lock:
+            if self._pending is not None:
+                self._pending.extend((item_id, keys, payload) for item_id, (keys, payload) in latest.items())
+                return
+            keys, ids = self._keys, self._ids
+            dropped = sorted(
+                position
+                for item_id in latest
+                for key in self._keys_by_id.get(item_id, ())
+                if (position := self._position(key, item_id)) is not None
+            )
+            if dropped:
+                kept_keys: list[str] = []
+                kept_ids = array("q")
+                start = 0
+                for position in dropped:
+                    kept_keys += keys[start:position]
+                    kept_ids += ids[start:position]
+                    start = position + 1
+                kept_keys += keys[start:]
+                kept_ids += ids[start:]
+                keys, ids = kept_keys, kept_ids
+            merged_keys: list[str] = []
+            merged_ids = array("q")
+            start = 0
+            for key, item_id in new_pairs:
+                position = bisect_right(keys, key, start)
+                merged_keys += keys[start:position]
+                merged_ids += ids[start:position]
+                merged_keys.append(key)
+                merged_ids.append(item_id)
+                start = position
+            merged_keys += keys[start:]
+            merged_ids += ids[start:]
+            with self._lock:
+                self._keys, self._ids = merged_keys, merged_ids
+                for item_id, (normalized, payload) in latest.items():
+                    self._keys_by_id[item_id] = normalized
+                    self._payloads[item_id] = payload
+
+    def remove(self, item_id: int) -> None:
+        with self._write_lock:
+            if self._pending is not None:
+                self._pending.append((item_id, None, None))
+                return
+            with self._lock:
+                self._discard(item_id)
+
+    def search(self, prefix: str, limit: int) -> list[T]:
+        """Return up to ``limit`` payloads whose keys start with ``prefix``."""
+
+        prefix = prefix.strip().lower()
+        if not prefix or limit < 1:
+            return []
+        results: list[T] = []
+        seen: set[int] = set()
+        with self._lock:
+            position = bisect_left(self._keys, prefix)
+            while position < len(self._keys) and self._keys[position].startswith(prefix):
+                item_id = self._ids[position]
+                if item_id not in seen:
+                    seen.add(item_id)
+                    results.append(self._payloads[item_id])
+                    if len(results) >= limit:
+                        break
+                position += 1
+        return results
+
+    def reset(self) -> None:
+        """Drop all entries and mark the index as not loaded."""
+
+        with self._write_lock, self._lock:
+            self._keys = []
+            self._ids = array("q")
+            self._keys_by_id = {}
+            self._payloads = {}
+            self.loaded = False
+
+    def _position(self, key: str, item_id: int) -> Optional[int]:
+        position = bisect_left(self._keys, key)
+        while position < len(self._keys) and self._keys[position] == key:
+            if self._ids[position] == item_id:
+                return position
+            position += 1
+        return None
+
+    def _insert(self, item_id: int, normalized: tuple[str, ...], payload: T) -> None:
+        self._discard(item_id)
+        for key in normalized:
+            position = bisect_right(self._keys, key)
+            self._keys.insert(position, key)
+            self._ids.insert(position, item_id)
+        self._keys_by_id[item_id] = normalized
+        self._payloads[item_id] = payload
+
+    def _replay_pending(self) -> None:
+        pending, self._pending = self._pending or [], None
+        for item_id, keys, payload in pending:
+            if keys is None:
+                self._discard(item_id)
+            else:
+                self._insert(item_id, keys, payload)
+
+    def _discard(self, item_id: int) -> None:
+        for key in self._keys_by_id.pop(item_id, ()):
+            position = self._position(key, item_id)
+            if position is not None:
+                del self._keys[position]
+                del self._ids[position]
+        self._payloads.pop(item_id, None)
+
+    @staticmethod
+    def _normalize(keys: Sequence[str]) -> tuple[str, ...]:
+        return tuple(sorted({key.strip().lower() for key in keys if key and key.strip()}))
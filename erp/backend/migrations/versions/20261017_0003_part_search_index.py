@@ -0,0 +1,44 @@
+"""Add text search indexes for parts."""
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0003"
+down_revision = "20261017_0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_parts_name_trgm",
+            "parts",
+            ["name"],
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        )
+        op.create_index(
+            "ix_parts_part_code_trgm",
+            "parts",
+            ["part_code"],
+            postgresql_using="gin",
+            postgresql_ops={"part_code": "gin_trgm_ops"},
+        )
+    elif dialect == "sqlite":
+        op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS parts_fts USING fts5(part_code, name, tokenize='trigram')")
+        op.execute(
+            "INSERT INTO parts_fts(rowid, part_code, name) SELECT id, part_code, name FROM parts WHERE is_deleted = 0"
+        )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.drop_index("ix_parts_part_code_trgm", table_name="parts")
+        op.drop_index("ix_parts_name_trgm", table_name="parts")
+    elif dialect == "sqlite":
+        op.execute("DROP TABLE IF EXISTS parts_fts")
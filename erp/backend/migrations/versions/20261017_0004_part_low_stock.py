@@ -0,0 +1,34 @@
+"""Track low-stock parts with a generated column and partial index."""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0004"
+down_revision = "20261017_0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # SQLite can only add VIRTUAL generated columns to an existing table; both
+    # forms are indexable.
+    persisted = op.get_bind().dialect.name != "sqlite"
+    op.add_column(
+        "parts",
+        sa.Column("is_low_stock", sa.Boolean(), sa.Computed("qty_on_hand <= min_stock", persisted=persisted)),
+    )
+    op.create_index(
+        "ix_parts_low_stock",
+        "parts",
+        ["id"],
+        postgresql_where=sa.text("is_low_stock IS true AND is_deleted IS false"),
+        sqlite_where=sa.text("is_low_stock IS 1 AND is_deleted IS 0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_parts_low_stock", table_name="parts")
+    with op.batch_alter_table("parts") as batch_op:
+        batch_op.drop_column("is_low_stock")
@@ -0,0 +1,40 @@
+"""Add the stock movement ledger."""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0006"
+down_revision = "20261017_0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_movements",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            onupdate=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column("part_id", sa.Integer(), nullable=False),
+        sa.Column("delta", sa.Numeric(12, 2), nullable=False),
+        sa.Column("reason", sa.String(length=255), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["part_id"], ["parts.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_stock_movements_id"), "stock_movements", ["id"], unique=False)
+    op.create_index("ix_stock_movements_part_id_created_at", "stock_movements", ["part_id", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stock_movements_part_id_created_at", table_name="stock_movements")
+    op.drop_index(op.f("ix_stock_movements_id"), table_name="stock_movements")
+    op.drop_table("stock_movements")
@@ -0,0 +1,28 @@
+"""Track import mode and upsert counters on import jobs."""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0007"
+down_revision = "20261017_0006"
+branch_labels = None
+depends_on = None
+
+import_mode = sa.Enum("ADD", "UPSERT", name="importmode")
+
+
+def upgrade() -> None:
+    import_mode.create(op.get_bind(), checkfirst=True)
+    op.add_column("import_jobs", sa.Column("mode", import_mode, nullable=False, server_default="ADD"))
+    op.add_column("import_jobs", sa.Column("updated", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("import_jobs", sa.Column("unchanged", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("import_jobs") as batch_op:
+        batch_op.drop_column("unchanged")
+        batch_op.drop_column("updated")
+        batch_op.drop_column("mode")
+    import_mode.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,78 @@
+"""Index audit history per entity and store audit changes as JSON."""
+from __future__ import annotations
+
+import ast
+import json
+import re
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0008"
+down_revision = "20261017_0007"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+changes_json = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+# Import entries were written with str(dict), which renders decimals as Decimal('1.00').
+DECIMAL_REPR = re.compile(r"Decimal\('([^']*)'\)")
+
+
+def _parse_changes(text: str) -> dict:
+    try:
+        value = json.loads(text)
+    except ValueError:
+        try:
+            value = ast.literal_eval(DECIMAL_REPR.sub(r"'\1'", text))
+        except (SyntaxError, ValueError):
+            value = None
+    return value if isinstance(value, dict) else {"raw": text}
+
+
+def _copy_changes(source: sa.Column, target: sa.Column, convert) -> None:
+    bind = op.get_bind()
+    audit_logs = sa.table("audit_logs", sa.column("id", sa.Integer()), source, target)
+    source, target = source.name, target.name
+    update = (
+        audit_logs.update()
+        .where(audit_logs.c.id == sa.bindparam("b_id"))
+        .values({target: sa.bindparam("b_value")})
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(audit_logs.c.id, audit_logs.c[source])
+            .where(audit_logs.c.id > last_id, audit_logs.c[source].is_not(None))
+            .order_by(audit_logs.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(update, [{"b_id": row_id, "b_value": convert(value)} for row_id, value in rows])
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    op.create_index(
+        op.f("ix_audit_logs_entity_type_entity_id_created_at"),
+        "audit_logs",
+        ["entity_type", "entity_id", "created_at"],
+        unique=False,
+    )
+    op.add_column("audit_logs", sa.Column("changes_json", changes_json, nullable=True))
+    _copy_changes(sa.column("changes", sa.String()), sa.column("changes_json", changes_json), _parse_changes)
+    with op.batch_alter_table("audit_logs") as batch_op:
+        batch_op.drop_column("changes")
+        batch_op.alter_column("changes_json", new_column_name="changes")
+
+
+def downgrade() -> None:
+    op.add_column("audit_logs", sa.Column("changes_text", sa.String(), nullable=True))
+    _copy_changes(sa.column("changes", changes_json), sa.column("changes_text", sa.String()), json.dumps)
+    with op.batch_alter_table("audit_logs") as batch_op:
+        batch_op.drop_column("changes")
+        batch_op.alter_column("changes_text", new_column_name="changes")
+    op.drop_index(op.f("ix_audit_logs_entity_type_entity_id_created_at"), table_name="audit_logs")
@@ -0,0 +1,23 @@
+"""Stamp parts with a change sequence for delta sync."""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0009"
+down_revision = "20261017_0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows start at 0 and are covered by every full download.
+    op.add_column("parts", sa.Column("change_seq", sa.BigInteger(), nullable=False, server_default="0"))
+    op.create_index("ix_parts_change_seq_id", "parts", ["change_seq", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_parts_change_seq_id", table_name="parts")
+    with op.batch_alter_table("parts") as batch_op:
+        batch_op.drop_column("change_seq")
@@ -0,0 +1,72 @@
+"""Add the incrementally maintained stock valuation rollup."""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0010"
+down_revision = "20261017_0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "part_valuations",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            onupdate=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.Column("location_id", sa.Integer(), nullable=False),
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column("part_count", sa.Integer(), nullable=False),
+        sa.Column("qty_on_hand", sa.Numeric(18, 2), nullable=False),
+        sa.Column("total_value", sa.Numeric(20, 4), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("category_id", "location_id", "currency", name="uq_part_valuations_group"),
+    )
+    op.create_index(op.f("ix_part_valuations_id"), "part_valuations", ["id"], unique=False)
+    # Seed the rollup from the current catalogue.
+    parts = sa.table(
+        "parts",
+        sa.column("category_id", sa.Integer()),
+        sa.column("location_id", sa.Integer()),
+        sa.column("currency", sa.String()),
+        sa.column("qty_on_hand", sa.Numeric(12, 2)),
+        sa.column("price", sa.Numeric(12, 2)),
+        sa.column("is_deleted", sa.Boolean()),
+    )
+    valuations = sa.table(
+        "part_valuations",
+        *(
+            sa.column(name)
+            for name in ("category_id", "location_id", "currency", "part_count", "qty_on_hand", "total_value")
+        ),
+    )
+    category_id = sa.func.coalesce(parts.c.category_id, 0)
+    location_id = sa.func.coalesce(parts.c.location_id, 0)
+    groups = (
+        sa.select(
+            category_id,
+            location_id,
+            parts.c.currency,
+            sa.func.count(),
+            sa.func.coalesce(sa.func.sum(parts.c.qty_on_hand), 0),
+            sa.func.coalesce(sa.func.sum(parts.c.qty_on_hand * parts.c.price), 0),
+        )
+        .where(parts.c.is_deleted.is_(False))
+        .group_by(category_id, location_id, parts.c.currency)
+    )
+    op.execute(valuations.insert().from_select(list(valuations.c), groups))
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_part_valuations_id"), table_name="part_valuations")
+    op.drop_table("part_valuations")
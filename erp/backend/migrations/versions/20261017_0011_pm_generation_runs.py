@@ -0,0 +1,85 @@
+"""Make PM generation idempotent and log scheduler runs."""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0011"
+down_revision = "20261017_0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Concurrent generate-due calls could create the same occurrence twice. Keep the
+    # oldest order linked to its plan and detach the copies so the unique index builds.
+    work_orders = sa.table(
+        "work_orders",
+        sa.column("id", sa.Integer()),
+        sa.column("plan_id", sa.Integer()),
+        sa.column("due_date", sa.Date()),
+    )
+    original = work_orders.alias("original")
+    duplicate = sa.exists().where(
+        original.c.plan_id == work_orders.c.plan_id,
+        original.c.due_date == work_orders.c.due_date,
+        original.c.id < work_orders.c.id,
+    )
+    op.execute(work_orders.update().where(work_orders.c.plan_id.is_not(None), duplicate).values(plan_id=None))
+    op.create_index("uq_work_orders_plan_id_due_date", "work_orders", ["plan_id", "due_date"], unique=True)
+
+    op.create_table(
+        "job_leases",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            onupdate=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("holder", sa.String(length=255), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.create_index(op.f("ix_job_leases_id"), "job_leases", ["id"], unique=False)
+
+    op.create_table(
+        "pm_generation_runs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            onupdate=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column("trigger", sa.String(length=20), nullable=False),
+        sa.Column("status", sa.Enum("COMPLETED", "FAILED", name="pmgenerationstatus"), nullable=False),
+        sa.Column("reference_date", sa.Date(), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("duration_ms", sa.Integer(), nullable=False),
+        sa.Column("due_plans", sa.Integer(), nullable=False),
+        sa.Column("created_work_orders", sa.Integer(), nullable=False),
+        sa.Column("skipped_existing", sa.Integer(), nullable=False),
+        sa.Column("error", sa.String(length=500), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_pm_generation_runs_id"), "pm_generation_runs", ["id"], unique=False)
+    op.create_index(op.f("ix_pm_generation_runs_started_at"), "pm_generation_runs", ["started_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_pm_generation_runs_started_at"), table_name="pm_generation_runs")
+    op.drop_index(op.f("ix_pm_generation_runs_id"), table_name="pm_generation_runs")
+    op.drop_table("pm_generation_runs")
+    sa.Enum(name="pmgenerationstatus").drop(op.get_bind(), checkfirst=True)
+    op.drop_index(op.f("ix_job_leases_id"), table_name="job_leases")
+    op.drop_table("job_leases")
+    op.drop_index("uq_work_orders_plan_id_due_date", table_name="work_orders")
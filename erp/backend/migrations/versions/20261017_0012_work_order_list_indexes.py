@@ -0,0 +1,25 @@
+"""Index work orders for filtered listing."""
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0012"
+down_revision = "20261017_0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_work_orders_status_due_date", "work_orders", ["status", "due_date"], unique=False)
+    # The listing pages by id inside a status (and equipment), so id closes both keys.
+    op.create_index("ix_work_orders_status_id", "work_orders", ["status", "id"], unique=False)
+    op.create_index(
+        "ix_work_orders_equipment_id_status_id", "work_orders", ["equipment_id", "status", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_work_orders_equipment_id_status_id", table_name="work_orders")
+    op.drop_index("ix_work_orders_status_id", table_name="work_orders")
+    op.drop_index("ix_work_orders_status_due_date", table_name="work_orders")
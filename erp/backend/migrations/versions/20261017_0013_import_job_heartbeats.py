@@ -0,0 +1,21 @@
+"""Track which worker runs an import job and when it last reported progress."""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261017_0013"
+down_revision = "20261017_0012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("import_jobs", sa.Column("claimed_by", sa.String(length=255), nullable=True))
+    op.add_column("import_jobs", sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("import_jobs", "heartbeat_at")
+    op.drop_column("import_jobs", "claimed_by")
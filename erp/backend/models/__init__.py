@@ -1,7 +1,15 @@
 """Aggregate models for Alembic discovery."""
 from erp.backend.models.user import RefreshToken, User, UserAuditLog
-from erp.backend.models.warehouse import AuditLog, Category, Location, Part, Vendor
-from erp.backend.models.maintenance import Equipment, MaintenanceHistory, PMPlan, PMTemplate, WorkOrder
+from erp.backend.models.warehouse import AuditLog, Category, ImportJob, Location, Part, PartValuation, StockMovement, Vendor
+from erp.backend.models.jobs import JobLease
+from erp.backend.models.maintenance import (
+    Equipment,
+    MaintenanceHistory,
+    PMGenerationRun,
+    PMPlan,
+    PMTemplate,
+    WorkOrder,
+)
 from erp.backend.models.tooling import Batch, BatchItem, Tool, ToolDim, ToolDimChange, ToolOperation
 
 __all__ = [
@@ -9,11 +17,16 @@ __all__ = [
     "User",
     "UserAuditLog",
     "Category",
+    "ImportJob",
     "Location",
     "Vendor",
     "Part",
+    "PartValuation",
+    "StockMovement",
+    "JobLease",
     "Equipment",
     "MaintenanceHistory",
+    "PMGenerationRun",
     "PMPlan",
     "PMTemplate",
     "WorkOrder",
@@ -0,0 +1,19 @@
+"""Coordination models for background jobs."""
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from erp.backend.models.base import Base
+
+
+class JobLease(Base):
+    """Named lease that lets one worker at a time run a job on databases without advisory locks."""
+
+    __tablename__ = "job_leases"
+
+    name: Mapped[str] = mapped_column(String(100), unique=True)
+    holder: Mapped[str] = mapped_column(String(255))
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
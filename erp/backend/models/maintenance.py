@@ -6,7 +6,7 @@ from decimal import Decimal
 from enum import Enum
 from typing import List, Optional
 
-from sqlalchemy import Date, DateTime, Enum as SAEnum, ForeignKey, Integer, Numeric, String
+from sqlalchemy import Date, DateTime, Enum as SAEnum, ForeignKey, Index, Integer, Numeric, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from erp.backend.models.base import Base
@@ -21,6 +21,9 @@ class WorkOrderStatus(str, Enum):
     CANCELED = "Canceled"
 
 
+OPEN_WORK_ORDER_STATUSES = (WorkOrderStatus.OPEN, WorkOrderStatus.IN_PROGRESS)
+
+
 class WorkOrderType(str, Enum):
     """Work order type."""
 
@@ -28,6 +31,13 @@ class WorkOrderType(str, Enum):
     CM = "CM"
 
 
+class PMGenerationStatus(str, Enum):
+    """Outcome of a PM due-generation run."""
+
+    COMPLETED = "Completed"
+    FAILED = "Failed"
+
+
 class Equipment(Base):
     """Equipment entity."""
 
@@ -68,6 +78,13 @@ class WorkOrder(Base):
     """Maintenance work order."""
 
     __tablename__ = "work_orders"
+    # One PM order per plan occurrence; corrective orders have no plan and are not constrained.
+    __table_args__ = (
+        Index("uq_work_orders_plan_id_due_date", "plan_id", "due_date", unique=True),
+        Index("ix_work_orders_status_due_date", "status", "due_date"),
+        Index("ix_work_orders_status_id", "status", "id"),
+        Index("ix_work_orders_equipment_id_status_id", "equipment_id", "status", "id"),
+    )
 
     equipment_id: Mapped[int] = mapped_column(ForeignKey("equipment.id"))
     type: Mapped[WorkOrderType] = mapped_column(SAEnum(WorkOrderType))
@@ -95,3 +112,20 @@ class MaintenanceHistory(Base):
     recorded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
     work_order: Mapped[WorkOrder] = relationship(back_populates="history_records")
+
+
+class PMGenerationRun(Base):
+    """Timing and counts of one PM due-generation run."""
+
+    __tablename__ = "pm_generation_runs"
+
+    trigger: Mapped[str] = mapped_column(String(20))
+    status: Mapped[PMGenerationStatus] = mapped_column(SAEnum(PMGenerationStatus))
+    reference_date: Mapped[date] = mapped_column(Date)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    finished_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    duration_ms: Mapped[int] = mapped_column(Integer)
+    due_plans: Mapped[int] = mapped_column(Integer, default=0)
+    created_work_orders: Mapped[int] = mapped_column(Integer, default=0)
+    skipped_existing: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
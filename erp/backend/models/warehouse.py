@@ -1,15 +1,90 @@
 """Warehouse module models."""
 from __future__ import annotations
 
+from datetime import datetime, timezone
 from decimal import Decimal
+from enum import Enum
 from typing import List, Optional
 
-from sqlalchemy import Boolean, ForeignKey, Numeric, String
+from sqlalchemy import (
+    DDL,
+    JSON,
+    BigInteger,
+    Boolean,
+    Computed,
+    DateTime,
+    Enum as SAEnum,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    UniqueConstraint,
+    event,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql.functions import FunctionElement
 
 from erp.backend.models.base import Base
 
 
+PARTS_FTS_TABLE = "parts_fts"
+
+
+class next_change_seq(FunctionElement):
+    """Change sequence stamped on every inserted or updated part row.
+
+    PostgreSQL uses the writing transaction's id; SQLite, which has a single
+    writer, counts up from the highest committed value.
+    """
+
+    type = BigInteger()
+    inherit_cache = True
+
+
+class change_seq_watermark(FunctionElement):
+    """Lowest change sequence that a transaction still in flight could write."""
+
+    type = BigInteger()
+    inherit_cache = True
+
+
+@compiles(next_change_seq)
+@compiles(change_seq_watermark)
+def _compile_change_seq(element, compiler, **kw) -> str:
+    return "(SELECT coalesce(max(change_seq), 0) + 1 FROM parts)"
+
+
+@compiles(next_change_seq, "postgresql")
+def _compile_next_change_seq_pg(element, compiler, **kw) -> str:
+    return "pg_current_xact_id()::text::bigint"
+
+
+@compiles(change_seq_watermark, "postgresql")
+def _compile_change_seq_watermark_pg(element, compiler, **kw) -> str:
+    return "pg_snapshot_xmin(pg_current_snapshot())::text::bigint"
+
+
+class ImportJobStatus(str, Enum):
+    """Lifecycle state of a background import job."""
+
+    QUEUED = "Queued"
+    RUNNING = "Running"
+    COMPLETED = "Completed"
+    FAILED = "Failed"
+
+
+class ImportMode(str, Enum):
+    """How imported rows treat parts that already exist."""
+
+    ADD = "add"
+    UPSERT = "upsert"
+
+
 class Category(Base):
     """Part category."""
 
@@ -44,6 +119,29 @@ class Part(Base):
     """Spare part entity."""
 
     __tablename__ = "parts"
+    __table_args__ = (
+        Index(
+            "ix_parts_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_parts_part_code_trgm",
+            "part_code",
+            postgresql_using="gin",
+            postgresql_ops={"part_code": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        # Partial index holding only live low-stock parts; the predicates are
+        # spelled the way the ORM renders them so the planners can match them.
+        Index(
+            "ix_parts_low_stock",
+            "id",
+            postgresql_where=text("is_low_stock IS true AND is_deleted IS false"),
+            sqlite_where=text("is_low_stock IS 1 AND is_deleted IS 0"),
+        ),
+        Index("ix_parts_change_seq_id", "change_seq", "id"),
+    )
 
     part_code: Mapped[str] = mapped_column(String(64), unique=True, index=True)
     name: Mapped[str] = mapped_column(String(255))
@@ -56,19 +154,114 @@ class Part(Base):
     price: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=Decimal("0"))
     currency: Mapped[str] = mapped_column(String(3), default="USD")
     is_deleted: Mapped[bool] = mapped_column(Boolean, default=False)
+    is_low_stock: Mapped[bool] = mapped_column(Boolean, Computed("qty_on_hand <= min_stock", persisted=True))
+    # Bumped by every write for ETags; concurrent writers are not rejected (last write wins).
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1", onupdate=text("version + 1"))
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger, default=next_change_seq(), onupdate=next_change_seq(), server_default="0"
+    )
 
     category: Mapped[Optional[Category]] = relationship(back_populates="parts")
     location: Mapped[Optional[Location]] = relationship(back_populates="parts")
     vendor: Mapped[Optional[Vendor]] = relationship(back_populates="parts")
 
 
+# Text search support objects live outside the ORM metadata: the pg_trgm
+# extension backs the GIN indexes above, and SQLite uses an FTS5 side table
+# keyed by part id that the warehouse repositories keep in sync.
+event.listen(
+    Part.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+event.listen(
+    Part.__table__,
+    "after_create",
+    DDL(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {PARTS_FTS_TABLE} "
+        "USING fts5(part_code, name, tokenize='trigram')"
+    ).execute_if(dialect="sqlite"),
+)
+event.listen(
+    Part.__table__,
+    "after_drop",
+    DDL(f"DROP TABLE IF EXISTS {PARTS_FTS_TABLE}").execute_if(dialect="sqlite"),
+)
+
+
 class AuditLog(Base):
     """Track entity changes."""
 
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_entity_type_entity_id_created_at", "entity_type", "entity_id", "created_at"),
+    )
 
     entity_type: Mapped[str] = mapped_column(String(100))
     entity_id: Mapped[int] = mapped_column()
     action: Mapped[str] = mapped_column(String(50))
     user_id: Mapped[Optional[int]] = mapped_column(nullable=True)
-    changes: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    changes: Mapped[Optional[dict]] = mapped_column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
+    # Stamped per row by the application so entries written in one batch keep
+    # their order and keyset cursors compare exactly on every backend.
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now()
+    )
+
+
+class ImportJob(Base):
+    """Background parts import processed in committed chunks."""
+
+    __tablename__ = "import_jobs"
+
+    filename: Mapped[str] = mapped_column(String(255))
+    file_path: Mapped[str] = mapped_column(String(500))
+    mapping: Mapped[dict] = mapped_column(JSON, default=dict)
+    status: Mapped[ImportJobStatus] = mapped_column(SAEnum(ImportJobStatus), default=ImportJobStatus.QUEUED)
+    mode: Mapped[ImportMode] = mapped_column(SAEnum(ImportMode), default=ImportMode.ADD)
+    user_id: Mapped[Optional[int]] = mapped_column(nullable=True)
+    rows_done: Mapped[int] = mapped_column(Integer, default=0)
+    created: Mapped[int] = mapped_column(Integer, default=0)
+    updated: Mapped[int] = mapped_column(Integer, default=0)
+    unchanged: Mapped[int] = mapped_column(Integer, default=0)
+    skipped: Mapped[int] = mapped_column(Integer, default=0)
+    errors: Mapped[int] = mapped_column(Integer, default=0)
+    error_message: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    # The worker running the job and its last sign of life: stamped when the
+    # job is queued or claimed and refreshed with every committed chunk.
+    claimed_by: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class StockMovement(Base):
+    """Ledger entry for a stock quantity adjustment."""
+
+    __tablename__ = "stock_movements"
+    __table_args__ = (Index("ix_stock_movements_part_id_created_at", "part_id", "created_at"),)
+
+    part_id: Mapped[int] = mapped_column(ForeignKey("parts.id"))
+    delta: Mapped[Decimal] = mapped_column(Numeric(12, 2))
+    reason: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    user_id: Mapped[Optional[int]] = mapped_column(nullable=True)
+
+
+class PartValuation(Base):
+    """Stock value rollup of live parts per category, location and currency.
+
+    Kept up to date by the warehouse service in the writing transaction; parts
+    without a category or location are grouped under id 0.
+    """
+
+    __tablename__ = "part_valuations"
+    __table_args__ = (
+        UniqueConstraint("category_id", "location_id", "currency", name="uq_part_valuations_group"),
+    )
+
+    category_id: Mapped[int] = mapped_column(Integer, default=0)
+    location_id: Mapped[int] = mapped_column(Integer, default=0)
+    currency: Mapped[str] = mapped_column(String(3))
+    part_count: Mapped[int] = mapped_column(Integer, default=0)
+    qty_on_hand: Mapped[Decimal] = mapped_column(Numeric(18, 2), default=Decimal("0"))
+    total_value: Mapped[Decimal] = mapped_column(Numeric(20, 4), default=Decimal("0"))
@@ -2,17 +2,24 @@
 from __future__ import annotations
 
 from datetime import date
-from typing import Iterable, Optional
+from typing import Iterable, Iterator, Optional, Sequence
 
+from sqlalchemy import bindparam, select, update
 from sqlalchemy.orm import Session
 
+from erp.backend.core.database import dialect_insert
+from erp.backend.core.pagination import keyset_paginate
+
 from erp.backend.models.maintenance import (
+    OPEN_WORK_ORDER_STATUSES,
     Equipment,
     MaintenanceHistory,
+    PMGenerationRun,
     PMPlan,
     PMTemplate,
     WorkOrder,
     WorkOrderStatus,
+    WorkOrderType,
 )
 
 
@@ -69,8 +76,27 @@ class PMPlanRepository:
         self.session.flush()
         return plan
 
-    def due_plans(self, reference_date: date) -> Iterable[PMPlan]:
-        return self.session.query(PMPlan).filter(PMPlan.next_due_date <= reference_date).all()
+    def due_schedules(self, reference_date: date) -> list:
+        """Return ``(id, equipment_id, next_due_date, frequency_days)`` rows of due plans in one join."""
+
+        stmt = (
+            select(PMPlan.id, PMPlan.equipment_id, PMPlan.next_due_date, PMTemplate.frequency_days)
+            .join(PMTemplate, PMTemplate.id == PMPlan.template_id)
+            .where(PMPlan.next_due_date <= reference_date)
+            .order_by(PMPlan.id)
+        )
+        return self.session.execute(stmt).all()
+
+    def advance_due_dates(self, next_due_dates: dict[int, date]) -> None:
+        """Set ``next_due_date`` per plan id with one executemany UPDATE."""
+
+        if not next_due_dates:
+            return
+        plans = PMPlan.__table__
+        stmt = update(plans).where(plans.c.id == bindparam("b_plan_id")).values(next_due_date=bindparam("b_due_date"))
+        self.session.execute(
+            stmt, [{"b_plan_id": plan_id, "b_due_date": due_date} for plan_id, due_date in next_due_dates.items()]
+        )
 
 
 class WorkOrderRepository:
@@ -90,10 +116,70 @@ class WorkOrderRepository:
         self.session.flush()
         return work_order
 
+    def create_missing(self, rows: list[dict[str, object]]) -> int:
+        """Insert PM orders, skipping ``(plan_id, due_date)`` pairs that already exist.
+
+        Returns the number of orders actually inserted.
+        """
+
+        if not rows:
+            return 0
+        stmt = (
+            dialect_insert(self.session, WorkOrder)
+            .on_conflict_do_nothing(index_elements=[WorkOrder.plan_id, WorkOrder.due_date])
+            .returning(WorkOrder.id)
+        )
+        return len(self.session.execute(stmt, rows).all())
+
     def list_open(self) -> Iterable[WorkOrder]:
+        return self.session.query(WorkOrder).filter(WorkOrder.status.in_(OPEN_WORK_ORDER_STATUSES)).all()
+
+    def list_page(
+        self,
+        statuses: Sequence[WorkOrderStatus],
+        equipment_id: Optional[int],
+        work_order_type: Optional[WorkOrderType],
+        due_from: Optional[date],
+        due_to: Optional[date],
+        cursor: Optional[str],
+        page_size: int,
+    ) -> tuple[list[WorkOrder], Optional[str], Optional[str]]:
+        """Return one keyset page of matching orders, newest first.
+
+        ``(status, id)`` and ``(equipment_id, status, id)`` return a single
+        status in page order, so a page stops after ``page_size`` rows. A
+        multi-status list such as the default open view, or a due-date range
+        served by ``(status, due_date)``, still reads every match before sorting.
+        """
+
+        query = self.session.query(WorkOrder).filter(WorkOrder.status.in_(statuses))
+        if equipment_id is not None:
+            query = query.filter(WorkOrder.equipment_id == equipment_id)
+        if work_order_type is not None:
+            query = query.filter(WorkOrder.type == work_order_type)
+        if due_from is not None:
+            query = query.filter(WorkOrder.due_date >= due_from)
+        if due_to is not None:
+            query = query.filter(WorkOrder.due_date <= due_to)
+        return keyset_paginate(query, (WorkOrder.id,), True, cursor, page_size)
+
+
+class PMGenerationRunRepository:
+    """Repository for the PM due-generation run log."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add(self, run: PMGenerationRun) -> PMGenerationRun:
+        self.session.add(run)
+        self.session.flush()
+        return run
+
+    def list_recent(self, limit: int) -> Iterable[PMGenerationRun]:
         return (
-            self.session.query(WorkOrder)
-            .filter(WorkOrder.status.in_([WorkOrderStatus.OPEN, WorkOrderStatus.IN_PROGRESS]))
+            self.session.query(PMGenerationRun)
+            .order_by(PMGenerationRun.started_at.desc(), PMGenerationRun.id.desc())
+            .limit(limit)
             .all()
         )
 
@@ -111,3 +197,10 @@ class MaintenanceHistoryRepository:
 
     def list(self) -> Iterable[MaintenanceHistory]:
         return self.session.query(MaintenanceHistory).order_by(MaintenanceHistory.recorded_at.desc()).all()
+
+    def iter_row_batches(self, columns: Sequence, batch_size: int) -> Iterator[Sequence]:
+        """Yield lists of ``columns`` tuples, newest first, from a server-side cursor."""
+
+        stmt = select(*columns).order_by(MaintenanceHistory.recorded_at.desc())
+        result = self.session.execute(stmt, execution_options={"yield_per": batch_size})
+        yield from result.partitions()
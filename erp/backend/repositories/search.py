@@ -0,0 +1,125 @@
+"""Text search backends for parts."""
+from __future__ import annotations
+
+from typing import Iterable
+
+from sqlalchemy import Integer, case, column, delete, func, insert, literal_column, or_, select, table
+from sqlalchemy.orm import Session
+
+from erp.backend.models.warehouse import PARTS_FTS_TABLE, Part
+
+
+PartSearchEntry = tuple[int, str, str]
+
+_parts_fts = table(
+    PARTS_FTS_TABLE,
+    column("rowid", Integer),
+    column("rank"),
+    column("part_code"),
+    column("name"),
+)
+
+
+class PartSearchBackend:
+    """Substring search over part name and code using ``ILIKE``.
+
+    Subclasses swap in an indexed implementation for a specific dialect and keep
+    any side index up to date through :meth:`index` and :meth:`remove`.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def filter(self, query, q: str):
+        pattern = f"%{q}%"
+        return query.filter(or_(Part.name.ilike(pattern), Part.part_code.ilike(pattern)))
+
+    def rank(self, query, q: str):
+        """Order a filtered query by relevance to ``q``."""
+
+        prefix = f"{q}%"
+        relevance = case(
+            (func.lower(Part.part_code) == q.lower(), 0),
+            (Part.part_code.ilike(prefix), 1),
+            (Part.name.ilike(prefix), 2),
+            else_=3,
+        )
+        return query.order_by(relevance, Part.name, Part.id)
+
+    def index(self, entries: Iterable[PartSearchEntry]) -> None:
+        """Add or refresh ``(id, part_code, name)`` entries in the search index."""
+
+    def remove(self, part_ids: Iterable[int]) -> None:
+        """Drop parts from the search index."""
+
+    def rebuild(self) -> int:
+        """Rebuild the search index from the parts table; return indexed rows."""
+
+        return 0
+
+
+class TrigramPartSearch(PartSearchBackend):
+    """PostgreSQL search served by ``pg_trgm`` GIN indexes.
+
+    ``ILIKE`` patterns are answered from the trigram indexes and results are
+    ranked by trigram similarity. The indexes are maintained by PostgreSQL, so
+    the sync hooks are no-ops.
+    """
+
+    def rank(self, query, q: str):
+        similarity = func.greatest(func.similarity(Part.name, q), func.similarity(Part.part_code, q))
+        return query.order_by(similarity.desc(), Part.id)
+
+
+class Fts5PartSearch(PartSearchBackend):
+    """SQLite search backed by an FTS5 trigram table keyed by part id."""
+
+    # The trigram tokenizer cannot match terms shorter than three characters.
+    MIN_QUERY_LENGTH = 3
+
+    def filter(self, query, q: str):
+        if len(q) < self.MIN_QUERY_LENGTH:
+            return super().filter(query, q)
+        return query.filter(Part.id.in_(select(_parts_fts.c.rowid).where(self._match(q))))
+
+    def rank(self, query, q: str):
+        if len(q) < self.MIN_QUERY_LENGTH:
+            return super().rank(query, q)
+        matches = select(_parts_fts.c.rowid, _parts_fts.c.rank).where(self._match(q)).subquery()
+        return query.join(matches, matches.c.rowid == Part.id).order_by(matches.c.rank, Part.id)
+
+    def index(self, entries: Iterable[PartSearchEntry]) -> None:
+        rows = [{"rowid": part_id, "part_code": part_code, "name": name} for part_id, part_code, name in entries]
+        if not rows:
+            return
+        self.remove(row["rowid"] for row in rows)
+        self.session.execute(insert(_parts_fts), rows)
+
+    def remove(self, part_ids: Iterable[int]) -> None:
+        ids = list(part_ids)
+        if ids:
+            self.session.execute(delete(_parts_fts).where(_parts_fts.c.rowid.in_(ids)))
+
+    def rebuild(self) -> int:
+        self.session.execute(delete(_parts_fts))
+        source = select(Part.id, Part.part_code, Part.name).where(Part.is_deleted.is_(False))
+        result = self.session.execute(
+            insert(_parts_fts).from_select(["rowid", "part_code", "name"], source)
+        )
+        return result.rowcount
+
+    @staticmethod
+    def _match(q: str):
+        phrase = '"' + q.replace('"', '""') + '"'
+        return literal_column(PARTS_FTS_TABLE).op("MATCH")(phrase)
+
+
+def get_part_search_backend(session: Session) -> PartSearchBackend:
+    """Return the search backend matching the session's database dialect."""
+
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return TrigramPartSearch(session)
+    if dialect == "sqlite":
+        return Fts5PartSearch(session)
+    return PartSearchBackend(session)
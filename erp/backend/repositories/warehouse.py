@@ -1,12 +1,40 @@
 """Warehouse repositories."""
 from __future__ import annotations
 
-from typing import Iterable, Optional
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, Mapping, Optional
 
-from sqlalchemy import or_
+from sqlalchemy import and_, bindparam, delete, func, insert, literal, or_, select, tuple_, type_coerce, union_all, update
 from sqlalchemy.orm import Session
 
-from erp.backend.models.warehouse import AuditLog, Part
+from erp.backend.core.database import dialect_insert
+from erp.backend.core.pagination import decode_keyset_cursor, keyset_paginate
+from erp.backend.models.warehouse import (
+    AuditLog,
+    Category,
+    ImportJob,
+    ImportJobStatus,
+    Location,
+    Part,
+    PartValuation,
+    StockMovement,
+    Vendor,
+    change_seq_watermark,
+    next_change_seq,
+)
+from erp.backend.repositories.search import get_part_search_backend
+
+
+SORTABLE_FIELDS = {"name", "part_code", "qty_on_hand", "price"}
+# Columns written by imports, compared to detect no-op upserts.
+IMPORT_COLUMNS = ("name", "description", "qty_on_hand", "min_stock", "price", "currency")
+
+
+ValuationKey = tuple[int, int, str]
+ValuationTotals = tuple[int, Decimal, Decimal]
+VALUATION_FIELDS = ("category_id", "location_id", "currency", "qty_on_hand", "price")
 
 
 class PartRepository:
@@ -14,6 +42,7 @@ class PartRepository:
 
     def __init__(self, session: Session):
         self.session = session
+        self.text_search = get_part_search_backend(session)
 
     def query(self):
         return self.session.query(Part).filter(Part.is_deleted.is_(False))
@@ -21,23 +50,40 @@ class PartRepository:
     def get_by_id(self, part_id: int) -> Optional[Part]:
         return self.session.get(Part, part_id)
 
+    def get_version(self, part_id: int) -> Optional[int]:
+        stmt = select(Part.version).where(Part.id == part_id, Part.is_deleted.is_(False))
+        return self.session.execute(stmt).scalar_one_or_none()
+
+    def change_marker(
+        self,
+        q: Optional[str],
+        category_id: Optional[int],
+        location_id: Optional[int],
+        vendor_id: Optional[int],
+        low_stock: bool,
+    ) -> tuple:
+        """Return a cheap aggregate that changes whenever the filtered set changes."""
+
+        return tuple(
+            self.filter(q, category_id, location_id, vendor_id, low_stock)
+            .with_entities(func.count(Part.id), func.max(Part.id), func.max(Part.updated_at), func.sum(Part.version))
+            .one()
+        )
+
     def get_by_code(self, part_code: str) -> Optional[Part]:
         return self.session.query(Part).filter(Part.part_code == part_code).first()
 
-    def search(
+    def filter(
         self,
         q: Optional[str],
         category_id: Optional[int],
         location_id: Optional[int],
         vendor_id: Optional[int],
         low_stock: bool,
-        sort_field: str,
-        sort_dir: str,
     ):
         query = self.query()
         if q:
-            pattern = f"%{q}%"
-            query = query.filter(or_(Part.name.ilike(pattern), Part.part_code.ilike(pattern)))
+            query = self.text_search.filter(query, q)
         if category_id:
             query = query.filter(Part.category_id == category_id)
         if location_id:
@@ -45,23 +91,269 @@ class PartRepository:
         if vendor_id:
             query = query.filter(Part.vendor_id == vendor_id)
         if low_stock:
-            query = query.filter(Part.qty_on_hand <= Part.min_stock)
-        if sort_field in {"name", "part_code", "qty_on_hand", "price"}:
-            column = getattr(Part, sort_field)
-            if sort_dir == "desc":
-                column = column.desc()
-            query = query.order_by(column)
-        else:
-            query = query.order_by(Part.name)
+            query = query.filter(Part.is_low_stock.is_(True))
         return query
 
+    def facet_counts(
+        self,
+        q: Optional[str],
+        category_id: Optional[int],
+        location_id: Optional[int],
+        vendor_id: Optional[int],
+        low_stock: bool,
+    ) -> list[tuple[str, Optional[int], Optional[str], int]]:
+        """Return ``(facet, value_id, name, count)`` rows for all facets in one query."""
+
+        filtered_cte = (
+            self.filter(q, category_id, location_id, vendor_id, low_stock)
+            .with_entities(Part.category_id, Part.location_id, Part.vendor_id)
+            .cte("filtered_parts")
+        )
+
+        def grouped(facet: str, value_column, model):
+            return (
+                select(
+                    literal(facet).label("facet"),
+                    value_column.label("value_id"),
+                    model.name.label("name"),
+                    func.count().label("count"),
+                )
+                .select_from(filtered_cte.outerjoin(model, model.id == value_column))
+                .group_by(value_column, model.name)
+            )
+
+        stmt = union_all(
+            grouped("category", filtered_cte.c.category_id, Category),
+            grouped("location", filtered_cte.c.location_id, Location),
+            grouped("vendor", filtered_cte.c.vendor_id, Vendor),
+        )
+        return [tuple(row) for row in self.session.execute(stmt)]
+
+    def low_stock(self, cursor: Optional[str], page_size: int) -> tuple[list[Part], Optional[str], Optional[str]]:
+        query = self.query().filter(Part.is_low_stock.is_(True))
+        return keyset_paginate(query, (Part.id,), False, cursor, page_size)
+
+    def count_low_stock(self) -> int:
+        stmt = select(func.count()).select_from(Part).where(Part.is_low_stock.is_(True), Part.is_deleted.is_(False))
+        return self.session.execute(stmt).scalar_one()
+
+    @staticmethod
+    def sort_column(sort_field: str):
+        if sort_field in SORTABLE_FIELDS:
+            return getattr(Part, sort_field)
+        return Part.name
+
+    def search(
+        self,
+        q: Optional[str],
+        category_id: Optional[int],
+        location_id: Optional[int],
+        vendor_id: Optional[int],
+        low_stock: bool,
+        sort_field: str,
+        sort_dir: str,
+    ):
+        query = self.filter(q, category_id, location_id, vendor_id, low_stock)
+        if sort_field == "relevance" and q:
+            return self.text_search.rank(query, q)
+        column = self.sort_column(sort_field)
+        if sort_field in SORTABLE_FIELDS and sort_dir == "desc":
+            return query.order_by(column.desc(), Part.id.desc())
+        return query.order_by(column, Part.id)
+
+    def search_keyset(
+        self,
+        q: Optional[str],
+        category_id: Optional[int],
+        location_id: Optional[int],
+        vendor_id: Optional[int],
+        low_stock: bool,
+        sort_field: str,
+        sort_dir: str,
+        cursor: Optional[str],
+        page_size: int,
+    ) -> tuple[list[Part], Optional[str], Optional[str]]:
+        query = self.filter(q, category_id, location_id, vendor_id, low_stock)
+        column = self.sort_column(sort_field)
+        descending = sort_field in SORTABLE_FIELDS and sort_dir == "desc"
+        return keyset_paginate(query, (column, Part.id), descending, cursor, page_size)
+
+    def check_keyset_cursor(self, sort_field: str, cursor: str) -> None:
+        """Raise :class:`InvalidCursorError` unless ``cursor`` fits :meth:`search_keyset` for ``sort_field``."""
+
+        decode_keyset_cursor(cursor, (self.sort_column(sort_field), Part.id))
+
     def create(self, part: Part) -> Part:
         self.session.add(part)
         self.session.flush()
+        self.text_search.index([(part.id, part.part_code, part.name)])
         return part
 
+    def export_statement(self, query, column_names: list[str], with_lookup_names: bool):
+        """Project ``query`` onto plain export columns for a Core select.
+
+        Lookup names come from outer joins in the same statement, so exporting
+        them needs no relationship loads and no ORM entities.
+        """
+
+        columns = [getattr(Part, name) for name in column_names]
+        if with_lookup_names:
+            query = (
+                query.outerjoin(Category, Category.id == Part.category_id)
+                .outerjoin(Location, Location.id == Part.location_id)
+                .outerjoin(Vendor, Vendor.id == Part.vendor_id)
+            )
+            columns += [Category.name.label("category"), Location.name.label("location"), Vendor.name.label("vendor")]
+        return columns, query.with_entities(*columns).statement
+
+    def iter_code_names(self, batch_size: int = 5000) -> Iterable[tuple[int, str, str]]:
+        stmt = (
+            select(Part.id, Part.part_code, Part.name)
+            .where(Part.is_deleted.is_(False))
+            .execution_options(yield_per=batch_size)
+        )
+        for part_id, part_code, name in self.session.execute(stmt):
+            yield part_id, part_code, name
+
+    def existing_codes(self, part_codes: Iterable[str]) -> set[str]:
+        codes = list(part_codes)
+        if not codes:
+            return set()
+        stmt = select(Part.part_code).where(Part.part_code.in_(codes))
+        return set(self.session.execute(stmt).scalars())
+
+    def bulk_create(self, rows: list[dict[str, object]]) -> list[int]:
+        stmt = insert(Part).returning(Part.id, sort_by_parameter_order=True)
+        part_ids = list(self.session.scalars(stmt, rows))
+        self.text_search.index(
+            (part_id, str(row["part_code"]), str(row["name"])) for part_id, row in zip(part_ids, rows)
+        )
+        return part_ids
+
+    def import_snapshot(self, part_codes: Iterable[str]) -> dict[str, dict[str, object]]:
+        """Return the importable values, grouping and deleted flag of parts keyed by code."""
+
+        codes = list(part_codes)
+        if not codes:
+            return {}
+        columns = [getattr(Part, name) for name in IMPORT_COLUMNS]
+        stmt = select(Part.part_code, Part.is_deleted, Part.category_id, Part.location_id, *columns).where(
+            Part.part_code.in_(codes)
+        )
+        return {row.part_code: row._asdict() for row in self.session.execute(stmt)}
+
+    def upsert(self, rows: list[dict[str, object]]) -> dict[str, int]:
+        """Insert ``rows`` or update the live part sharing their ``part_code``.
+
+        Conflicting rows are only rewritten when a value differs, so the returned
+        ``part_code -> id`` mapping covers inserted and actually updated parts.
+        """
+
+        stmt = dialect_insert(self.session, Part)
+        changed = or_(*(getattr(Part, name).is_distinct_from(stmt.excluded[name]) for name in IMPORT_COLUMNS))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Part.part_code],
+            set_={
+                **{name: stmt.excluded[name] for name in IMPORT_COLUMNS},
+                "version": Part.version + 1,
+                "updated_at": func.now(),
+                "change_seq": next_change_seq(),
+            },
+            where=Part.is_deleted.is_(False) & changed,
+        ).returning(Part.id, Part.part_code)
+        part_ids = {part_code: part_id for part_id, part_code in self.session.execute(stmt, rows)}
+        self.text_search.index(
+            (part_ids[row["part_code"]], str(row["part_code"]), str(row["name"]))
+            for row in rows
+            if row["part_code"] in part_ids
+        )
+        return part_ids
+
+    def change_watermark(self) -> int:
+        return self.session.execute(select(change_seq_watermark())).scalar_one()
+
+    def changed_since(
+        self, watermark: int, after: Optional[tuple[int, int]], limit: int, include_deleted: bool
+    ) -> list[Part]:
+        """Return parts with ``change_seq >= watermark`` in ``(change_seq, id)`` order after ``after``."""
+
+        stmt = select(Part).where(Part.change_seq >= watermark)
+        if not include_deleted:
+            stmt = stmt.where(Part.is_deleted.is_(False))
+        if after is not None:
+            stmt = stmt.where(tuple_(Part.change_seq, Part.id) > tuple_(*after))
+        stmt = stmt.order_by(Part.change_seq, Part.id).limit(limit)
+        return list(self.session.execute(stmt).scalars())
+
+    def valuation_values(self, ids: Iterable[int]) -> dict[int, dict[str, object]]:
+        """Return the columns that feed the valuation rollup for live parts keyed by id."""
+
+        ids = list(ids)
+        if not ids:
+            return {}
+        columns = [getattr(Part, name) for name in VALUATION_FIELDS]
+        stmt = select(Part.id, *columns).where(Part.id.in_(ids), Part.is_deleted.is_(False))
+        return {row.id: row._asdict() for row in self.session.execute(stmt)}
+
+    def ids_by_code(self, part_codes: Iterable[str]) -> dict[str, int]:
+        codes = list(part_codes)
+        if not codes:
+            return {}
+        stmt = select(Part.part_code, Part.id).where(Part.part_code.in_(codes), Part.is_deleted.is_(False))
+        return {part_code: part_id for part_code, part_id in self.session.execute(stmt)}
+
+    def apply_stock_deltas(self, deltas: Mapping[int, Decimal]) -> None:
+        """Add ``deltas`` to ``qty_on_hand`` in the database as one executemany UPDATE."""
+
+        if not deltas:
+            return
+        parts = Part.__table__
+        stmt = (
+            update(parts)
+            .where(parts.c.id == bindparam("b_part_id"))
+            .values(qty_on_hand=parts.c.qty_on_hand + bindparam("b_delta"), version=parts.c.version + 1)
+        )
+        self.session.execute(stmt, [{"b_part_id": part_id, "b_delta": delta} for part_id, delta in deltas.items()])
+
+    def filtered_ids(
+        self,
+        q: Optional[str],
+        category_id: Optional[int],
+        location_id: Optional[int],
+        vendor_id: Optional[int],
+        low_stock: bool,
+    ) -> list[int]:
+        query = self.filter(q, category_id, location_id, vendor_id, low_stock).with_entities(Part.id)
+        return [part_id for (part_id,) in query.order_by(Part.id)]
+
+    def live_ids(self, part_ids: Iterable[int]) -> list[int]:
+        ids = list(part_ids)
+        if not ids:
+            return []
+        stmt = select(Part.id).where(Part.id.in_(ids), Part.is_deleted.is_(False)).order_by(Part.id)
+        return list(self.session.execute(stmt).scalars())
+
+    def bulk_update(self, part_ids: list[int], changes: Mapping[str, object]) -> None:
+        """Apply the same ``changes`` to ``part_ids`` with one set-based UPDATE."""
+
+        if not part_ids:
+            return
+        stmt = update(Part).where(Part.id.in_(part_ids)).values(**changes, version=Part.version + 1)
+        self.session.execute(stmt)
+
+    def negative_stock_codes(self, part_ids: Iterable[int]) -> list[str]:
+        ids = list(part_ids)
+        if not ids:
+            return []
+        stmt = select(Part.part_code).where(Part.id.in_(ids), Part.qty_on_hand < 0).order_by(Part.part_code)
+        return list(self.session.execute(stmt).scalars())
+
+    def reindex(self, part: Part) -> None:
+        self.text_search.index([(part.id, part.part_code, part.name)])
+
     def soft_delete(self, part: Part) -> None:
         part.is_deleted = True
+        self.text_search.remove([part.id])
 
 
 class AuditLogRepository:
@@ -70,16 +362,221 @@ class AuditLogRepository:
     def __init__(self, session: Session):
         self.session = session
 
-    def create(self, entity_type: str, entity_id: int, action: str, user_id: Optional[int], changes: str | None) -> AuditLog:
+    def create(
+        self, entity_type: str, entity_id: int, action: str, user_id: Optional[int], changes: dict | None
+    ) -> AuditLog:
         entry = AuditLog(entity_type=entity_type, entity_id=entity_id, action=action, user_id=user_id, changes=changes)
         self.session.add(entry)
         self.session.flush()
         return entry
 
-    def list_for_entity(self, entity_type: str, entity_id: int) -> Iterable[AuditLog]:
-        return (
-            self.session.query(AuditLog)
-            .filter(AuditLog.entity_type == entity_type, AuditLog.entity_id == entity_id)
-            .order_by(AuditLog.created_at.desc())
-            .all()
+    def bulk_create(self, entries: list[dict[str, object]]) -> None:
+        if entries:
+            self.session.execute(insert(AuditLog), entries)
+
+    def list_for_entity(
+        self,
+        entity_type: str,
+        entity_id: int,
+        cursor: Optional[str],
+        page_size: int,
+        field: Optional[str] = None,
+        action: Optional[str] = None,
+    ) -> tuple[list[AuditLog], Optional[str], Optional[str]]:
+        """Return a newest-first page of an entity's history.
+
+        The page is one range scan of ``ix_audit_logs_entity_type_entity_id_created_at``;
+        ``field`` keeps only entries whose ``changes`` contain that key.
+        """
+
+        query = self.session.query(AuditLog).filter(
+            AuditLog.entity_type == entity_type, AuditLog.entity_id == entity_id
+        )
+        if action:
+            query = query.filter(AuditLog.action == action)
+        if field:
+            query = query.filter(self._has_change(field))
+        return keyset_paginate(query, (AuditLog.created_at, AuditLog.id), True, cursor, page_size)
+
+    def _has_change(self, field: str):
+        if self.session.get_bind().dialect.name == "postgresql":
+            return AuditLog.changes.op("?")(field)
+        return func.json_type(AuditLog.changes, "$." + json.dumps(field)).is_not(None)
+
+
+class LookupRepository:
+    """Repository for the category, location and vendor lookup tables."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def list(self, model: type[Category] | type[Location] | type[Vendor]) -> list:
+        return list(self.session.execute(select(model).order_by(model.name)).scalars())
+
+
+class ValuationRepository:
+    """Repository for the ``part_valuations`` rollup."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def apply(self, rows: list[dict[str, object]]) -> None:
+        """Add signed per-group deltas to the rollup with atomic increments."""
+
+        if not rows:
+            return
+        stmt = dialect_insert(self.session, PartValuation)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PartValuation.category_id, PartValuation.location_id, PartValuation.currency],
+            set_={
+                "part_count": PartValuation.part_count + stmt.excluded.part_count,
+                "qty_on_hand": PartValuation.qty_on_hand + stmt.excluded.qty_on_hand,
+                "total_value": PartValuation.total_value + stmt.excluded.total_value,
+                "updated_at": func.now(),
+            },
         )
+        self.session.execute(stmt, rows)
+
+    def stored_totals(self) -> dict[ValuationKey, ValuationTotals]:
+        stmt = select(
+            PartValuation.category_id,
+            PartValuation.location_id,
+            PartValuation.currency,
+            PartValuation.part_count,
+            PartValuation.qty_on_hand,
+            PartValuation.total_value,
+        )
+        return {(row[0], row[1], row[2]): (row[3], row[4], row[5]) for row in self.session.execute(stmt)}
+
+    def actual_totals(self) -> dict[ValuationKey, ValuationTotals]:
+        """Aggregate the live parts table the way the rollup groups it."""
+
+        category_id = func.coalesce(Part.category_id, 0)
+        location_id = func.coalesce(Part.location_id, 0)
+        stmt = (
+            select(
+                category_id,
+                location_id,
+                Part.currency,
+                func.count(),
+                type_coerce(func.coalesce(func.sum(Part.qty_on_hand), 0), PartValuation.qty_on_hand.type),
+                type_coerce(
+                    func.coalesce(func.sum(Part.qty_on_hand * Part.price), 0), PartValuation.total_value.type
+                ),
+            )
+            .where(Part.is_deleted.is_(False))
+            .group_by(category_id, location_id, Part.currency)
+        )
+        return {(row[0], row[1], row[2]): (row[3], row[4], row[5]) for row in self.session.execute(stmt)}
+
+    def delete_empty(self) -> None:
+        self.session.execute(
+            delete(PartValuation).where(
+                PartValuation.part_count == 0, PartValuation.qty_on_hand == 0, PartValuation.total_value == 0
+            )
+        )
+
+    def report(self):
+        """Return non-empty rollup groups with category and location names."""
+
+        stmt = (
+            select(
+                PartValuation.category_id,
+                Category.name.label("category"),
+                PartValuation.location_id,
+                Location.name.label("location"),
+                PartValuation.currency,
+                PartValuation.part_count,
+                PartValuation.qty_on_hand,
+                PartValuation.total_value,
+            )
+            .outerjoin(Category, Category.id == PartValuation.category_id)
+            .outerjoin(Location, Location.id == PartValuation.location_id)
+            .where(PartValuation.part_count != 0)
+            .order_by(PartValuation.currency, Category.name, Location.name)
+        )
+        return self.session.execute(stmt).all()
+
+
+class StockMovementRepository:
+    """Repository for the stock movement ledger."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def bulk_create(self, entries: list[dict[str, object]]) -> None:
+        if entries:
+            self.session.execute(insert(StockMovement), entries)
+
+
+class ImportJobRepository:
+    """Repository for background import jobs."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get(self, job_id: int) -> Optional[ImportJob]:
+        return self.session.get(ImportJob, job_id)
+
+    def create(self, job: ImportJob) -> ImportJob:
+        self.session.add(job)
+        self.session.flush()
+        return job
+
+    def claim(self, job_id: int, holder: str, now: datetime) -> bool:
+        """Atomically move a queued job to running; return whether this caller won."""
+
+        stmt = (
+            update(ImportJob)
+            .where(ImportJob.id == job_id, ImportJob.status == ImportJobStatus.QUEUED)
+            .values(status=ImportJobStatus.RUNNING, claimed_by=holder, heartbeat_at=now)
+        )
+        return self.session.execute(stmt).rowcount == 1
+
+    @staticmethod
+    def _stalled(stale_before: datetime):
+        """Running jobs, and queued jobs nobody claimed, with no heartbeat since ``stale_before``.
+
+        Jobs with a later heartbeat belong to a live worker or were just
+        queued, and are left alone.
+        """
+
+        return and_(
+            or_(
+                ImportJob.status == ImportJobStatus.RUNNING,
+                and_(ImportJob.status == ImportJobStatus.QUEUED, ImportJob.claimed_by.is_(None)),
+            ),
+            or_(ImportJob.heartbeat_at.is_(None), ImportJob.heartbeat_at < stale_before),
+        )
+
+    def requeue(self, job_id: int, stale_before: datetime, now: datetime) -> bool:
+        """Queue a failed or stalled job again; return whether it was requeued."""
+
+        stmt = (
+            update(ImportJob)
+            .where(
+                ImportJob.id == job_id,
+                or_(ImportJob.status == ImportJobStatus.FAILED, self._stalled(stale_before)),
+            )
+            .values(
+                status=ImportJobStatus.QUEUED,
+                claimed_by=None,
+                heartbeat_at=now,
+                error_message=None,
+                finished_at=None,
+            )
+        )
+        return self.session.execute(stmt).rowcount == 1
+
+    def requeue_interrupted(self, stale_before: datetime, now: datetime) -> list[int]:
+        """Requeue every stalled job and return their ids."""
+
+        stalled = self._stalled(stale_before)
+        job_ids = list(self.session.execute(select(ImportJob.id).where(stalled)).scalars())
+        if job_ids:
+            self.session.execute(
+                update(ImportJob)
+                .where(ImportJob.id.in_(job_ids), stalled)
+                .values(status=ImportJobStatus.QUEUED, claimed_by=None, heartbeat_at=now)
+            )
+        return job_ids
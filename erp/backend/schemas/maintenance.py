@@ -7,7 +7,7 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
-from erp.backend.models.maintenance import WorkOrderStatus, WorkOrderType
+from erp.backend.models.maintenance import PMGenerationStatus, WorkOrderStatus, WorkOrderType
 
 
 class EquipmentBase(BaseModel):
@@ -130,3 +130,24 @@ class GenerateDueResponse(BaseModel):
     """Response summarizing generated work orders."""
 
     created_work_orders: int
+    due_plans: int = 0
+    skipped_existing: int = 0
+    run_id: Optional[int] = None
+
+
+class PMGenerationRunRead(BaseModel):
+    """Recorded PM due-generation run."""
+
+    id: int
+    trigger: str
+    status: PMGenerationStatus
+    reference_date: date
+    started_at: datetime
+    finished_at: datetime
+    duration_ms: int
+    due_plans: int
+    created_work_orders: int
+    skipped_existing: int
+    error: Optional[str] = None
+
+    model_config = {"from_attributes": True}
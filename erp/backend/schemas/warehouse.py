@@ -1,10 +1,14 @@
 """Warehouse schemas."""
 from __future__ import annotations
 
+from datetime import datetime
 from decimal import Decimal
+from enum import Enum
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from erp.backend.models.warehouse import ImportJobStatus, ImportMode
 
 
 class CategoryRead(BaseModel):
@@ -72,6 +76,49 @@ class PartUpdate(BaseModel):
     currency: Optional[str] = Field(default=None, min_length=3, max_length=3)
 
 
+class PartBulkFilter(BaseModel):
+    """Search filter selecting the parts of a bulk update."""
+
+    q: Optional[str] = None
+    category_id: Optional[int] = None
+    location_id: Optional[int] = None
+    vendor_id: Optional[int] = None
+    low_stock: bool = False
+
+
+class PartBulkChanges(BaseModel):
+    """Fields that can be set on many parts at once."""
+
+    category_id: Optional[int] = None
+    location_id: Optional[int] = None
+    vendor_id: Optional[int] = None
+    min_stock: Optional[Decimal] = Field(default=None, ge=0)
+    price: Optional[Decimal] = Field(default=None, ge=0)
+    currency: Optional[str] = Field(default=None, min_length=3, max_length=3)
+
+    @field_validator("min_stock", "price", "currency")
+    @classmethod
+    def _not_null(cls, value: object) -> object:
+        # Omitted fields keep their value; an explicit null cannot be stored in these columns.
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+
+class PartBulkUpdate(BaseModel):
+    """Bulk update payload: either explicit ids or a filter, plus the changes."""
+
+    ids: Optional[list[int]] = Field(default=None, max_length=50000)
+    filter: Optional[PartBulkFilter] = None
+    changes: PartBulkChanges
+
+
+class PartBulkUpdateResult(BaseModel):
+    """Number of parts changed by a bulk update."""
+
+    updated: int
+
+
 class PartRead(PartBase):
     """Part response model."""
 
@@ -81,12 +128,162 @@ class PartRead(PartBase):
     model_config = {"from_attributes": True}
 
 
+class PartChanges(BaseModel):
+    """Parts created, updated or deleted after a sync token."""
+
+    upserts: list[PartRead] = Field(default_factory=list)
+    deleted: list[int] = Field(default_factory=list)
+    next_token: str
+    has_more: bool = False
+
+
+class PartSuggestion(BaseModel):
+    """Autocomplete entry for a part."""
+
+    id: int
+    part_code: str
+    name: str
+
+
+class FacetBucket(BaseModel):
+    """Count of parts sharing one facet value."""
+
+    id: int | None = None
+    name: str | None = None
+    count: int
+
+
+class PartFacets(BaseModel):
+    """Per-facet part counts for a search filter set."""
+
+    category: list[FacetBucket] = Field(default_factory=list)
+    location: list[FacetBucket] = Field(default_factory=list)
+    vendor: list[FacetBucket] = Field(default_factory=list)
+
+
+class CacheStats(BaseModel):
+    """Hit and miss counters of an in-process cache."""
+
+    hits: int
+    misses: int
+    size: int
+
+
+class ValuationRow(BaseModel):
+    """Stock value of the live parts in one category, location and currency."""
+
+    category_id: int | None = None
+    category: str | None = None
+    location_id: int | None = None
+    location: str | None = None
+    currency: str
+    parts: int
+    qty_on_hand: Decimal
+    value: Decimal
+
+
+class ValuationTotal(BaseModel):
+    """Stock value of all live parts in one currency."""
+
+    currency: str
+    parts: int = 0
+    value: Decimal = Decimal("0")
+
+
+class InventoryValuation(BaseModel):
+    """Inventory valuation rollup."""
+
+    rows: list[ValuationRow] = Field(default_factory=list)
+    totals: list[ValuationTotal] = Field(default_factory=list)
+
+
+class ValuationReconcileResult(BaseModel):
+    """Outcome of a valuation rollup reconcile run."""
+
+    corrected: int
+
+
+class StockAdjustmentLine(BaseModel):
+    """Single stock quantity change for a part."""
+
+    part_code: str
+    delta: Decimal
+    reason: Optional[str] = Field(default=None, max_length=255)
+
+
+class StockAdjustmentRequest(BaseModel):
+    """Batch of stock adjustments applied atomically."""
+
+    lines: list[StockAdjustmentLine] = Field(min_length=1, max_length=50000)
+
+
+class StockAdjustmentResult(BaseModel):
+    """Summary of an applied stock adjustment batch."""
+
+    lines: int
+    parts: int
+
+
+class PartExportColumns(str, Enum):
+    """Column set written by the parts export."""
+
+    BASIC = "basic"
+    FULL = "full"
+
+
 class ImportResult(BaseModel):
     """Result summary for import operation."""
 
     created: int
+    updated: int = 0
+    unchanged: int = 0
+    skipped: int
+    errors: int
+
+
+class ImportRowError(BaseModel):
+    """Validation problems found on one import row."""
+
+    row: int = Field(description="Spreadsheet row number; the header is row 1")
+    part_code: Optional[str] = None
+    errors: list[str]
+
+
+class ImportValidationReport(BaseModel):
+    """Dry-run result for an import file.
+
+    ``errors`` lists rows the import would count as errors and
+    ``skipped_rows`` those it would skip, each with the reason.
+    """
+
+    rows: int
+    valid: int
+    invalid: int
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    skipped: int = 0
+    errors: list[ImportRowError] = Field(default_factory=list)
+    skipped_rows: list[ImportRowError] = Field(default_factory=list)
+
+
+class ImportJobRead(BaseModel):
+    """Progress of a background import job."""
+
+    id: int
+    filename: str
+    status: ImportJobStatus
+    mode: ImportMode = ImportMode.ADD
+    rows_done: int
+    created: int
+    updated: int = 0
+    unchanged: int = 0
     skipped: int
     errors: int
+    rows_per_second: float | None = None
+    error_message: str | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
 
 
 class AuditLogRead(BaseModel):
@@ -97,6 +294,7 @@ class AuditLogRead(BaseModel):
     entity_id: int
     action: str
     user_id: int | None = None
-    changes: str | None = None
+    changes: dict | None = None
+    created_at: datetime
 
     model_config = {"from_attributes": True}
@@ -0,0 +1,103 @@
+"""Background worker pool for warehouse import jobs."""
+from __future__ import annotations
+
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from erp.backend.config import get_settings
+from erp.backend.core.database import SessionLocal
+from erp.backend.core.locks import lock_holder
+from erp.backend.core.periodic import PeriodicTask
+from erp.backend.services.warehouse import WarehouseService
+
+logger = logging.getLogger(__name__)
+
+
+class ImportJobRunner:
+    """Process queued import jobs on a thread pool, one session per job.
+
+    A periodic sweep resubmits jobs whose worker died, including those left
+    behind by another process.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        storage_dir: str | None = None,
+        max_workers: int | None = None,
+        stale_seconds: float | None = None,
+        sweep_interval_seconds: float | None = None,
+    ):
+        settings = get_settings()
+        self.session_factory = session_factory
+        self.storage_dir = storage_dir or settings.import_storage_dir
+        self.max_workers = max_workers or settings.import_job_workers
+        self.stale_seconds = settings.import_job_stale_seconds if stale_seconds is None else stale_seconds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if sweep_interval_seconds is None:
+            sweep_interval_seconds = settings.import_job_sweep_interval_seconds
+        self._sweep = PeriodicTask("import-job-sweep", self.resume_interrupted, sweep_interval_seconds)
+
+    def submit(self, job_id: int) -> Future:
+        """Schedule a queued job on the worker pool."""
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="import-job")
+        return self._executor.submit(self.run, job_id)
+
+    def run(self, job_id: int) -> None:
+        """Claim and process a job; failures are recorded on the job row."""
+
+        session = self.session_factory()
+        try:
+            service = WarehouseService(session)
+            if not service.import_jobs.claim(job_id, lock_holder(), datetime.utcnow()):
+                session.rollback()
+                return
+            session.commit()
+            try:
+                service.run_import_job(job_id)
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("Import job %s failed", job_id)
+                session.rollback()
+                service.fail_import_job(job_id, str(exc) or exc.__class__.__name__)
+        finally:
+            session.close()
+
+    def resume_interrupted(self) -> int:
+        """Requeue and resubmit jobs without a heartbeat for ``stale_seconds``.
+
+        Jobs another live worker is still running keep their claim, so they
+        are not run a second time.
+        """
+
+        now = datetime.utcnow()
+        session = self.session_factory()
+        try:
+            job_ids = WarehouseService(session).import_jobs.requeue_interrupted(
+                now - timedelta(seconds=self.stale_seconds), now
+            )
+            session.commit()
+        finally:
+            session.close()
+        for job_id in job_ids:
+            self.submit(job_id)
+        return len(job_ids)
+
+    def start(self) -> None:
+        """Start the stale-job sweep unless it is disabled or already running."""
+
+        self._sweep.start()
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._sweep.shutdown(wait)
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+import_job_runner = ImportJobRunner()
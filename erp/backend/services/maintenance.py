@@ -1,15 +1,24 @@
 """Maintenance service layer."""
 from __future__ import annotations
 
-from datetime import date, datetime, timedelta
+import time
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
+from typing import Iterator, Optional, Sequence
 
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
+from erp.backend.core.compression import compress_chunks
+from erp.backend.core.export import ExportFormat, close_when_done, iter_export, require_export_support
+from erp.backend.core.locks import release_job_lock, try_job_lock
+from erp.backend.core.pagination import InvalidCursorError
 from erp.backend.models.maintenance import (
+    OPEN_WORK_ORDER_STATUSES,
     Equipment,
     MaintenanceHistory,
+    PMGenerationRun,
+    PMGenerationStatus,
     PMPlan,
     PMTemplate,
     WorkOrder,
@@ -19,6 +28,7 @@ from erp.backend.models.maintenance import (
 from erp.backend.repositories.maintenance import (
     EquipmentRepository,
     MaintenanceHistoryRepository,
+    PMGenerationRunRepository,
     PMPlanRepository,
     PMTemplateRepository,
     WorkOrderRepository,
@@ -32,6 +42,11 @@ from erp.backend.schemas.maintenance import (
     WorkOrderUpdate,
 )
 
+HISTORY_EXPORT_COLUMNS = ["work_order_id", "equipment_id", "summary", "downtime_min", "recorded_at"]
+HISTORY_EXPORT_CHUNK_SIZE = 1000
+WORK_ORDER_BATCH_SIZE = 1000
+PM_GENERATION_LOCK = "pm-generation"
+
 
 class MaintenanceService:
     """Service orchestrating maintenance operations."""
@@ -43,6 +58,7 @@ class MaintenanceService:
         self.plan_repo = PMPlanRepository(session)
         self.work_order_repo = WorkOrderRepository(session)
         self.history_repo = MaintenanceHistoryRepository(session)
+        self.run_repo = PMGenerationRunRepository(session)
 
     # Equipment
     def list_equipment(self):
@@ -72,8 +88,32 @@ class MaintenanceService:
         return plan
 
     # Work Orders
-    def list_work_orders(self):
-        return self.work_order_repo.list()
+    def list_work_orders(
+        self,
+        statuses: Optional[Sequence[WorkOrderStatus]] = None,
+        equipment_id: Optional[int] = None,
+        work_order_type: Optional[WorkOrderType] = None,
+        due_from: Optional[date] = None,
+        due_to: Optional[date] = None,
+        cursor: Optional[str] = None,
+        page_size: int = 50,
+    ) -> tuple[list[WorkOrder], Optional[str], Optional[str]]:
+        """Return a keyset page of work orders; without a status filter only open ones are listed."""
+
+        if due_from is not None and due_to is not None and due_from > due_to:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="due_from must not be after due_to")
+        try:
+            return self.work_order_repo.list_page(
+                statuses or OPEN_WORK_ORDER_STATUSES,
+                equipment_id,
+                work_order_type,
+                due_from,
+                due_to,
+                cursor,
+                page_size,
+            )
+        except InvalidCursorError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
     def create_work_order(self, payload: WorkOrderCreate) -> WorkOrder:
         work_order = WorkOrder(**payload.model_dump())
@@ -116,26 +156,120 @@ class MaintenanceService:
         return work_order
 
     def generate_due_work_orders(self, reference_date: date | None = None) -> GenerateDueResponse:
+        """Create a PM work order for every occurrence due up to ``reference_date``.
+
+        Due plans are read joined to their templates in one query; a plan that
+        is several periods overdue gets one order per missed occurrence. Orders
+        are inserted in batches and all plans are advanced with one UPDATE.
+        Occurrences that already have an order for the same plan and due date
+        are skipped, so repeating a run never duplicates work orders.
+        """
+
         if reference_date is None:
             reference_date = date.today()
-        plans = self.plan_repo.due_plans(reference_date)
+        rows: list[dict[str, object]] = []
+        next_due_dates: dict[int, date] = {}
+        for plan_id, equipment_id, due_date, frequency_days in self.plan_repo.due_schedules(reference_date):
+            step = timedelta(days=max(frequency_days, 1))
+            while due_date <= reference_date:
+                rows.append(
+                    {
+                        "equipment_id": equipment_id,
+                        "type": WorkOrderType.PM,
+                        "status": WorkOrderStatus.OPEN,
+                        "plan_id": plan_id,
+                        "due_date": due_date,
+                    }
+                )
+                due_date += step
+            next_due_dates[plan_id] = due_date
         created = 0
-        for plan in plans:
-            work_order = WorkOrder(
-                equipment_id=plan.equipment_id,
-                type=WorkOrderType.PM,
-                status=WorkOrderStatus.OPEN,
-                plan_id=plan.id,
-                due_date=plan.next_due_date,
+        for start in range(0, len(rows), WORK_ORDER_BATCH_SIZE):
+            created += self.work_order_repo.create_missing(rows[start : start + WORK_ORDER_BATCH_SIZE])
+        self.plan_repo.advance_due_dates(next_due_dates)
+        return GenerateDueResponse(
+            created_work_orders=created, due_plans=len(next_due_dates), skipped_existing=len(rows) - created
+        )
+
+    def run_pm_generation(self, trigger: str, reference_date: date | None = None) -> Optional[PMGenerationRun]:
+        """Generate due work orders under the PM generation lock and record the run.
+
+        Returns ``None`` without generating anything when another worker holds
+        the lock. The run record belongs to the caller's transaction, and the
+        lock is handed back when that transaction ends.
+        """
+
+        if not try_job_lock(self.session, PM_GENERATION_LOCK):
+            return None
+        if reference_date is None:
+            reference_date = date.today()
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        try:
+            result = self.generate_due_work_orders(reference_date)
+            run = PMGenerationRun(
+                trigger=trigger,
+                status=PMGenerationStatus.COMPLETED,
+                reference_date=reference_date,
+                started_at=started_at,
+                finished_at=datetime.now(timezone.utc),
+                duration_ms=round((time.perf_counter() - started) * 1000),
+                due_plans=result.due_plans,
+                created_work_orders=result.created_work_orders,
+                skipped_existing=result.skipped_existing,
             )
-            self.work_order_repo.add(work_order)
-            created += 1
-            plan.next_due_date = plan.next_due_date + timedelta(days=plan.template.frequency_days)
-        return GenerateDueResponse(created_work_orders=created)
+            return self.run_repo.add(run)
+        finally:
+            release_job_lock(self.session, PM_GENERATION_LOCK)
+
+    def record_failed_pm_generation(
+        self, trigger: str, reference_date: date, started_at: datetime, error: str
+    ) -> PMGenerationRun:
+        finished_at = datetime.now(timezone.utc)
+        run = PMGenerationRun(
+            trigger=trigger,
+            status=PMGenerationStatus.FAILED,
+            reference_date=reference_date,
+            started_at=started_at,
+            finished_at=finished_at,
+            duration_ms=round((finished_at - started_at).total_seconds() * 1000),
+            error=error[:500],
+        )
+        return self.run_repo.add(run)
+
+    def generate_due_now(self) -> GenerateDueResponse:
+        """Run due-generation for a manual trigger, refusing to overlap a running one."""
+
+        run = self.run_pm_generation("manual")
+        if run is None:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="PM generation is already running")
+        return GenerateDueResponse(
+            created_work_orders=run.created_work_orders,
+            due_plans=run.due_plans,
+            skipped_existing=run.skipped_existing,
+            run_id=run.id,
+        )
+
+    def list_pm_generation_runs(self, limit: int):
+        return self.run_repo.list_recent(limit)
 
     def list_history(self):
         return self.history_repo.list()
 
+    def export_history(
+        self,
+        export_format: ExportFormat = ExportFormat.CSV,
+        chunk_size: int = HISTORY_EXPORT_CHUNK_SIZE,
+        content_encoding: Optional[str] = None,
+    ) -> Iterator[str | bytes]:
+        require_export_support(export_format)
+        columns = [getattr(MaintenanceHistory, name) for name in HISTORY_EXPORT_COLUMNS]
+        batches = self.history_repo.iter_row_batches(columns, chunk_size)
+        chunks = iter_export(export_format, columns, batches, "Maintenance history")
+        if content_encoding:
+            chunks = compress_chunks(chunks, content_encoding, "maintenance history")
+        return close_when_done(self.session, chunks)
+
     def _validate_transition(self, current: WorkOrderStatus, new: WorkOrderStatus) -> None:
         valid_transitions = {
             WorkOrderStatus.OPEN: {
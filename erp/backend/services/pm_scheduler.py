@@ -0,0 +1,77 @@
+"""In-process scheduler for PM due-generation."""
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, timezone
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from erp.backend.config import get_settings
+from erp.backend.core.database import SessionLocal
+from erp.backend.core.periodic import PeriodicTask
+from erp.backend.models.maintenance import PMGenerationRun
+from erp.backend.services.maintenance import MaintenanceService
+
+logger = logging.getLogger(__name__)
+
+
+class PMScheduler:
+    """Run :meth:`MaintenanceService.run_pm_generation` on a daemon thread.
+
+    Every worker process runs its own loop; the PM generation lock lets one of
+    them generate per tick and the others skip.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        interval_seconds: float | None = None,
+    ):
+        self.session_factory = session_factory
+        if interval_seconds is None:
+            interval_seconds = get_settings().pm_scheduler_interval_seconds
+        self._task = PeriodicTask("pm-scheduler", self.run_once, interval_seconds)
+
+    def run_once(self, reference_date: date | None = None) -> Optional[PMGenerationRun]:
+        """Generate in a fresh session; return the recorded run, or ``None`` if another worker holds the lock.
+
+        A failed run is rolled back and recorded with its error in a new
+        transaction before the exception propagates.
+        """
+
+        if reference_date is None:
+            reference_date = date.today()
+        started_at = datetime.now(timezone.utc)
+        session = self.session_factory()
+        try:
+            run = MaintenanceService(session).run_pm_generation("scheduler", reference_date)
+            session.commit()
+            if run is None:
+                logger.debug("PM generation skipped; lock held by another worker")
+            else:
+                logger.info(
+                    "PM generation created %s work orders for %s plans in %s ms",
+                    run.created_work_orders,
+                    run.due_plans,
+                    run.duration_ms,
+                )
+            return run
+        except Exception as exc:
+            session.rollback()
+            MaintenanceService(session).record_failed_pm_generation("scheduler", reference_date, started_at, repr(exc))
+            session.commit()
+            raise
+        finally:
+            session.close()
+
+    def start(self) -> None:
+        """Start the periodic loop unless it is disabled or already running."""
+
+        self._task.start()
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._task.shutdown(wait)
+
+
+pm_scheduler = PMScheduler()
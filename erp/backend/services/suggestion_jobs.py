@@ -0,0 +1,50 @@
+"""Periodic rebuild of the part autocomplete index."""
+from __future__ import annotations
+
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from erp.backend.config import get_settings
+from erp.backend.core.database import SessionLocal
+from erp.backend.core.periodic import PeriodicTask
+from erp.backend.services.warehouse import WarehouseService
+
+
+class SuggestionRefresher:
+    """Run :meth:`WarehouseService.reload_part_suggestions` on a daemon thread.
+
+    Each process only applies its own writes to its index; the rebuild brings
+    in parts created, renamed or deleted through other workers.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        interval_seconds: float | None = None,
+    ):
+        self.session_factory = session_factory
+        if interval_seconds is None:
+            interval_seconds = get_settings().part_suggestions_refresh_seconds
+        self._task = PeriodicTask("part-suggestions-refresh", self.run_once, interval_seconds)
+
+    def run_once(self) -> int:
+        """Rebuild in a fresh session and return the number of indexed parts."""
+
+        session = self.session_factory()
+        try:
+            return WarehouseService(session).reload_part_suggestions()
+        finally:
+            session.rollback()
+            session.close()
+
+    def start(self) -> None:
+        """Start the periodic loop unless it is disabled or already running."""
+
+        self._task.start()
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._task.shutdown(wait)
+
+
+suggestion_refresher = SuggestionRefresher()
@@ -0,0 +1,58 @@
+"""Periodic reconcile of the inventory valuation rollup."""
+from __future__ import annotations
+
+import logging
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from erp.backend.config import get_settings
+from erp.backend.core.database import SessionLocal
+from erp.backend.core.periodic import PeriodicTask
+from erp.backend.services.warehouse import WarehouseService
+
+logger = logging.getLogger(__name__)
+
+class ValuationReconciler:
+    """Run :meth:`WarehouseService.reconcile_valuation` on a daemon thread.
+
+    Every worker process runs its own loop; the reconcile lock lets one of
+    them reconcile per tick and the others skip.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        interval_seconds: float | None = None,
+    ):
+        self.session_factory = session_factory
+        if interval_seconds is None:
+            interval_seconds = get_settings().valuation_reconcile_interval_seconds
+        self._task = PeriodicTask("valuation-reconcile", self.run_once, interval_seconds)
+
+    def run_once(self) -> Optional[int]:
+        """Reconcile in a fresh session; return the corrected groups, or ``None`` if another worker holds the lock."""
+
+        session = self.session_factory()
+        try:
+            corrected = WarehouseService(session).reconcile_valuation()
+            session.commit()
+            if corrected is None:
+                logger.debug("Valuation reconcile skipped; lock held by another worker")
+            return corrected
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def start(self) -> None:
+        """Start the periodic loop unless it is disabled or already running."""
+
+        self._task.start()
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._task.shutdown(wait)
+
+
+valuation_reconciler = ValuationReconciler()
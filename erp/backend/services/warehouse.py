@@ -3,16 +3,173 @@ from __future__ import annotations
 
 import csv
 import io
-from dataclasses import asdict, dataclass
-from decimal import Decimal, InvalidOperation
-from typing import Iterable, Optional
+import logging
+import os
+import shutil
+from collections import defaultdict
+from contextlib import closing
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from itertools import islice
+from typing import BinaryIO, Callable, Iterable, Iterator, Mapping, Optional, TypeVar
+from uuid import uuid4
 
 from fastapi import HTTPException, UploadFile, status
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from erp.backend.models.warehouse import AuditLog, Part
-from erp.backend.repositories.warehouse import AuditLogRepository, PartRepository
-from erp.backend.schemas.warehouse import ImportResult, PartCreate, PartUpdate
+from erp.backend.config import get_settings
+from erp.backend.core.cache import LRUCache, TTLCache
+from erp.backend.core.compression import compress_chunks
+from erp.backend.core.conditional import make_etag
+from erp.backend.core.database import run_after_commit
+from erp.backend.core.export import ExportFormat, close_when_done, iter_export, require_export_support
+from erp.backend.core.locks import release_job_lock, try_job_lock
+from erp.backend.core.pagination import InvalidCursorError, decode_sync_token, encode_sync_token
+from erp.backend.core.prefix_index import PrefixIndex
+from erp.backend.models.warehouse import (
+    AuditLog,
+    Category,
+    ImportJob,
+    ImportJobStatus,
+    ImportMode,
+    Location,
+    Part,
+    Vendor,
+)
+from erp.backend.repositories.warehouse import (
+    IMPORT_COLUMNS,
+    VALUATION_FIELDS,
+    AuditLogRepository,
+    ImportJobRepository,
+    LookupRepository,
+    PartRepository,
+    StockMovementRepository,
+    ValuationKey,
+    ValuationRepository,
+)
+from erp.backend.schemas.warehouse import (
+    CategoryRead,
+    FacetBucket,
+    InventoryValuation,
+    ImportJobRead,
+    ImportResult,
+    ImportRowError,
+    ImportValidationReport,
+    LocationRead,
+    PartBulkUpdate,
+    PartBulkUpdateResult,
+    PartChanges,
+    PartCreate,
+    PartExportColumns,
+    PartFacets,
+    PartRead,
+    PartSuggestion,
+    PartUpdate,
+    StockAdjustmentRequest,
+    StockAdjustmentResult,
+    ValuationRow,
+    ValuationTotal,
+    VendorRead,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_FORMATS = (".csv", ".xlsx", ".xls")
+IMPORT_LOOKUP_BATCH_SIZE = 5000
+IMPORT_DECIMAL_FIELDS = ("qty_on_hand", "min_stock", "price")
+# Snapshot values of a part created by an import, before the imported columns.
+NEW_PART_SNAPSHOT = {"is_deleted": False, "category_id": None, "location_id": None}
+IMPORT_DECIMAL_QUANTUMS = {
+    name: Decimal(1).scaleb(-Part.__table__.c[name].type.scale) for name in IMPORT_DECIMAL_FIELDS
+}
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_COLUMNS = ["id", "part_code", "name", "qty_on_hand", "min_stock", "price", "currency"]
+STOCK_ADJUSTMENT_BATCH_SIZE = 1000
+BULK_UPDATE_BATCH_SIZE = 1000
+VALUATION_RECONCILE_LOCK = "valuation-reconcile"
+
+# Process-wide part_code/name autocomplete index, loaded on first use, updated
+# after each committed write made through this process and rebuilt periodically
+# (see services/suggestion_jobs.py) to pick up writes from other processes.
+part_suggestions: PrefixIndex[tuple[int, str, str]] = PrefixIndex()
+# Unfiltered facet counts, cleared after any committed part write.
+part_facets_cache: TTLCache[PartFacets] = TTLCache(get_settings().part_facets_cache_ttl_seconds)
+# Serialized part detail keyed by (id, version); entries of written parts are
+# dropped after commit, and a stale version can never be hit.
+part_detail_cache: LRUCache[PartRead] = LRUCache(get_settings().part_detail_cache_size)
+# Category, location and vendor lists; these tables have no write endpoints.
+lookup_cache: TTLCache[list] = TTLCache(get_settings().lookup_cache_ttl_seconds)
+
+LOOKUP_TABLES = {
+    "categories": (Category, CategoryRead),
+    "locations": (Location, LocationRead),
+    "vendors": (Vendor, VendorRead),
+}
+
+
+def _json_changes(data: Mapping[str, object]) -> dict[str, object]:
+    """Return audit ``changes`` with decimals as strings, as ``model_dump(mode="json")`` does."""
+
+    return {key: str(value) if isinstance(value, Decimal) else value for key, value in data.items()}
+
+
+def _chunked(rows: Iterable[T], size: int) -> Iterator[list[T]]:
+    """Split an iterable into lists of at most ``size`` items."""
+
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class ValuationDeltas:
+    """Signed per-group changes to the ``part_valuations`` rollup."""
+
+    def __init__(self) -> None:
+        self._groups: dict[ValuationKey, list] = {}
+
+    def add(self, values: Mapping[str, object], sign: int = 1) -> None:
+        """Count a part with the given valuation ``values`` in (``sign=1``) or out (``-1``)."""
+
+        key = (values.get("category_id") or 0, values.get("location_id") or 0, str(values["currency"]))
+        qty = Decimal(str(values.get("qty_on_hand") or 0))
+        price = Decimal(str(values.get("price") or 0))
+        group = self._groups.setdefault(key, [0, Decimal("0"), Decimal("0")])
+        group[0] += sign
+        group[1] += sign * qty
+        group[2] += sign * qty * price
+
+    def replace(self, old: Mapping[str, object], new: Mapping[str, object]) -> None:
+        self.add(old, -1)
+        self.add(new)
+
+    def rows(self) -> list[dict[str, object]]:
+        """Return the non-zero groups in key order.
+
+        Every writer upserts rollup rows in the same order, so concurrent
+        transactions cannot lock two groups in opposite orders and deadlock.
+        """
+
+        return [
+            {
+                "category_id": key[0],
+                "location_id": key[1],
+                "currency": key[2],
+                "part_count": count,
+                "qty_on_hand": qty,
+                "total_value": value,
+            }
+            for key, (count, qty, value) in sorted(self._groups.items())
+            if count or qty or value
+        ]
+
+
+def _valuation_values(part: Part) -> dict[str, object]:
+    return {name: getattr(part, name) for name in VALUATION_FIELDS}
 
 
 @dataclass
@@ -20,6 +177,8 @@ class ImportStatistics:
     """Aggregate counters for import results."""
 
     created: int = 0
+    updated: int = 0
+    unchanged: int = 0
     skipped: int = 0
     errors: int = 0
 
@@ -27,12 +186,26 @@ class ImportStatistics:
         return ImportResult(**asdict(self))
 
 
+@dataclass
+class ImportRowPlan:
+    """What importing one row does: ``created``, ``updated``, ``unchanged``, ``skipped`` or ``error``."""
+
+    action: str
+    part_code: Optional[str]
+    data: Optional[dict[str, object]] = None
+    existing: Optional[dict[str, object]] = None
+    reasons: list[str] = field(default_factory=list)
+
+
 class WarehouseService:
     """Service orchestrating warehouse operations."""
 
     def __init__(self, session: Session):
         self.parts = PartRepository(session)
         self.audit = AuditLogRepository(session)
+        self.import_jobs = ImportJobRepository(session)
+        self.movements = StockMovementRepository(session)
+        self.valuations = ValuationRepository(session)
         self.session = session
 
     def list_parts(
@@ -47,6 +220,203 @@ class WarehouseService:
     ):
         return self.parts.search(q, category_id, location_id, vendor_id, low_stock, sort_field, sort_dir)
 
+    def list_parts_keyset(
+        self,
+        q: Optional[str],
+        category_id: Optional[int],
+        location_id: Optional[int],
+        vendor_id: Optional[int],
+        low_stock: bool,
+        sort_field: str,
+        sort_dir: str,
+        cursor: Optional[str],
+        page_size: int,
+        with_total: bool = False,
+    ) -> tuple[list[Part], Optional[str], Optional[str], Optional[int]]:
+        try:
+            items, next_cursor, prev_cursor = self.parts.search_keyset(
+                q, category_id, location_id, vendor_id, low_stock, sort_field, sort_dir, cursor, page_size
+            )
+        except InvalidCursorError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+        total = None
+        if with_total:
+            total = self.parts.filter(q, category_id, location_id, vendor_id, low_stock).count()
+        return items, next_cursor, prev_cursor, total
+
+    def list_low_stock(self, cursor: Optional[str], page_size: int) -> tuple[list[Part], Optional[str], Optional[str], int]:
+        try:
+            items, next_cursor, prev_cursor = self.parts.low_stock(cursor, page_size)
+        except InvalidCursorError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+        return items, next_cursor, prev_cursor, self.parts.count_low_stock()
+
+    def part_changes(self, since: Optional[str], limit: int) -> PartChanges:
+        """Return parts changed after the ``since`` token, or every live part when it is omitted.
+
+        Large change sets are paged with ``has_more``; the token returned with
+        the last page is the watermark for the next sync. Deleted parts are
+        returned as tombstone ids.
+        """
+
+        try:
+            watermark, next_watermark, after = decode_sync_token(since) if since else (0, None, None)
+        except InvalidCursorError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+        if next_watermark is None:
+            # Taken before reading rows, so nothing committed later can fall below it.
+            next_watermark = self.parts.change_watermark()
+        rows = self.parts.changed_since(watermark, after, limit + 1, include_deleted=watermark > 0)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if has_more:
+            next_token = encode_sync_token(watermark, next_watermark, (rows[-1].change_seq, rows[-1].id))
+        else:
+            next_token = encode_sync_token(next_watermark)
+        return PartChanges(
+            upserts=[PartRead.model_validate(part) for part in rows if not part.is_deleted],
+            deleted=[part.id for part in rows if part.is_deleted],
+            next_token=next_token,
+            has_more=has_more,
+        )
+
+    def part_version(self, part_id: int) -> Optional[int]:
+        return self.parts.get_version(part_id)
+
+    @staticmethod
+    def part_etag(part_id: int, version: int) -> str:
+        return make_etag("part", part_id, version)
+
+    def get_part_detail(self, part_id: int, version: Optional[int]) -> PartRead:
+        """Return the serialized part, reading through ``part_detail_cache``.
+
+        ``version`` is the current version already fetched for the ETag; the
+        row itself is only loaded on a cache miss.
+        """
+
+        if version is not None:
+            cached = part_detail_cache.get((part_id, version))
+            if cached is not None:
+                return cached
+        part = self.get_part(part_id)
+        detail = PartRead.model_validate(part)
+        part_detail_cache.set((part.id, part.version), detail)
+        return detail
+
+    def list_lookup(self, table: str) -> list:
+        """Return all rows of a lookup table ordered by name, cached for ``LOOKUP_CACHE_TTL_SECONDS``."""
+
+        items = lookup_cache.get(table)
+        if items is None:
+            model, schema = LOOKUP_TABLES[table]
+            items = [schema.model_validate(row) for row in LookupRepository(self.session).list(model)]
+            lookup_cache.set(table, items)
+        return items
+
+    def inventory_valuation(self) -> InventoryValuation:
+        """Return stock value per category, location and currency from the rollup."""
+
+        rows = [
+            ValuationRow(
+                category_id=row.category_id or None,
+                category=row.category,
+                location_id=row.location_id or None,
+                location=row.location,
+                currency=row.currency,
+                parts=row.part_count,
+                qty_on_hand=row.qty_on_hand,
+                value=row.total_value,
+            )
+            for row in self.valuations.report()
+        ]
+        totals: dict[str, ValuationTotal] = {}
+        for row in rows:
+            total = totals.setdefault(row.currency, ValuationTotal(currency=row.currency))
+            total.parts += row.parts
+            total.value += row.value
+        return InventoryValuation(rows=rows, totals=list(totals.values()))
+
+    def reconcile_valuation(self) -> Optional[int]:
+        """Correct rollup groups that drifted from the parts table.
+
+        Both sides are read from one snapshot (``REPEATABLE READ`` on
+        PostgreSQL when called on a fresh session) and the differences are
+        applied as increments, so writes committed meanwhile are kept. Returns
+        the number of corrected groups, or ``None`` without reading anything
+        when another worker holds the reconcile lock.
+        """
+
+        if self.session.get_bind().dialect.name == "postgresql" and not self.session.in_transaction():
+            self.session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        if not try_job_lock(self.session, VALUATION_RECONCILE_LOCK):
+            return None
+        try:
+            return self._apply_valuation_corrections()
+        finally:
+            release_job_lock(self.session, VALUATION_RECONCILE_LOCK)
+
+    def reconcile_valuation_now(self) -> int:
+        """Reconcile for a manual trigger, refusing to overlap a running reconcile."""
+
+        corrected = self.reconcile_valuation()
+        if corrected is None:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Valuation reconcile is already running")
+        return corrected
+
+    def _apply_valuation_corrections(self) -> int:
+        actual = self.valuations.actual_totals()
+        stored = self.valuations.stored_totals()
+        empty = (0, Decimal("0"), Decimal("0"))
+        corrections = []
+        for key in sorted(actual.keys() | stored.keys()):
+            expected, current = actual.get(key, empty), stored.get(key, empty)
+            if expected != current:
+                corrections.append(
+                    {
+                        "category_id": key[0],
+                        "location_id": key[1],
+                        "currency": key[2],
+                        "part_count": expected[0] - current[0],
+                        "qty_on_hand": expected[1] - current[1],
+                        "total_value": expected[2] - current[2],
+                    }
+                )
+        self.valuations.apply(corrections)
+        self.valuations.delete_empty()
+        if corrections:
+            logger.warning("Corrected %d drifted valuation groups", len(corrections))
+        return len(corrections)
+
+    @staticmethod
+    def cache_stats() -> dict[str, dict[str, int]]:
+        return {
+            "part_detail": part_detail_cache.stats(),
+            "part_facets": part_facets_cache.stats(),
+            "lookups": lookup_cache.stats(),
+        }
+
+    def validate_parts_cursor(self, sort_field: str, cursor: Optional[str]) -> None:
+        """Reject a malformed parts list cursor with 400 before any ETag is computed."""
+
+        if not cursor:
+            return
+        try:
+            self.parts.check_keyset_cursor(sort_field, cursor)
+        except InvalidCursorError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    def parts_list_etag(
+        self,
+        q: Optional[str],
+        category_id: Optional[int],
+        location_id: Optional[int],
+        vendor_id: Optional[int],
+        low_stock: bool,
+        query_string: str,
+    ) -> str:
+        marker = self.parts.change_marker(q, category_id, location_id, vendor_id, low_stock)
+        return make_etag("parts", query_string, *marker)
+
     def get_part(self, part_id: int) -> Part:
         part = self.parts.get_by_id(part_id)
         if not part or part.is_deleted:
@@ -58,105 +428,639 @@ class WarehouseService:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Part code already exists")
         part = Part(**payload.model_dump())
         self.parts.create(part)
-        self.audit.create("Part", part.id, "create", user_id, changes=payload.model_dump_json())
+        self.audit.create("Part", part.id, "create", user_id, changes=payload.model_dump(mode="json"))
+        valuation = ValuationDeltas()
+        valuation.add(_valuation_values(part))
+        self.valuations.apply(valuation.rows())
+        self._track_suggestions([(part.id, part.part_code, part.name)])
+        self._invalidate_part_caches()
         return part
 
     def update_part(self, part_id: int, payload: PartUpdate, user_id: int | None) -> Part:
         part = self.get_part(part_id)
+        before = _valuation_values(part)
         update_data = payload.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(part, key, value)
-        self.audit.create("Part", part.id, "update", user_id, changes=payload.model_dump_json(exclude_unset=True))
+        valuation = ValuationDeltas()
+        valuation.replace(before, _valuation_values(part))
+        self.valuations.apply(valuation.rows())
+        if "name" in update_data:
+            self.parts.reindex(part)
+            self._track_suggestions([(part.id, part.part_code, part.name)])
+        self.audit.create("Part", part.id, "update", user_id, changes=payload.model_dump(mode="json", exclude_unset=True))
+        self._invalidate_part_caches([part.id])
         return part
 
     def delete_part(self, part_id: int, user_id: int | None) -> None:
         part = self.get_part(part_id)
+        valuation = ValuationDeltas()
+        valuation.add(_valuation_values(part), -1)
         self.parts.soft_delete(part)
+        self.valuations.apply(valuation.rows())
         self.audit.create("Part", part.id, "delete", user_id, changes=None)
+        self._untrack_suggestion(part.id)
+        self._invalidate_part_caches([part.id])
+
+    def bulk_update_parts(self, payload: PartBulkUpdate, user_id: int | None) -> PartBulkUpdateResult:
+        if (payload.ids is None) == (payload.filter is None):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provide either ids or filter")
+        changes = payload.changes.model_dump(exclude_unset=True)
+        if not changes:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No changes provided")
+
+        if payload.ids is not None:
+            part_ids: list[int] = []
+            for batch in _chunked(dict.fromkeys(payload.ids), BULK_UPDATE_BATCH_SIZE):
+                part_ids.extend(self.parts.live_ids(batch))
+        else:
+            selection = payload.filter
+            part_ids = self.parts.filtered_ids(
+                selection.q, selection.category_id, selection.location_id, selection.vendor_id, selection.low_stock
+            )
+
+        audit_changes = payload.changes.model_dump(mode="json", exclude_unset=True)
+        revalues = changes.keys() & set(VALUATION_FIELDS)
+        valuation = ValuationDeltas()
+        for batch in _chunked(part_ids, BULK_UPDATE_BATCH_SIZE):
+            if revalues:
+                for values in self.parts.valuation_values(batch).values():
+                    valuation.replace(values, {**values, **changes})
+            self.parts.bulk_update(batch, changes)
+            self.audit.bulk_create(
+                [
+                    {
+                        "entity_type": "Part",
+                        "entity_id": part_id,
+                        "action": "bulk_update",
+                        "user_id": user_id,
+                        "changes": audit_changes,
+                    }
+                    for part_id in batch
+                ]
+            )
+        self.valuations.apply(valuation.rows())
+        self._invalidate_part_caches(part_ids)
+        return PartBulkUpdateResult(updated=len(part_ids))
+
+    def adjust_stock(self, payload: StockAdjustmentRequest, user_id: int | None) -> StockAdjustmentResult:
+        """Apply stock deltas in the database and record them in the movement ledger.
+
+        The whole batch is rejected if a part code is unknown or a net
+        withdrawal would leave a part with negative stock.
+        """
+
+        codes = {line.part_code for line in payload.lines}
+        part_ids: dict[str, int] = {}
+        for batch in _chunked(codes, STOCK_ADJUSTMENT_BATCH_SIZE):
+            part_ids.update(self.parts.ids_by_code(batch))
+        missing = sorted(codes - part_ids.keys())
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown part codes: {', '.join(missing[:20])}",
+            )
 
-    def import_parts(self, upload: UploadFile, mapping: dict[str, str]) -> ImportResult:
+        deltas: dict[int, Decimal] = defaultdict(Decimal)
+        for line in payload.lines:
+            deltas[part_ids[line.part_code]] += line.delta
+        changed = [(part_id, delta) for part_id, delta in deltas.items() if delta]
+        negative: list[str] = []
+        valuation = ValuationDeltas()
+        for batch in _chunked(changed, STOCK_ADJUSTMENT_BATCH_SIZE):
+            batch_deltas = dict(batch)
+            self.parts.apply_stock_deltas(batch_deltas)
+            # Receipts may leave legacy negative stock below zero; only withdrawals are checked.
+            negative.extend(self.parts.negative_stock_codes(part_id for part_id, delta in batch if delta < 0))
+            for part_id, values in self.parts.valuation_values(batch_deltas).items():
+                valuation.replace({**values, "qty_on_hand": values["qty_on_hand"] - batch_deltas[part_id]}, values)
+        if negative:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Insufficient stock for part codes: {', '.join(negative[:20])}",
+            )
+
+        for batch in _chunked(payload.lines, STOCK_ADJUSTMENT_BATCH_SIZE):
+            self.movements.bulk_create(
+                [
+                    {
+                        "part_id": part_ids[line.part_code],
+                        "delta": line.delta,
+                        "reason": line.reason,
+                        "user_id": user_id,
+                    }
+                    for line in batch
+                ]
+            )
+        self.valuations.apply(valuation.rows())
+        self._invalidate_part_caches(deltas)
+        return StockAdjustmentResult(lines=len(payload.lines), parts=len(deltas))
+
+    def part_facets(
+        self,
+        q: Optional[str],
+        category_id: Optional[int],
+        location_id: Optional[int],
+        vendor_id: Optional[int],
+        low_stock: bool,
+    ) -> PartFacets:
+        unfiltered = not (q or category_id or location_id or vendor_id or low_stock)
+        if unfiltered:
+            cached = part_facets_cache.get("all")
+            if cached is not None:
+                return cached
+        facets = PartFacets()
+        for facet, value_id, name, count in self.parts.facet_counts(q, category_id, location_id, vendor_id, low_stock):
+            getattr(facets, facet).append(FacetBucket(id=value_id, name=name, count=count))
+        for buckets in (facets.category, facets.location, facets.vendor):
+            buckets.sort(key=lambda bucket: (-bucket.count, bucket.name or ""))
+        if unfiltered:
+            part_facets_cache.set("all", facets)
+        return facets
+
+    def suggest_parts(self, prefix: str, limit: int) -> list[PartSuggestion]:
+        part_suggestions.ensure_loaded(self._suggestion_items)
+        return [
+            PartSuggestion(id=part_id, part_code=part_code, name=name)
+            for part_id, part_code, name in part_suggestions.search(prefix, limit)
+        ]
+
+    def reload_part_suggestions(self) -> int:
+        """Rebuild the suggestion index from the parts table; return its size."""
+
+        part_suggestions.load(self._suggestion_items())
+        return len(part_suggestions)
+
+    def _suggestion_items(self) -> Iterator[tuple[int, tuple[str, str], tuple[int, str, str]]]:
+        return (
+            (part_id, (part_code, name), (part_id, part_code, name))
+            for part_id, part_code, name in self.parts.iter_code_names()
+        )
+
+    def _track_suggestions(self, entries: list[tuple[int, str, str]]) -> None:
+        def apply() -> None:
+            part_suggestions.add_many((entry[0], entry[1:], entry) for entry in entries)
+
+        run_after_commit(self.session, apply)
+
+    def _invalidate_part_caches(self, part_ids: Iterable[int] = ()) -> None:
+        stale = set(part_ids)
+
+        def apply() -> None:
+            part_facets_cache.clear()
+            if stale:
+                part_detail_cache.discard_where(lambda key: key[0] in stale)
+
+        run_after_commit(self.session, apply)
+
+    def _untrack_suggestion(self, part_id: int) -> None:
+        def apply() -> None:
+            part_suggestions.remove(part_id)
+
+        run_after_commit(self.session, apply)
+
+    def import_parts(
+        self, upload: UploadFile, mapping: dict[str, str], mode: ImportMode = ImportMode.ADD
+    ) -> ImportResult:
         stats = ImportStatistics()
-        content = upload.file.read()
-        if upload.filename and upload.filename.lower().endswith(".csv"):
-            reader = csv.DictReader(io.StringIO(content.decode("utf-8")))
-            for row in reader:
-                self._process_import_row(row, mapping, stats)
-        elif upload.filename and upload.filename.lower().endswith((".xlsx", ".xls")):
+        rows = self._read_import_rows(upload.file, upload.filename)
+        for chunk in _chunked(rows, IMPORT_CHUNK_SIZE):
+            self._import_chunk(chunk, mapping, stats, mode)
+        return stats.to_result()
+
+    def validate_import(
+        self, upload: UploadFile, mapping: dict[str, str], mode: ImportMode = ImportMode.ADD
+    ) -> ImportValidationReport:
+        """Report what importing a file would do without writing anything.
+
+        Rows are planned chunk by chunk with the same rules as
+        :meth:`_import_chunk`. Codes accepted from earlier chunks stand in for
+        the parts a real import would already have written.
+        """
+
+        report = ImportValidationReport(rows=0, valid=0, invalid=0)
+        accepted: dict[str, dict[str, object]] = {}
+        for chunk in _chunked(self._read_import_rows(upload.file, upload.filename), IMPORT_CHUNK_SIZE):
+            for offset, plan in enumerate(self._plan_import_chunk(chunk, mapping, mode, accepted)):
+                row_number = report.rows + offset + 2
+                entry = ImportRowError(row=row_number, part_code=plan.part_code or None, errors=plan.reasons)
+                if plan.action == "error":
+                    report.errors.append(entry)
+                elif plan.action == "skipped":
+                    report.skipped_rows.append(entry)
+                else:
+                    setattr(report, plan.action, getattr(report, plan.action) + 1)
+                if plan.action in ("created", "updated"):
+                    accepted[str(plan.part_code)] = {**(plan.existing or NEW_PART_SNAPSHOT), **plan.data}
+            report.rows += len(chunk)
+        report.invalid = len(report.errors)
+        report.skipped = len(report.skipped_rows)
+        report.valid = report.rows - report.invalid - report.skipped
+        return report
+
+    def submit_import_job(
+        self,
+        upload: UploadFile,
+        mapping: dict[str, str],
+        user_id: int | None,
+        storage_dir: str,
+        mode: ImportMode = ImportMode.ADD,
+    ) -> ImportJob:
+        """Persist the upload and queue it as a background import job.
+
+        The job row is committed immediately so a worker can claim it before the
+        request finishes.
+        """
+
+        filename = os.path.basename(upload.filename or "")
+        if not filename.lower().endswith(IMPORT_FORMATS):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported file format")
+        os.makedirs(storage_dir, exist_ok=True)
+        file_path = os.path.join(storage_dir, f"{uuid4().hex}_{filename}")
+        upload.file.seek(0)
+        with open(file_path, "wb") as handle:
+            shutil.copyfileobj(upload.file, handle)
+        job = self.import_jobs.create(
+            ImportJob(
+                filename=filename,
+                file_path=file_path,
+                mapping=mapping,
+                mode=mode,
+                user_id=user_id,
+                heartbeat_at=datetime.utcnow(),
+            )
+        )
+        self.session.commit()
+        return job
+
+    def get_import_job(self, job_id: int) -> ImportJob:
+        job = self.import_jobs.get(job_id)
+        if not job:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import job not found")
+        return job
+
+    def requeue_import_job(self, job_id: int) -> ImportJob:
+        """Queue a failed job, or one whose worker stopped heartbeating, to run again."""
+
+        job = self.get_import_job(job_id)
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=get_settings().import_job_stale_seconds)
+        if not self.import_jobs.requeue(job_id, stale_before, now):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Only failed or stalled jobs can be resumed"
+            )
+        self.session.commit()
+        self.session.refresh(job)
+        return job
+
+    def run_import_job(self, job_id: int) -> None:
+        """Process a claimed import job, committing after every chunk.
+
+        Progress counters are committed together with the chunk they describe,
+        so an interrupted job resumes after ``rows_done`` without double counting.
+        Each commit also refreshes the job's heartbeat.
+        """
+
+        job = self.get_import_job(job_id)
+        stats = ImportStatistics(
+            created=job.created,
+            updated=job.updated,
+            unchanged=job.unchanged,
+            skipped=job.skipped,
+            errors=job.errors,
+        )
+        if job.started_at is None:
+            job.started_at = datetime.utcnow()
+            self.session.commit()
+        with open(job.file_path, "rb") as handle, closing(self._read_import_rows(handle, job.filename)) as rows:
+            for chunk in _chunked(islice(rows, job.rows_done, None), IMPORT_CHUNK_SIZE):
+                self._import_chunk(chunk, job.mapping, stats, job.mode)
+                job.rows_done += len(chunk)
+                job.created, job.updated, job.unchanged = stats.created, stats.updated, stats.unchanged
+                job.skipped, job.errors = stats.skipped, stats.errors
+                job.heartbeat_at = datetime.utcnow()
+                self.session.commit()
+        job.status = ImportJobStatus.COMPLETED
+        job.finished_at = datetime.utcnow()
+        self.session.commit()
+        if os.path.exists(job.file_path):
+            os.remove(job.file_path)
+
+    def fail_import_job(self, job_id: int, message: str) -> None:
+        job = self.get_import_job(job_id)
+        job.status = ImportJobStatus.FAILED
+        job.error_message = message[:255]
+        job.finished_at = datetime.utcnow()
+        self.session.commit()
+
+    @staticmethod
+    def import_job_progress(job: ImportJob) -> ImportJobRead:
+        rows_per_second = None
+        if job.started_at is not None:
+            finished_at = job.finished_at or datetime.utcnow()
+            elapsed = (finished_at.replace(tzinfo=None) - job.started_at.replace(tzinfo=None)).total_seconds()
+            if elapsed > 0:
+                rows_per_second = round(job.rows_done / elapsed, 2)
+        return ImportJobRead(
+            id=job.id,
+            filename=job.filename,
+            status=job.status,
+            mode=job.mode,
+            rows_done=job.rows_done,
+            created=job.created,
+            updated=job.updated,
+            unchanged=job.unchanged,
+            skipped=job.skipped,
+            errors=job.errors,
+            rows_per_second=rows_per_second,
+            error_message=job.error_message,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+        )
+
+    def _read_import_rows(self, file: BinaryIO, filename: str | None) -> Iterator[dict[str, object]]:
+        """Yield import rows parsed incrementally from a binary file object."""
+
+        filename = (filename or "").lower()
+        if filename.endswith(".csv"):
+            file.seek(0)
+            text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+            try:
+                yield from csv.DictReader(text)
+            finally:
+                # Detach so the wrapper does not close the caller's file.
+                text.detach()
+        elif filename.endswith((".xlsx", ".xls")):
             try:
                 from openpyxl import load_workbook
             except ImportError as exc:  # pragma: no cover - optional dependency
                 raise HTTPException(status_code=500, detail="openpyxl required for XLSX import") from exc
-            workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
-            sheet = workbook.active
-            header_row = next(sheet.iter_rows(values_only=True))
-            headers = [str(value) if value is not None else "" for value in header_row]
-            for row in sheet.iter_rows(min_row=2, values_only=True):
-                record = {header: value for header, value in zip(headers, row)}
-                self._process_import_row(record, mapping, stats)
+            file.seek(0)
+            source = getattr(file, "name", None)
+            if not isinstance(source, str) or not os.path.exists(source):
+                source = file
+            workbook = load_workbook(source, read_only=True, data_only=True)
+            try:
+                sheet = workbook.active
+                rows = sheet.iter_rows(values_only=True)
+                header_row = next(rows, None)
+                if header_row is None:
+                    return
+                headers = [str(value) if value is not None else "" for value in header_row]
+                for row in rows:
+                    yield {header: value for header, value in zip(headers, row)}
+            finally:
+                workbook.close()
         else:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported file format")
-        return stats.to_result()
 
-    def _process_import_row(self, row: dict[str, str], mapping: dict[str, str], stats: ImportStatistics) -> None:
-        try:
-            part_code_key = mapping.get("part_code", "part_code")
-            part_code = str(row.get(part_code_key, "")).strip()
+    def _plan_import_chunk(
+        self,
+        rows: list[dict[str, object]],
+        mapping: dict[str, str],
+        mode: ImportMode,
+        accepted: Optional[Mapping[str, dict[str, object]]] = None,
+    ) -> list[ImportRowPlan]:
+        """Decide what importing each row of a chunk does, in file order.
+
+        Existing codes are resolved with one lookup. Blank and already-known
+        codes are skipped before the numeric fields are parsed, and a code
+        repeated within the chunk is skipped once its first occurrence has been
+        accepted. In upsert mode existing live parts are updated instead of
+        skipped, unless every imported value already matches. ``accepted``
+        holds the snapshot of codes taken from earlier chunks of a dry run,
+        which a real import would find in the database.
+        """
+
+        part_code_key = mapping.get("part_code", "part_code")
+        codes: list[Optional[str]] = []
+        for row in rows:
+            try:
+                codes.append(str(row.get(part_code_key, "")).strip())
+            except Exception:  # noqa: BLE001
+                codes.append(None)
+        candidates = {code for code in codes if code}
+        earlier = {code: accepted[code] for code in candidates if code in accepted} if accepted else {}
+        if mode == ImportMode.UPSERT:
+            current = {**self.parts.import_snapshot(candidates), **earlier}
+            # Soft-deleted parts keep their code reserved and are not revived.
+            known_codes = {code for code, values in current.items() if values["is_deleted"]}
+            known_reason = "part_code belongs to a deleted part"
+        else:
+            current = {}
+            known_codes = self.parts.existing_codes(candidates) | earlier.keys()
+            known_reason = "part_code already exists"
+
+        plans: list[ImportRowPlan] = []
+        seen: set[str] = set()
+        for row, part_code in zip(rows, codes):
+            if part_code is None:
+                plans.append(ImportRowPlan("error", None, reasons=["part_code could not be read"]))
+                continue
             if not part_code:
+                plans.append(ImportRowPlan("skipped", part_code, reasons=["part_code is required"]))
+                continue
+            if part_code in known_codes:
+                plans.append(ImportRowPlan("skipped", part_code, reasons=[known_reason]))
+                continue
+            if part_code in seen:
+                plans.append(ImportRowPlan("skipped", part_code, reasons=["part_code repeats an earlier row"]))
+                continue
+            try:
+                data = self._build_import_record(row, part_code, mapping)
+            except Exception:  # noqa: BLE001
+                plans.append(ImportRowPlan("error", part_code, reasons=self._import_record_errors(row, mapping)))
+                continue
+            seen.add(part_code)
+            existing = current.get(part_code)
+            if existing is None:
+                plans.append(ImportRowPlan("created", part_code, data))
+            elif all(existing[key] == data[key] for key in IMPORT_COLUMNS):
+                plans.append(ImportRowPlan("unchanged", part_code, data, existing))
+            else:
+                plans.append(ImportRowPlan("updated", part_code, data, existing))
+        return plans
+
+    def _import_chunk(
+        self,
+        rows: list[dict[str, object]],
+        mapping: dict[str, str],
+        stats: ImportStatistics,
+        mode: ImportMode = ImportMode.ADD,
+    ) -> None:
+        """Import one chunk of rows planned by :meth:`_plan_import_chunk` with multi-row writes."""
+
+        records: list[dict[str, object]] = []
+        current: dict[str, dict[str, object]] = {}
+        for plan in self._plan_import_chunk(rows, mapping, mode):
+            if plan.action == "error":
+                stats.errors += 1
+            elif plan.action == "skipped":
                 stats.skipped += 1
-                return
-            if self.parts.get_by_code(part_code):
-                stats.skipped += 1
-                return
-            qty_key = mapping.get("qty_on_hand", "qty_on_hand")
-            min_stock_key = mapping.get("min_stock", "min_stock")
-            price_key = mapping.get("price", "price")
-            qty_on_hand = self._parse_decimal(row.get(qty_key))
-            min_stock = self._parse_decimal(row.get(min_stock_key))
-            price = self._parse_decimal(row.get(price_key))
-            data = {
-                "part_code": part_code,
-                "name": str(row.get(mapping.get("name", "name"), part_code)).strip(),
-                "description": row.get(mapping.get("description", "description")),
-                "qty_on_hand": qty_on_hand,
-                "min_stock": min_stock,
-                "price": price,
-                "currency": str(row.get(mapping.get("currency", "currency"), "USD"))[:3],
-            }
-            part = Part(**data)
-            self.parts.create(part)
-            stats.created += 1
-            self.audit.create("Part", part.id, "import", None, changes=str(data))
-        except (InvalidOperation, KeyError, TypeError, ValueError):
-            stats.errors += 1
-        except Exception:  # noqa: BLE001
-            stats.errors += 1
-
-    def export_parts(self, parts: Iterable[Part]) -> str:
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow([
-            "id",
-            "part_code",
-            "name",
-            "qty_on_hand",
-            "min_stock",
-            "price",
-            "currency",
-        ])
-        for part in parts:
-            writer.writerow([
-                part.id,
-                part.part_code,
-                part.name,
-                str(part.qty_on_hand),
-                str(part.min_stock),
-                str(part.price),
-                part.currency,
-            ])
-        return output.getvalue()
-
-    def list_audit_logs(self, part_id: int) -> Iterable[AuditLog]:
-        return self.audit.list_for_entity("Part", part_id)
+            elif plan.action == "unchanged":
+                stats.unchanged += 1
+            else:
+                if plan.action == "updated":
+                    current[str(plan.part_code)] = plan.existing
+                records.append(plan.data)
+        if not records:
+            return
+
+        if mode == ImportMode.UPSERT:
+            errors_before = stats.errors
+            written = self._write_import_records(records, stats, self._upsert_import_records)
+            # Rows changed concurrently to the imported values are skipped by the database.
+            stats.unchanged += len(records) - len(written) - (stats.errors - errors_before)
+        else:
+            written = self._write_import_records(records, stats, self._create_import_records)
+        inserted = [(part_id, data) for part_id, data in written if data["part_code"] not in current]
+        updated = [(part_id, data) for part_id, data in written if data["part_code"] in current]
+        stats.created += len(inserted)
+        stats.updated += len(updated)
+        valuation = ValuationDeltas()
+        for _, data in inserted:
+            valuation.add(data)
+        for _, data in updated:
+            existing = current[data["part_code"]]
+            valuation.replace(existing, {**existing, **data})
+        self.valuations.apply(valuation.rows())
+        self._track_suggestions(
+            [(part_id, str(data["part_code"]), str(data["name"])) for part_id, data in written]
+        )
+        self._invalidate_part_caches([part_id for part_id, _ in updated])
+        self.audit.bulk_create(
+            [
+                {
+                    "entity_type": "Part",
+                    "entity_id": part_id,
+                    "action": action,
+                    "user_id": None,
+                    "changes": _json_changes(data),
+                }
+                for action, entries in (("import", inserted), ("import_update", updated))
+                for part_id, data in entries
+            ]
+        )
+
+    def _create_import_records(self, records: list[dict[str, object]]) -> list[tuple[int, dict[str, object]]]:
+        return list(zip(self.parts.bulk_create(records), records))
+
+    def _upsert_import_records(self, records: list[dict[str, object]]) -> list[tuple[int, dict[str, object]]]:
+        part_ids = self.parts.upsert(records)
+        return [(part_ids[data["part_code"]], data) for data in records if data["part_code"] in part_ids]
+
+    def _write_import_records(
+        self,
+        records: list[dict[str, object]],
+        stats: ImportStatistics,
+        write: Callable[[list[dict[str, object]]], list[tuple[int, dict[str, object]]]],
+    ) -> list[tuple[int, dict[str, object]]]:
+        try:
+            with self.session.begin_nested():
+                return write(records)
+        except SQLAlchemyError:
+            pass
+        # A row in the chunk was rejected by the database; retry one by one so
+        # only the offending rows are counted as errors.
+        written: list[tuple[int, dict[str, object]]] = []
+        for data in records:
+            try:
+                with self.session.begin_nested():
+                    written.extend(write([data]))
+            except SQLAlchemyError:
+                stats.errors += 1
+        return written
+
+    def _build_import_record(self, row: dict[str, object], part_code: str, mapping: dict[str, str]) -> dict[str, object]:
+        """Parse one row into column values normalized the way the database stores them.
+
+        Decimals are rounded to the column scale and a blank or missing
+        description becomes ``NULL``, so comparing a record with the stored
+        part only finds real changes.
+        """
+
+        description = row.get(mapping.get("description", "description"))
+        if description is not None and not str(description).strip():
+            description = None
+        record: dict[str, object] = {
+            "part_code": part_code,
+            "name": str(row.get(mapping.get("name", "name"), part_code)).strip(),
+            "description": None if description is None else str(description),
+        }
+        for name in IMPORT_DECIMAL_FIELDS:
+            value = self._parse_decimal(row.get(mapping.get(name, name)))
+            if not value.is_finite():
+                raise ValueError(f"{name} is not a finite number")
+            record[name] = value.quantize(IMPORT_DECIMAL_QUANTUMS[name], rounding=ROUND_HALF_UP)
+        record["currency"] = self._parse_currency(row.get(mapping.get("currency", "currency")))
+        return record
+
+    @staticmethod
+    def _parse_currency(value: object) -> str:
+        """Return a 3-letter currency code; blank or missing means ``USD``."""
+
+        currency = "USD" if value is None or not str(value).strip() else str(value).strip()
+        if len(currency) != 3:
+            raise ValueError(f"currency must be a 3-letter code: {value!r}")
+        return currency
+
+    @classmethod
+    def _import_record_errors(cls, row: dict[str, object], mapping: dict[str, str]) -> list[str]:
+        errors = []
+        for name in IMPORT_DECIMAL_FIELDS:
+            value = row.get(mapping.get(name, name))
+            if not cls._is_valid_decimal(value):
+                errors.append(f"{name} is not a valid number: {value!r}")
+        try:
+            cls._parse_currency(row.get(mapping.get("currency", "currency")))
+        except ValueError as exc:
+            errors.append(str(exc))
+        return errors or ["row could not be parsed"]
+
+    def export_parts(
+        self,
+        query,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+        export_format: ExportFormat = ExportFormat.CSV,
+        content_encoding: Optional[str] = None,
+        column_set: PartExportColumns = PartExportColumns.BASIC,
+    ) -> Iterator[str | bytes]:
+        """Return the export of ``query`` as an iterator of body chunks.
+
+        Rows are streamed as plain column tuples from a server-side cursor in
+        chunks of ``chunk_size``, so memory use stays flat regardless of
+        catalogue size and no ORM entities are built. The ``full`` column set
+        adds category, location and vendor names from the same joined select.
+        With ``content_encoding`` each chunk is compressed as it is produced.
+        """
+
+        require_export_support(export_format)
+        columns, stmt = self.parts.export_statement(query, EXPORT_COLUMNS, column_set == PartExportColumns.FULL)
+        batches = self.session.execute(stmt, execution_options={"yield_per": chunk_size}).partitions()
+        chunks = iter_export(export_format, columns, batches, "Parts")
+        if content_encoding:
+            chunks = compress_chunks(chunks, content_encoding, "parts")
+        return close_when_done(self.session, chunks)
+
+    def list_audit_logs(
+        self,
+        part_id: int,
+        cursor: Optional[str],
+        page_size: int,
+        field: Optional[str] = None,
+        action: Optional[str] = None,
+    ) -> tuple[list[AuditLog], Optional[str], Optional[str]]:
+        try:
+            return self.audit.list_for_entity("Part", part_id, cursor, page_size, field, action)
+        except InvalidCursorError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    @classmethod
+    def _is_valid_decimal(cls, value: object) -> bool:
+        try:
+            return cls._parse_decimal(value).is_finite()
+        except (InvalidOperation, TypeError, ValueError):
+            return False
 
     @staticmethod
     def _parse_decimal(value: object) -> Decimal:
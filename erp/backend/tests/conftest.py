@@ -14,6 +14,7 @@ from erp.backend.core.security import hash_password
 from erp.backend.models.base import Base
 from erp.backend.models.user import User, UserRole
 from erp.backend.core.database import get_db_session
+from erp.backend.services.warehouse import lookup_cache, part_detail_cache, part_facets_cache, part_suggestions
 
 
 @pytest.fixture(scope="session")
@@ -35,6 +36,10 @@ def db_session(test_engine) -> Generator[Session, None, None]:
 
     Base.metadata.drop_all(bind=test_engine)
     Base.metadata.create_all(bind=test_engine)
+    part_suggestions.reset()
+    part_facets_cache.clear()
+    part_detail_cache.clear()
+    lookup_cache.clear()
     TestingSessionLocal = sessionmaker(bind=test_engine, autoflush=False, autocommit=False)
     session = TestingSessionLocal()
     root_user = User(
@@ -0,0 +1,39 @@
+"""Tests for streaming response compression."""
+from __future__ import annotations
+
+import gzip
+import logging
+
+import pytest
+
+from erp.backend.core import compression
+from erp.backend.core.compression import compress_chunks, negotiate_encoding
+
+
+def test_negotiate_encoding(monkeypatch) -> None:
+    monkeypatch.setattr(compression, "available_encodings", lambda: ("zstd", "gzip"))
+
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip, deflate, br") == "gzip"
+    assert negotiate_encoding("gzip, zstd") == "zstd"
+    assert negotiate_encoding("zstd;q=0.5, gzip") == "gzip"
+    assert negotiate_encoding("gzip;q=0, *;q=0.1") == "zstd"
+
+    monkeypatch.setattr(compression, "available_encodings", lambda: ("gzip",))
+    assert negotiate_encoding("zstd") is None
+
+
+def test_compress_chunks_round_trip_and_stats(caplog) -> None:
+    chunks = ["id,name\n", b"", *(f"{index},Part {index}\n" for index in range(500))]
+    with caplog.at_level(logging.INFO, logger="erp.backend.core.compression"):
+        output = list(compress_chunks(chunks, "gzip", "parts"))
+
+    assert len(output) > 1
+    assert gzip.decompress(b"".join(output)).decode() == "".join(chunk for chunk in chunks if chunk)
+    assert "Compressed parts export with gzip" in caplog.text
+
+    zstandard = pytest.importorskip("zstandard")
+    body = b"".join(compress_chunks(chunks, "zstd", "parts"))
+    decoded = zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    assert decoded.decode() == "".join(chunk for chunk in chunks if chunk)
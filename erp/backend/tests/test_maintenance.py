@@ -1,8 +1,10 @@
 """Maintenance module tests."""
 from __future__ import annotations
 
+import io
 from datetime import date
 
+import pytest
 from fastapi.testclient import TestClient
 
 from .test_warehouse import _auth_headers
@@ -42,7 +44,7 @@ def test_work_order_lifecycle(client: TestClient) -> None:
     assert generate_resp.json()["created_work_orders"] >= 1
 
     work_orders = client.get("/api/v1/maintenance/work-orders", headers=headers).json()
-    work_order_id = work_orders[0]["id"]
+    work_order_id = work_orders["items"][0]["id"]
 
     # Attempt to close without summary/downtime should fail
     bad_close = client.put(
@@ -63,3 +65,190 @@ def test_work_order_lifecycle(client: TestClient) -> None:
     history_resp = client.get("/api/v1/maintenance/history", headers=headers)
     assert history_resp.status_code == 200
     assert len(history_resp.json()) >= 1
+
+
+def test_history_export_formats(client: TestClient) -> None:
+    headers = _auth_headers(client)
+    equipment_id = client.post("/api/v1/maintenance/equipment", json={"name": "Lathe"}, headers=headers).json()["id"]
+    work_order = client.post(
+        "/api/v1/maintenance/work-orders",
+        json={"equipment_id": equipment_id, "type": "CM"},
+        headers=headers,
+    ).json()
+    client.put(
+        f"/api/v1/maintenance/work-orders/{work_order['id']}",
+        json={"status": "Done", "summary": "Replaced belt", "downtime_min": 12.5},
+        headers=headers,
+    )
+
+    csv_resp = client.get("/api/v1/maintenance/history", params={"export": "true"}, headers=headers)
+    assert csv_resp.headers["content-type"].startswith("text/csv")
+    lines = csv_resp.text.strip().splitlines()
+    assert lines[0] == "work_order_id,equipment_id,summary,downtime_min,recorded_at"
+    assert lines[1].startswith(f"{work_order['id']},{equipment_id},Replaced belt,12.50,")
+
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    parquet_resp = client.get(
+        "/api/v1/maintenance/history", params={"export": "true", "format": "parquet"}, headers=headers
+    )
+    assert parquet_resp.status_code == 200
+    table = pq.read_table(io.BytesIO(parquet_resp.content))
+    assert table.column("summary").to_pylist() == ["Replaced belt"]
+    assert str(table.schema.field("recorded_at").type) == "timestamp[us, tz=UTC]"
+
+
+def test_generate_due_creates_every_missed_occurrence(client: TestClient, db_session) -> None:
+    from datetime import timedelta
+
+    from erp.backend.models.maintenance import PMPlan, WorkOrder
+    from erp.backend.services.maintenance import MaintenanceService
+
+    headers = _auth_headers(client)
+    equipment_id = client.post("/api/v1/maintenance/equipment", json={"name": "Mill"}, headers=headers).json()["id"]
+    weekly = client.post(
+        "/api/v1/maintenance/pm/templates", json={"name": "Weekly", "frequency_days": 7}, headers=headers
+    ).json()["id"]
+    today = date(2026, 10, 17)
+    for template_id, next_due in ((weekly, today - timedelta(days=15)), (weekly, today + timedelta(days=1))):
+        client.post(
+            "/api/v1/maintenance/pm/plans",
+            json={"equipment_id": equipment_id, "template_id": template_id, "next_due_date": next_due.isoformat()},
+            headers=headers,
+        )
+
+    result = MaintenanceService(db_session).generate_due_work_orders(today)
+    db_session.commit()
+    assert result.created_work_orders == 3
+    due_dates = [order.due_date for order in db_session.query(WorkOrder).order_by(WorkOrder.due_date)]
+    assert due_dates == [today - timedelta(days=15), today - timedelta(days=8), today - timedelta(days=1)]
+    plans = {plan.id: plan.next_due_date for plan in db_session.query(PMPlan)}
+    assert plans == {1: today + timedelta(days=6), 2: today + timedelta(days=1)}
+    assert MaintenanceService(db_session).generate_due_work_orders(today).created_work_orders == 0
+
+
+def test_pm_scheduler_is_idempotent_and_respects_lease(client: TestClient, db_session) -> None:
+    from datetime import datetime, timedelta, timezone
+
+    from sqlalchemy.orm import sessionmaker
+
+    from erp.backend.models.jobs import JobLease
+    from erp.backend.models.maintenance import PMPlan, WorkOrder
+    from erp.backend.services.maintenance import PM_GENERATION_LOCK
+    from erp.backend.services.pm_scheduler import PMScheduler
+
+    headers = _auth_headers(client)
+    equipment_id = client.post("/api/v1/maintenance/equipment", json={"name": "Drill"}, headers=headers).json()["id"]
+    template_id = client.post(
+        "/api/v1/maintenance/pm/templates", json={"name": "Fortnightly", "frequency_days": 14}, headers=headers
+    ).json()["id"]
+    today = date(2026, 10, 17)
+    plan_id = client.post(
+        "/api/v1/maintenance/pm/plans",
+        json={"equipment_id": equipment_id, "template_id": template_id, "next_due_date": "2026-10-01"},
+        headers=headers,
+    ).json()["id"]
+
+    scheduler = PMScheduler(sessionmaker(bind=db_session.bind), interval_seconds=0)
+    run = scheduler.run_once(today)
+    assert (run.trigger, run.status.value, run.due_plans, run.created_work_orders) == ("scheduler", "Completed", 1, 2)
+    assert run.duration_ms >= 0
+
+    # Replaying the same occurrences only skips them.
+    db_session.get(PMPlan, plan_id).next_due_date = date(2026, 10, 1)
+    db_session.commit()
+    replay = scheduler.run_once(today)
+    assert (replay.created_work_orders, replay.skipped_existing) == (0, 2)
+    assert db_session.query(WorkOrder).filter(WorkOrder.plan_id == plan_id).count() == 2
+
+    lease = db_session.query(JobLease).filter(JobLease.name == PM_GENERATION_LOCK).one()
+    lease.holder = "other-worker"
+    lease.expires_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+    db_session.commit()
+    assert scheduler.run_once(today) is None
+    assert client.post("/api/v1/maintenance/pm/generate-due", headers=headers).status_code == 409
+
+    lease.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db_session.commit()
+    manual = client.post("/api/v1/maintenance/pm/generate-due", headers=headers)
+    assert manual.status_code == 200
+    assert manual.json()["run_id"] is not None
+
+    runs = client.get("/api/v1/maintenance/pm/runs", headers=headers).json()
+    assert [item["trigger"] for item in runs] == ["manual", "scheduler", "scheduler"]
+
+
+def test_job_lease_is_committed_before_the_run_and_released_after(db_session) -> None:
+    from datetime import datetime, timezone
+
+    from sqlalchemy.orm import sessionmaker
+
+    from erp.backend.core.locks import lock_holder, release_job_lock, try_job_lock
+    from erp.backend.models.jobs import JobLease
+
+    worker = sessionmaker(bind=db_session.bind)()
+    worker.begin()
+    assert try_job_lock(worker, "test-job")
+    release_job_lock(worker, "test-job")
+    # Another worker skips while the holder's transaction is still open.
+    assert not try_job_lock(db_session, "test-job")
+    lease = db_session.query(JobLease).filter(JobLease.name == "test-job").one()
+    assert lease.holder == lock_holder()
+    assert lease.expires_at.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc)
+
+    # A rollback keeps the committed lease row and expires it.
+    worker.rollback()
+    worker.close()
+    db_session.expire_all()
+    lease = db_session.query(JobLease).filter(JobLease.name == "test-job").one()
+    assert lease.expires_at.replace(tzinfo=timezone.utc) <= datetime.now(timezone.utc)
+    assert try_job_lock(db_session, "test-job")
+
+
+def test_work_order_listing_filters_and_pages(client: TestClient) -> None:
+    headers = _auth_headers(client)
+    press = client.post("/api/v1/maintenance/equipment", json={"name": "Press #9"}, headers=headers).json()["id"]
+    saw = client.post("/api/v1/maintenance/equipment", json={"name": "Saw"}, headers=headers).json()["id"]
+    orders = [
+        (press, "PM", "2026-10-01"),
+        (press, "CM", None),
+        (saw, "PM", "2026-10-10"),
+        (saw, "CM", "2026-11-05"),
+    ]
+    ids = [
+        client.post(
+            "/api/v1/maintenance/work-orders",
+            json={"equipment_id": equipment_id, "type": kind, "due_date": due_date},
+            headers=headers,
+        ).json()["id"]
+        for equipment_id, kind, due_date in orders
+    ]
+    client.put(
+        f"/api/v1/maintenance/work-orders/{ids[0]}",
+        json={"status": "Done", "summary": "Lubricated", "downtime_min": 5},
+        headers=headers,
+    )
+
+    def listed(**params) -> list[int]:
+        response = client.get("/api/v1/maintenance/work-orders", params=params, headers=headers)
+        assert response.status_code == 200
+        return [item["id"] for item in response.json()["items"]]
+
+    assert listed() == ids[:0:-1]
+    assert listed(status=["Done", "Open"]) == ids[::-1]
+    assert listed(equipment_id=press) == [ids[1]]
+    assert listed(type="PM") == [ids[2]]
+    assert listed(due_from="2026-10-01", due_to="2026-10-31", status="Done") == [ids[0]]
+
+    first = client.get("/api/v1/maintenance/work-orders", params={"page_size": 2}, headers=headers).json()
+    assert [item["id"] for item in first["items"]] == [ids[3], ids[2]]
+    second = client.get(
+        "/api/v1/maintenance/work-orders", params={"page_size": 2, "cursor": first["next_cursor"]}, headers=headers
+    ).json()
+    assert [item["id"] for item in second["items"]] == [ids[1]]
+    assert second["next_cursor"] is None
+
+    bad_range = client.get(
+        "/api/v1/maintenance/work-orders", params={"due_from": "2026-11-01", "due_to": "2026-10-01"}, headers=headers
+    )
+    assert bad_range.status_code == 400
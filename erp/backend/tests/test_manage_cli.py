@@ -1,6 +1,8 @@
 """Tests for the management CLI entry point."""
 from __future__ import annotations
 
+import pytest
+
 import scripts.manage as manage
 
 
@@ -23,3 +25,17 @@ def test_init_db_command(monkeypatch, capsys) -> None:
 
     out = capsys.readouterr().out.strip()
     assert out == "Created 5 tables in sqlite:///memory."
+
+
+def test_reconcile_valuation_command_reports_held_lock(monkeypatch, capsys) -> None:
+    """reconcile-valuation should exit non-zero when another process holds the lock."""
+
+    monkeypatch.setattr(manage.valuation_reconciler, "run_once", lambda: None)
+    with pytest.raises(SystemExit) as exc_info:
+        manage.main(["reconcile-valuation"])
+    assert exc_info.value.code == "Valuation reconcile is already running in another process"
+    assert capsys.readouterr().out == ""
+
+    monkeypatch.setattr(manage.valuation_reconciler, "run_once", lambda: 2)
+    manage.main(["reconcile-valuation"])
+    assert capsys.readouterr().out.strip() == "Corrected 2 valuation groups."
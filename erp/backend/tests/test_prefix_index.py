@@ -0,0 +1,105 @@
+"""Tests for the in-process prefix index."""
+from __future__ import annotations
+
+from erp.backend.core.prefix_index import PrefixIndex
+
+
+def test_prefix_index_add_remove_and_batch_merge() -> None:
+    index: PrefixIndex[str] = PrefixIndex()
+    index.load([(1, ("ABC-1", "Bearing"), "one"), (2, ("ABD-2", "Belt"), "two")])
+
+    assert index.search("ab", 10) == ["one", "two"]
+    assert index.search("BE", 1) == ["one"]
+
+    index.add(1, ("XYZ-1", "Bearing"), "one-renamed")
+    assert index.search("abc", 10) == []
+    assert index.search("xyz", 10) == ["one-renamed"]
+
+    index.add_many((item_id, (f"BULK-{item_id}",), f"bulk-{item_id}") for item_id in range(10, 110))
+    assert len(index) == 102
+    assert index.search("bulk-10", 3) == ["bulk-10", "bulk-100", "bulk-101"]
+
+    index.remove(2)
+    assert index.search("be", 10) == ["one-renamed"]
+    assert index.search("", 10) == []
+
+
+def test_prefix_index_batch_merge_matches_full_load() -> None:
+    import random
+
+    rng = random.Random(7)
+    items = {item_id: (f"P-{rng.randrange(10_000):05d}", f"Name {item_id % 50}") for item_id in range(1, 2001)}
+    merged: PrefixIndex[int] = PrefixIndex()
+    merged.load((item_id, keys, item_id) for item_id, keys in items.items())
+
+    # Replace half of the existing items and add new ones in one batch.
+    batch = {item_id: (f"P-{rng.randrange(10_000):05d}", f"Renamed {item_id % 7}") for item_id in range(1000, 2500)}
+    merged.add_many((item_id, keys, item_id) for item_id, keys in batch.items())
+    items.update(batch)
+    loaded: PrefixIndex[int] = PrefixIndex()
+    loaded.load((item_id, keys, item_id) for item_id, keys in items.items())
+
+    assert merged._keys == loaded._keys
+    assert len(merged) == len(loaded) == 2499
+    for prefix in ("p-0", "p-12", "name 3", "renamed", "renamed 6"):
+        assert sorted(merged.search(prefix, 5000)) == sorted(loaded.search(prefix, 5000))
+
+
+def test_prefix_index_replays_writes_made_during_load() -> None:
+    import threading
+
+    index: PrefixIndex[str] = PrefixIndex()
+    index.load([(1, ("OLD-1",), "old")])
+
+    def rows():
+        yield 2, ("ABC-2",), "two"
+        # Writes committed while the load is still reading rows.
+        index.add(3, ("ABC-3",), "three")
+        index.remove(2)
+        index.add_many((item_id, (f"ABC-{item_id}",), f"bulk-{item_id}") for item_id in range(100, 200))
+        assert index.search("old", 10) == ["old"]
+        yield 4, ("ABC-4",), "four"
+
+    index.load(rows())
+    assert index.search("abc-2", 10) == []
+    assert index.search("abc-3", 10) == ["three"]
+    assert index.search("abc-4", 10) == ["four"]
+    assert len(index) == 102
+
+    loads = []
+    fresh: PrefixIndex[str] = PrefixIndex()
+    started = threading.Barrier(4)
+
+    def first_request() -> None:
+        started.wait()
+        fresh.ensure_loaded(lambda: loads.append(1) or [(1, ("A",), "a")])
+
+    threads = [threading.Thread(target=first_request) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loads == [1]
+    assert fresh.search("a", 10) == ["a"]
+
+
+def test_prefix_index_search_p99_under_one_millisecond() -> None:
+    import random
+    import string
+    import time
+
+    rng = random.Random(1)
+    words = ["bearing", "bolt", "gear", "belt", "valve", "pump", "seal", "motor"]
+    index: PrefixIndex[int] = PrefixIndex()
+    index.load(
+        (item_id, (f"{rng.choice(string.ascii_uppercase)}-{item_id:06d}", f"{rng.choice(words)} {item_id}"), item_id)
+        for item_id in range(20_000)
+    )
+    latencies = []
+    for _ in range(2_000):
+        prefix = rng.choice([rng.choice(words)[: rng.randint(1, 4)], f"{rng.choice(string.ascii_uppercase)}-0"])
+        started = time.perf_counter()
+        index.search(prefix, 10)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    assert latencies[int(len(latencies) * 0.99)] < 0.001
@@ -4,6 +4,7 @@ from __future__ import annotations
 import io
 import json
 
+import pytest
 from fastapi.testclient import TestClient
 
 
@@ -57,3 +58,960 @@ def test_import_parts_add_only(client: TestClient) -> None:
     assert response.status_code == 200
     result = response.json()
     assert result["skipped"] == 1
+
+
+def _create_parts(client: TestClient, headers: dict[str, str], count: int) -> None:
+    for index in range(count):
+        response = client.post(
+            "/api/v1/warehouse/parts",
+            json={"part_code": f"P-{index:03d}", "name": f"Part {index % 3}", "qty_on_hand": index},
+            headers=headers,
+        )
+        assert response.status_code == 200
+
+
+def test_list_parts_cursor_pagination(client: TestClient) -> None:
+    headers = _auth_headers(client)
+    _create_parts(client, headers, 7)
+
+    seen: list[str] = []
+    params = {"cursor": "", "page_size": 3, "sort_field": "name"}
+    pages = []
+    while True:
+        response = client.get("/api/v1/warehouse/parts", params=params, headers=headers)
+        assert response.status_code == 200
+        payload = response.json()
+        assert payload["total"] is None
+        pages.append(payload)
+        seen.extend(item["part_code"] for item in payload["items"])
+        if not payload["next_cursor"]:
+            break
+        params["cursor"] = payload["next_cursor"]
+
+    offset_items = client.get(
+        "/api/v1/warehouse/parts", params={"page_size": 100, "sort_field": "name"}, headers=headers
+    ).json()["items"]
+    assert seen == [item["part_code"] for item in offset_items]
+    assert [len(page["items"]) for page in pages] == [3, 3, 1]
+    assert pages[0]["prev_cursor"] is None
+
+    back = client.get(
+        "/api/v1/warehouse/parts",
+        params={"cursor": pages[2]["prev_cursor"], "page_size": 3, "sort_field": "name", "with_total": True},
+        headers=headers,
+    ).json()
+    assert [item["part_code"] for item in back["items"]] == [item["part_code"] for item in pages[1]["items"]]
+    assert back["total"] == 7
+
+    desc = client.get(
+        "/api/v1/warehouse/parts",
+        params={"cursor": "", "page_size": 2, "sort_field": "qty_on_hand", "sort_dir": "desc"},
+        headers=headers,
+    ).json()
+    assert [item["part_code"] for item in desc["items"]] == ["P-006", "P-005"]
+    following = client.get(
+        "/api/v1/warehouse/parts",
+        params={"cursor": desc["next_cursor"], "page_size": 2, "sort_field": "qty_on_hand", "sort_dir": "desc"},
+        headers=headers,
+    ).json()
+    assert [item["part_code"] for item in following["items"]] == ["P-004", "P-003"]
+
+    invalid = client.get("/api/v1/warehouse/parts", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert invalid.status_code == 400
+    # The cursor is checked before any ETag, so a conditional request cannot get a 304.
+    conditional = client.get(
+        "/api/v1/warehouse/parts",
+        params={"cursor": following["next_cursor"][:-4], "sort_field": "qty_on_hand"},
+        headers={**headers, "If-None-Match": "*"},
+    )
+    assert conditional.status_code == 400
+    assert "etag" not in conditional.headers
+
+
+def test_export_parts_streams_csv(client: TestClient) -> None:
+    headers = _auth_headers(client)
+    _create_parts(client, headers, 5)
+
+    response = client.get("/api/v1/warehouse/parts/export", params={"sort_field": "part_code"}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    lines = response.text.strip().splitlines()
+    assert lines[0] == "id,part_code,name,qty_on_hand,min_stock,price,currency"
+    assert [line.split(",")[1] for line in lines[1:]] == [f"P-{index:03d}" for index in range(5)]
+
+
+def test_export_parts_full_column_set_uses_one_query(client: TestClient, db_session) -> None:
+    from sqlalchemy import event
+
+    from erp.backend.models.warehouse import Category, Vendor
+
+    db_session.add_all([Category(name="Bearings"), Vendor(name="SKF")])
+    db_session.commit()
+    category = db_session.query(Category).one()
+    vendor = db_session.query(Vendor).one()
+    headers = _auth_headers(client)
+    for code, vendor_id in [("E-1", vendor.id), ("E-2", None)]:
+        client.post(
+            "/api/v1/warehouse/parts",
+            json={"part_code": code, "name": code, "category_id": category.id, "vendor_id": vendor_id},
+            headers=headers,
+        )
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        if "FROM parts" in statement:
+            statements.append(statement)
+
+    event.listen(db_session.bind, "before_cursor_execute", record)
+    try:
+        response = client.get(
+            "/api/v1/warehouse/parts/export",
+            params={"columns": "full", "sort_field": "part_code"},
+            headers=headers,
+        )
+    finally:
+        event.remove(db_session.bind, "before_cursor_execute", record)
+
+    lines = response.text.strip().splitlines()
+    assert lines[0] == "id,part_code,name,qty_on_hand,min_stock,price,currency,category,location,vendor"
+    assert [line.split(",")[-3:] for line in lines[1:]] == [["Bearings", "", "SKF"], ["Bearings", "", ""]]
+    assert len(statements) == 1
+    assert "JOIN categories" in statements[0]
+
+
+def test_export_parts_gzip_encoding(client: TestClient) -> None:
+    import gzip
+
+    headers = _auth_headers(client)
+    _create_parts(client, headers, 3)
+
+    plain = client.get("/api/v1/warehouse/parts/export", headers=headers)
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
+
+    response = client.get("/api/v1/warehouse/parts/export", headers={**headers, "Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(response.content).decode() == plain.text
+
+
+def test_export_parts_columnar_formats(client: TestClient) -> None:
+    from decimal import Decimal
+
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    headers = _auth_headers(client)
+    _create_parts(client, headers, 5)
+
+    params = {"sort_field": "part_code", "format": "parquet"}
+    response = client.get("/api/v1/warehouse/parts/export", params=params, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == "attachment; filename=parts.parquet"
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.schema.field("qty_on_hand").type == pa.decimal128(12, 2)
+    assert table.column("part_code").to_pylist() == [f"P-{index:03d}" for index in range(5)]
+    assert table.column("qty_on_hand").to_pylist()[4] == Decimal("4.00")
+
+    params["format"] = "arrow"
+    response = client.get("/api/v1/warehouse/parts/export", params=params, headers=headers)
+    table = pa.ipc.open_file(pa.BufferReader(response.content)).read_all()
+    assert table.num_rows == 5
+    assert table.schema.field("id").type == pa.int64()
+
+
+def test_export_parts_xlsx_keeps_codes_as_text(client: TestClient) -> None:
+    from openpyxl import load_workbook
+
+    headers = _auth_headers(client)
+    client.post(
+        "/api/v1/warehouse/parts",
+        json={"part_code": "00123", "name": "=SUM(A1)", "qty_on_hand": "2.5", "price": 10},
+        headers=headers,
+    )
+
+    response = client.get("/api/v1/warehouse/parts/export", params={"format": "xlsx"}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == "attachment; filename=parts.xlsx"
+    sheet = load_workbook(io.BytesIO(response.content)).active
+    assert sheet.title == "Parts"
+    assert [cell.value for cell in sheet[1]] == ["id", "part_code", "name", "qty_on_hand", "min_stock", "price", "currency"]
+    row = sheet[2]
+    assert (row[1].value, row[1].data_type, row[1].number_format) == ("00123", "s", "@")
+    assert (row[2].value, row[2].data_type) == ("=SUM(A1)", "s")
+    assert (row[3].value, row[3].data_type, row[3].number_format) == (2.5, "n", "0.00")
+    assert row[0].value == 1
+
+
+def test_import_parts_bulk_statistics(client: TestClient, monkeypatch) -> None:
+    from erp.backend.services import warehouse as warehouse_service
+
+    monkeypatch.setattr(warehouse_service, "IMPORT_CHUNK_SIZE", 2)
+    headers = _auth_headers(client)
+    _create_parts(client, headers, 1)
+    csv_content = (
+        "part_code,name,qty_on_hand,min_stock,price,currency\n"
+        "P-000,Existing,1,1,1,USD\n"
+        "B-1,Bulk 1,5,1,2.5,EUR\n"
+        ",Blank,1,1,1,USD\n"
+        "B-2,Bad qty,abc,1,1,USD\n"
+        "B-2,Fixed qty,3,1,1,USD\n"
+        "B-1,Duplicate,1,1,1,USD\n"
+        "B-3,Bulk 3,,,,USD\n"
+    )
+    response = client.post(
+        "/api/v1/warehouse/parts/import",
+        params={"mapping": json.dumps({})},
+        files={"upload": ("parts.csv", io.BytesIO(csv_content.encode("utf-8")), "text/csv")},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json() == {"created": 3, "updated": 0, "unchanged": 0, "skipped": 3, "errors": 1}
+
+    items = client.get("/api/v1/warehouse/parts", params={"q": "B-"}, headers=headers).json()["items"]
+    by_code = {item["part_code"]: item for item in items}
+    assert sorted(by_code) == ["B-1", "B-2", "B-3"]
+    assert by_code["B-2"]["name"] == "Fixed qty"
+    assert by_code["B-1"]["currency"] == "EUR"
+
+    audit = client.get(f"/api/v1/warehouse/parts/{by_code['B-3']['id']}/audit", headers=headers).json()["items"]
+    assert [entry["action"] for entry in audit] == ["import"]
+
+
+def test_import_parts_upsert(client: TestClient) -> None:
+    headers = _auth_headers(client)
+    _create_parts(client, headers, 3)
+    client.delete("/api/v1/warehouse/parts/3", headers=headers)
+    csv_content = (
+        "part_code,name,description,qty_on_hand,min_stock,price,currency\n"
+        "P-000,Part 0,,0,0,0,USD\n"
+        "P-001,Renamed,,7,0,4.5,USD\n"
+        "P-002,Deleted,,1,0,0,USD\n"
+        "N-1,New part,,2,1,1,EUR\n"
+        "P-001,Duplicate,,9,0,0,USD\n"
+    )
+    before = client.get("/api/v1/warehouse/parts/2", headers=headers).headers["etag"]
+
+    response = client.post(
+        "/api/v1/warehouse/parts/import",
+        params={"mapping": json.dumps({}), "mode": "upsert"},
+        files={"upload": ("parts.csv", io.BytesIO(csv_content.encode("utf-8")), "text/csv")},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json() == {"created": 1, "updated": 1, "unchanged": 1, "skipped": 2, "errors": 0}
+
+    renamed = client.get("/api/v1/warehouse/parts/2", headers=headers)
+    assert renamed.json()["name"] == "Renamed"
+    assert float(renamed.json()["qty_on_hand"]) == 7
+    assert renamed.headers["etag"] != before
+    assert client.get("/api/v1/warehouse/parts", params={"q": "Renamed"}, headers=headers).json()["total"] == 1
+    audit = client.get("/api/v1/warehouse/parts/1/audit", headers=headers).json()["items"]
+    actions = [entry["action"] for entry in audit]
+    assert "import_update" not in actions
+
+
+def test_import_parts_upsert_skips_unchanged_rows(client: TestClient) -> None:
+    headers = _auth_headers(client)
+    client.post(
+        "/api/v1/warehouse/parts",
+        json={"part_code": "U-1", "name": "Bearing", "qty_on_hand": 3, "price": 1.25},
+        headers=headers,
+    )
+    before = client.get("/api/v1/warehouse/parts/1", headers=headers).headers["etag"]
+    files = (
+        "part_code,name,description,qty_on_hand,min_stock,price,currency\nU-1,Bearing,,3,0,1.25,USD\n",
+        "part_code,name,qty_on_hand,min_stock,price,currency\nU-1,Bearing,3.000,0,1.2500,USD\n",
+    )
+    for csv_content in files:
+        response = client.post(
+            "/api/v1/warehouse/parts/import",
+            params={"mapping": json.dumps({}), "mode": "upsert"},
+            files={"upload": ("parts.csv", io.BytesIO(csv_content.encode("utf-8")), "text/csv")},
+            headers=headers,
+        )
+        assert response.json() == {"created": 0, "updated": 0, "unchanged": 1, "skipped": 0, "errors": 0}
+
+    assert client.get("/api/v1/warehouse/parts/1", headers=headers).headers["etag"] == before
+    audit = client.get("/api/v1/warehouse/parts/1/audit", headers=headers).json()["items"]
+    assert "import_update" not in [entry["action"] for entry in audit]
+
+
+def test_import_parts_dry_run_reports_row_errors(client: TestClient) -> None:
+    headers = _auth_headers(client)
+    _create_parts(client, headers, 1)
+    csv_content = (
+        "part_code,name,qty_on_hand,min_stock,price,currency\n"
+        "P-000,Existing,1,1,1,USD\n"
+        "D-1,Valid,5,1,2.5,EUR\n"
+        ",Blank,1,1,1,USD\n"
+        "D-2,Bad,abc,1,x,EURO\n"
+        "D-1,Duplicate,1,1,1,USD\n"
+    )
+
+    def dry_run(mode: str) -> dict:
+        response = client.post(
+            "/api/v1/warehouse/parts/import",
+            params={"mapping": json.dumps({}), "dry_run": "true", "mode": mode},
+            files={"upload": ("parts.csv", io.BytesIO(csv_content.encode("utf-8")), "text/csv")},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    report = dry_run("add")
+    assert (report["rows"], report["valid"], report["invalid"], report["skipped"]) == (5, 1, 1, 3)
+    assert [entry["row"] for entry in report["errors"]] == [5]
+    assert report["errors"][0]["errors"] == [
+        "qty_on_hand is not a valid number: 'abc'",
+        "price is not a valid number: 'x'",
+        "currency must be a 3-letter code: 'EURO'",
+    ]
+    skipped = {entry["row"]: entry["errors"] for entry in report["skipped_rows"]}
+    assert skipped == {
+        2: ["part_code already exists"],
+        4: ["part_code is required"],
+        6: ["part_code repeats an earlier row"],
+    }
+
+    preview = dry_run("upsert")
+    assert client.get("/api/v1/warehouse/parts", headers=headers).json()["total"] == 1
+    result = client.post(
+        "/api/v1/warehouse/parts/import",
+        params={"mapping": json.dumps({}), "mode": "upsert"},
+        files={"upload": ("parts.csv", io.BytesIO(csv_content.encode("utf-8")), "text/csv")},
+        headers=headers,
+    ).json()
+    assert result == {
+        "created": preview["created"],
+        "updated": preview["updated"],
+        "unchanged": preview["unchanged"],
+        "skipped": preview["skipped"],
+        "errors": preview["invalid"],
+    }
+    assert (result["created"], result["updated"], result["skipped"], result["errors"]) == (1, 1, 2, 1)
+
+
+def test_import_parts_rejects_long_currency_codes(client: TestClient) -> None:
+    headers = _auth_headers(client)
+    csv_content = "part_code,name,currency\nC-1,Euro part,EURO\nC-2,Dollar part,\n"
+
+    def upload(**params) -> dict:
+        response = client.post(
+            "/api/v1/warehouse/parts/import",
+            params={"mapping": json.dumps({}), **params},
+            files={"upload": ("parts.csv", io.BytesIO(csv_content.encode("utf-8")), "text/csv")},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    report = upload(dry_run="true")
+    assert (report["valid"], report["invalid"]) == (1, 1)
+    assert report["errors"] == [{"row": 2, "part_code": "C-1", "errors": ["currency must be a 3-letter code: 'EURO'"]}]
+
+    assert upload() == {"created": 1, "updated": 0, "unchanged": 0, "skipped": 0, "errors": 1}
+    items = client.get("/api/v1/warehouse/parts", params={"q": "C-"}, headers=headers).json()["items"]
+    assert {item["part_code"]: item["currency"] for item in items} == {"C-2": "USD"}
+
+
+def test_import_parts_xlsx(client: TestClient) -> None:
+    from openpyxl import Workbook
+
+    headers = _auth_headers(client)
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Code", "Name", "Qty"])
+    sheet.append(["X-1", "Excel part", 4])
+    sheet.append(["X-2", "Another part", 1.5])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+
+    response = client.post(
+        "/api/v1/warehouse/parts/import",
+        params={"mapping": json.dumps({"part_code": "Code", "name": "Name", "qty_on_hand": "Qty"})},
+        files={
+            "upload": (
+                "parts.xlsx",
+                buffer,
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json() == {"created": 2, "updated": 0, "unchanged": 0, "skipped": 0, "errors": 0}
+    items = client.get("/api/v1/warehouse/parts", params={"q": "X-"}, headers=headers).json()["items"]
+    assert {item["part_code"]: item["qty_on_hand"] for item in items} == {"X-1": "4.00", "X-2": "1.50"}
+
+
+def test_import_job_progress_and_resume(client: TestClient, db_session, monkeypatch, tmp_path) -> None:
+    from sqlalchemy.orm import sessionmaker
+
+    from erp.backend.services import warehouse as warehouse_service
+    from erp.backend.services.import_jobs import import_job_runner
+
+    monkeypatch.setattr(warehouse_service, "IMPORT_CHUNK_SIZE", 2)
+    monkeypatch.setattr(import_job_runner, "session_factory", sessionmaker(bind=db_session.bind))
+    monkeypatch.setattr(import_job_runner, "storage_dir", str(tmp_path))
+    monkeypatch.setattr(import_job_runner, "submit", import_job_runner.run)
+
+    original_chunk = warehouse_service.WarehouseService._import_chunk
+    calls = {"count": 0}
+
+    def flaky_chunk(self, rows, mapping, stats, mode):
+        calls["count"] += 1
+        if calls["count"] == 2:
+            raise RuntimeError("worker crashed")
+        return original_chunk(self, rows, mapping, stats, mode)
+
+    monkeypatch.setattr(warehouse_service.WarehouseService, "_import_chunk", flaky_chunk)
+
+    headers = _auth_headers(client)
+    csv_content = "part_code,name\n" + "".join(f"J-{index},Job part {index}\n" for index in range(5))
+    response = client.post(
+        "/api/v1/warehouse/parts/import/jobs",
+        params={"mapping": json.dumps({})},
+        files={"upload": ("parts.csv", io.BytesIO(csv_content.encode("utf-8")), "text/csv")},
+        headers=headers,
+    )
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+
+    failed = client.get(f"/api/v1/warehouse/parts/import/{job_id}", headers=headers).json()
+    assert failed["status"] == "Failed"
+    assert failed["rows_done"] == 2
+    assert failed["created"] == 2
+    assert failed["error_message"] == "worker crashed"
+
+    resumed = client.post(f"/api/v1/warehouse/parts/import/{job_id}/resume", headers=headers)
+    assert resumed.status_code == 202
+
+    done = client.get(f"/api/v1/warehouse/parts/import/{job_id}", headers=headers).json()
+    assert done["status"] == "Completed"
+    assert (done["rows_done"], done["created"], done["skipped"], done["errors"]) == (5, 5, 0, 0)
+    assert done["rows_per_second"] is not None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_resume_interrupted_skips_jobs_with_a_live_heartbeat(db_session, monkeypatch) -> None:
+    from datetime import datetime, timedelta
+
+    from sqlalchemy.orm import sessionmaker
+
+    from erp.backend.models.warehouse import ImportJob, ImportJobStatus
+    from erp.backend.services.import_jobs import ImportJobRunner
+
+    now = datetime.utcnow()
+    jobs = {
+        "queued": ImportJob(filename="a.csv", file_path="a.csv", status=ImportJobStatus.QUEUED),
+        "live": ImportJob(
+            filename="b.csv",
+            file_path="b.csv",
+            status=ImportJobStatus.RUNNING,
+            claimed_by="other-worker",
+            heartbeat_at=now - timedelta(seconds=10),
+        ),
+        "stale": ImportJob(
+            filename="c.csv",
+            file_path="c.csv",
+            status=ImportJobStatus.RUNNING,
+            claimed_by="crashed-worker",
+            heartbeat_at=now - timedelta(minutes=10),
+        ),
+    }
+    db_session.add_all(jobs.values())
+    db_session.commit()
+
+    runner = ImportJobRunner(sessionmaker(bind=db_session.bind), stale_seconds=60)
+    submitted: list[int] = []
+    monkeypatch.setattr(runner, "submit", submitted.append)
+    assert runner.resume_interrupted() == 2
+    assert sorted(submitted) == sorted([jobs["queued"].id, jobs["stale"].id])
+
+    db_session.expire_all()
+    assert (jobs["live"].status, jobs["live"].claimed_by) == (ImportJobStatus.RUNNING, "other-worker")
+    assert (jobs["stale"].status, jobs["stale"].claimed_by) == (ImportJobStatus.QUEUED, None)
+    # Requeued jobs get a fresh heartbeat, so the next sweep leaves them alone.
+    assert runner.resume_interrupted() == 0
+
+
+def test_resume_endpoint_accepts_stalled_jobs(client: TestClient, db_session, monkeypatch) -> None:
+    from datetime import datetime, timedelta
+
+    from erp.backend.models.warehouse import ImportJob, ImportJobStatus
+    from erp.backend.services.import_jobs import import_job_runner
+
+    monkeypatch.setattr(import_job_runner, "submit", lambda job_id: None)
+    now = datetime.utcnow()
+    live = ImportJob(
+        filename="a.csv", file_path="a.csv", status=ImportJobStatus.RUNNING, claimed_by="w", heartbeat_at=now
+    )
+    stalled = ImportJob(
+        filename="b.csv",
+        file_path="b.csv",
+        status=ImportJobStatus.RUNNING,
+        claimed_by="w",
+        heartbeat_at=now - timedelta(hours=1),
+    )
+    db_session.add_all([live, stalled])
+    db_session.commit()
+
+    headers = _auth_headers(client)
+    assert client.post(f"/api/v1/warehouse/parts/import/{live.id}/resume", headers=headers).status_code == 400
+    resumed = client.post(f"/api/v1/warehouse/parts/import/{stalled.id}/resume", headers=headers)
+    assert resumed.status_code == 202
+    assert resumed.json()["status"] == "Queued"
+
+
+def test_part_search_index_stays_in_sync(client: TestClient) -> None:
+    headers = _auth_headers(client)
+    for code, name in [("BRG-6204", "Deep groove bearing"), ("BLT-M8", "Hex bolt M8"), ("BRG-6205", "Bearing 6205")]:
+        response = client.post(
+            "/api/v1/warehouse/parts", json={"part_code": code, "name": name}, headers=headers
+        )
+        assert response.status_code == 200
+
+    def search(q: str, **params) -> list[str]:
+        response = client.get("/api/v1/warehouse/parts", params={"q": q, **params}, headers=headers)
+        assert response.status_code == 200
+        return [item["part_code"] for item in response.json()["items"]]
+
+    assert search("bearing") == ["BRG-6205", "BRG-6204"]
+    assert search("6205", sort_field="relevance") == ["BRG-6205"]
+    assert search("M8") == ["BLT-M8"]
+
+    bolt_id = client.get("/api/v1/warehouse/parts", params={"q": "BLT"}, headers=headers).json()["items"][0]["id"]
+    client.put(f"/api/v1/warehouse/parts/{bolt_id}", json={"name": "Hex bearing bolt"}, headers=headers)
+    assert search("bearing") == ["BRG-6205", "BRG-6204", "BLT-M8"]
+
+    client.delete(f"/api/v1/warehouse/parts/{bolt_id}", headers=headers)
+    assert search("bolt") == []
+
+    csv_content = "part_code,name\nBRG-7000,Imported bearing\n"
+    client.post(
+        "/api/v1/warehouse/parts/import",
+        params={"mapping": json.dumps({})},
+        files={"upload": ("parts.csv", io.BytesIO(csv_content.encode("utf-8")), "text/csv")},
+        headers=headers,
+    )
+    assert "BRG-7000" in search("imported")
+
+
+def test_suggest_parts_tracks_writes(client: TestClient, db_session) -> None:
+    from sqlalchemy import update
+    from sqlalchemy.orm import sessionmaker
+
+    from erp.backend.models.warehouse import Part
+    from erp.backend.services.suggestion_jobs import SuggestionRefresher
+
+    headers = _auth_headers(client)
+    _create_parts(client, headers, 3)
+
+    def suggest(prefix: str) -> list[str]:
+        response = client.get("/api/v1/warehouse/parts/suggest", params={"prefix": prefix}, headers=headers)
+        assert response.status_code == 200
+        return [item["part_code"] for item in response.json()]
+
+    assert suggest("p-00") == ["P-000", "P-001", "P-002"]
+    assert suggest("part 1") == ["P-001"]
+
+    client.post("/api/v1/warehouse/parts", json={"part_code": "P-010", "name": "Gear"}, headers=headers)
+    part_id = client.get("/api/v1/warehouse/parts", params={"q": "P-001"}, headers=headers).json()["items"][0]["id"]
+    client.delete(f"/api/v1/warehouse/parts/{part_id}", headers=headers)
+    assert suggest("p-0") == ["P-000", "P-002", "P-010"]
+    assert suggest("ge") == ["P-010"]
+
+    # A rejected create must not leak into the index.
+    duplicate = client.post("/api/v1/warehouse/parts", json={"part_code": "P-010", "name": "Gearbox"}, headers=headers)
+    assert duplicate.status_code == 400
+    assert suggest("gearbox") == []
+
+    # Writes made by another process only reach this index with the rebuild.
+    db_session.execute(update(Part).where(Part.part_code == "P-010").values(is_deleted=True))
+    db_session.commit()
+    assert suggest("ge") == ["P-010"]
+    assert SuggestionRefresher(sessionmaker(bind=db_session.bind), interval_seconds=0).run_once() == 2
+    assert suggest("ge") == []
+
+
+def test_low_stock_feed_follows_writes(client: TestClient) -> None:
+    headers = _auth_headers(client)
+    for code, qty, minimum in [("L-1", 1, 5), ("L-2", 10, 5), ("L-3", 5, 5)]:
+        client.post(
+            "/api/v1/warehouse/parts",
+            json={"part_code": code, "name": code, "qty_on_hand": qty, "min_stock": minimum},
+            headers=headers,
+        )
+
+    def feed() -> dict:
+        response = client.get("/api/v1/warehouse/parts/low-stock", headers=headers)
+        assert response.status_code == 200
+        return response.json()
+
+    payload = feed()
+    assert payload["total"] == 2
+    assert [item["part_code"] for item in payload["items"]] == ["L-1", "L-3"]
+
+    restocked_id = payload["items"][0]["id"]
+    client.put(f"/api/v1/warehouse/parts/{restocked_id}", json={"qty_on_hand": 50}, headers=headers)
+    csv_content = "part_code,qty_on_hand,min_stock\nL-4,0,1\n"
+    client.post(
+        "/api/v1/warehouse/parts/import",
+        params={"mapping": json.dumps({})},
+        files={"upload": ("parts.csv", io.BytesIO(csv_content.encode("utf-8")), "text/csv")},
+        headers=headers,
+    )
+
+    payload = feed()
+    assert payload["total"] == 2
+    assert [item["part_code"] for item in payload["items"]] == ["L-3", "L-4"]
+    filtered = client.get("/api/v1/warehouse/parts", params={"low_stock": True}, headers=headers).json()
+    assert filtered["total"] == 2
+
+
+def test_part_facets_counts_and_cache_invalidation(client: TestClient, db_session) -> None:
+    from erp.backend.models.warehouse import Category, Location
+
+    db_session.add_all([Category(name="Bearings"), Category(name="Belts"), Location(name="Aisle 1")])
+    db_session.commit()
+    bearings, belts = db_session.query(Category).order_by(Category.name).all()
+    aisle = db_session.query(Location).one()
+
+    headers = _auth_headers(client)
+    for code, category_id in [("F-1", bearings.id), ("F-2", bearings.id), ("F-3", belts.id), ("F-4", None)]:
+        client.post(
+            "/api/v1/warehouse/parts",
+            json={"part_code": code, "name": code, "category_id": category_id, "location_id": aisle.id},
+            headers=headers,
+        )
+
+    facets = client.get("/api/v1/warehouse/parts/facets", headers=headers).json()
+    assert [(bucket["name"], bucket["count"]) for bucket in facets["category"]] == [
+        ("Bearings", 2),
+        (None, 1),
+        ("Belts", 1),
+    ]
+    assert facets["location"] == [{"id": aisle.id, "name": "Aisle 1", "count": 4}]
+    assert facets["vendor"] == [{"id": None, "name": None, "count": 4}]
+
+    filtered = client.get("/api/v1/warehouse/parts/facets", params={"category_id": bearings.id}, headers=headers).json()
+    assert filtered["location"] == [{"id": aisle.id, "name": "Aisle 1", "count": 2}]
+
+    client.post("/api/v1/warehouse/parts", json={"part_code": "F-5", "name": "F-5", "category_id": belts.id}, headers=headers)
+    refreshed = client.get("/api/v1/warehouse/parts/facets", headers=headers).json()
+    assert {bucket["name"]: bucket["count"] for bucket in refreshed["category"]}["Belts"] == 2
+
+
+def test_conditional_get_for_parts(client: TestClient) -> None:
+    headers = _auth_headers(client)
+    _create_parts(client, headers, 2)
+
+    listing = client.get("/api/v1/warehouse/parts", headers=headers)
+    list_etag = listing.headers["etag"]
+    assert list_etag.startswith('W/"')
+    unchanged = client.get("/api/v1/warehouse/parts", headers={**headers, "If-None-Match": list_etag})
+    assert unchanged.status_code == 304
+    other_page = client.get(
+        "/api/v1/warehouse/parts", params={"page_size": 1}, headers={**headers, "If-None-Match": list_etag}
+    )
+    assert other_page.status_code == 200
+
+    part_id = listing.json()["items"][0]["id"]
+    detail = client.get(f"/api/v1/warehouse/parts/{part_id}", headers=headers)
+    detail_etag = detail.headers["etag"]
+    assert client.get(
+        f"/api/v1/warehouse/parts/{part_id}", headers={**headers, "If-None-Match": detail_etag}
+    ).status_code == 304
+
+    client.put(f"/api/v1/warehouse/parts/{part_id}", json={"price": 12}, headers=headers)
+    changed = client.get(f"/api/v1/warehouse/parts/{part_id}", headers={**headers, "If-None-Match": detail_etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != detail_etag
+    assert client.get("/api/v1/warehouse/parts", headers={**headers, "If-None-Match": list_etag}).status_code == 200
+
+
+def test_part_update_over_concurrent_write_bumps_version(client: TestClient, db_session) -> None:
+    from sqlalchemy.orm import sessionmaker
+
+    from erp.backend.models.warehouse import Part
+    from erp.backend.schemas.warehouse import PartUpdate
+    from erp.backend.services.warehouse import WarehouseService
+
+    headers = _auth_headers(client)
+    _create_parts(client, headers, 1)
+    stale_session = sessionmaker(bind=db_session.bind)()
+    try:
+        service = WarehouseService(stale_session)
+        part = service.get_part(1)
+        assert part.version == 1
+        # Another request writes the part after this one has loaded it.
+        assert client.put("/api/v1/warehouse/parts/1", json={"price": 5}, headers=headers).status_code == 200
+        service.update_part(1, PartUpdate(name="Renamed"), None)
+        stale_session.commit()
+    finally:
+        stale_session.close()
+
+    db_session.expire_all()
+    part = db_session.get(Part, 1)
+    assert (part.name, float(part.price), part.version) == ("Renamed", 5.0, 3)
+
+
+def test_stock_adjustments_apply_atomically(client: TestClient, db_session) -> None:
+    from decimal import Decimal
+
+    from erp.backend.models.warehouse import Part, StockMovement
+
+    headers = _auth_headers(client)
+    _create_parts(client, headers, 3)
+    detail_etag = client.get("/api/v1/warehouse/parts/1", headers=headers).headers["etag"]
+
+    response = client.post(
+        "/api/v1/warehouse/parts/stock-adjustments",
+        json={
+            "lines": [
+                {"part_code": "P-000", "delta": "5", "reason": "receipt"},
+                {"part_code": "P-002", "delta": "-1.5", "reason": "issue"},
+                {"part_code": "P-000", "delta": "-2"},
+            ]
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json() == {"lines": 3, "parts": 2}
+    quantities = {
+        item["part_code"]: Decimal(str(item["qty_on_hand"]))
+        for item in client.get("/api/v1/warehouse/parts", headers=headers).json()["items"]
+    }
+    assert quantities == {"P-000": Decimal("3"), "P-001": Decimal("1"), "P-002": Decimal("0.5")}
+    assert db_session.query(StockMovement).count() == 3
+    assert client.get("/api/v1/warehouse/parts/1", headers=headers).headers["etag"] != detail_etag
+
+    unknown = client.post(
+        "/api/v1/warehouse/parts/stock-adjustments",
+        json={"lines": [{"part_code": "P-001", "delta": "1"}, {"part_code": "NOPE", "delta": "1"}]},
+        headers=headers,
+    )
+    assert unknown.status_code == 400
+    assert "NOPE" in unknown.json()["detail"]
+
+    oversold = client.post(
+        "/api/v1/warehouse/parts/stock-adjustments",
+        json={"lines": [{"part_code": "P-001", "delta": "1"}, {"part_code": "P-002", "delta": "-1"}]},
+        headers=headers,
+    )
+    assert oversold.status_code == 400
+    assert "P-002" in oversold.json()["detail"]
+    db_session.expire_all()
+    assert db_session.query(StockMovement).count() == 3
+    assert db_session.query(Part).filter_by(part_code="P-001").one().qty_on_hand == Decimal("1")
+
+    # A receipt is accepted for a part that is already below zero.
+    db_session.query(Part).filter_by(part_code="P-002").update({"qty_on_hand": Decimal("-4")})
+    db_session.commit()
+    receipt = client.post(
+        "/api/v1/warehouse/parts/stock-adjustments",
+        json={"lines": [{"part_code": "P-002", "delta": "1"}]},
+        headers=headers,
+    )
+    assert receipt.status_code == 200
+    db_session.expire_all()
+    assert db_session.query(Part).filter_by(part_code="P-002").one().qty_on_hand == Decimal("-3")
+
+
+def test_bulk_update_parts_by_ids_and_filter(client: TestClient) -> None:
+    headers = _auth_headers(client)
+    _create_parts(client, headers, 4)
+
+    by_ids = client.request(
+        "PATCH",
+        "/api/v1/warehouse/parts",
+        json={"ids": [1, 2, 999], "changes": {"price": "9.50", "min_stock": 3}},
+        headers=headers,
+    )
+    assert by_ids.status_code == 200
+    assert by_ids.json() == {"updated": 2}
+    parts = {item["id"]: item for item in client.get("/api/v1/warehouse/parts", headers=headers).json()["items"]}
+    assert [float(parts[part_id]["price"]) for part_id in (1, 2, 3)] == [9.5, 9.5, 0.0]
+    audit = client.get("/api/v1/warehouse/parts/2/audit", headers=headers).json()["items"]
+    assert {entry["action"]: entry["changes"] for entry in audit}["bulk_update"] == {"price": "9.50", "min_stock": "3"}
+
+    by_filter = client.request(
+        "PATCH",
+        "/api/v1/warehouse/parts",
+        json={"filter": {"q": "Part 0"}, "changes": {"currency": "EUR"}},
+        headers=headers,
+    )
+    assert by_filter.json() == {"updated": 2}
+    currencies = {
+        item["part_code"]: item["currency"]
+        for item in client.get("/api/v1/warehouse/parts", headers=headers).json()["items"]
+    }
+    assert currencies == {"P-000": "EUR", "P-001": "USD", "P-002": "USD", "P-003": "EUR"}
+
+    ambiguous = client.request("PATCH", "/api/v1/warehouse/parts", json={"changes": {"price": 1}}, headers=headers)
+    assert ambiguous.status_code == 400
+
+    for field in ("price", "min_stock", "currency"):
+        null_change = client.request(
+            "PATCH", "/api/v1/warehouse/parts", json={"ids": [1], "changes": {field: None}}, headers=headers
+        )
+        assert null_change.status_code == 422
+
+
+def test_part_detail_and_lookup_caches(client: TestClient, db_session) -> None:
+    from erp.backend.models.warehouse import Category, Location, Vendor
+
+    headers = _auth_headers(client)
+    db_session.add_all([Category(name="Seals"), Category(name="Bearings"), Location(name="Aisle 1"), Vendor(name="SKF")])
+    db_session.commit()
+    _create_parts(client, headers, 1)
+    before = client.get("/api/v1/warehouse/cache/stats", headers=headers).json()
+
+    first = client.get("/api/v1/warehouse/parts/1", headers=headers).json()
+    assert client.get("/api/v1/warehouse/parts/1", headers=headers).json() == first
+    client.put("/api/v1/warehouse/parts/1", json={"price": 12}, headers=headers)
+    assert float(client.get("/api/v1/warehouse/parts/1", headers=headers).json()["price"]) == 12
+    client.post(
+        "/api/v1/warehouse/parts/stock-adjustments", json={"lines": [{"part_code": "P-000", "delta": 5}]}, headers=headers
+    )
+    assert float(client.get("/api/v1/warehouse/parts/1", headers=headers).json()["qty_on_hand"]) == 5
+
+    categories = client.get("/api/v1/warehouse/categories", headers=headers).json()
+    assert [item["name"] for item in categories] == ["Bearings", "Seals"]
+    assert client.get("/api/v1/warehouse/categories", headers=headers).json() == categories
+    assert client.get("/api/v1/warehouse/locations", headers=headers).json()[0]["name"] == "Aisle 1"
+    assert client.get("/api/v1/warehouse/vendors", headers=headers).json()[0]["name"] == "SKF"
+
+    stats = client.get("/api/v1/warehouse/cache/stats", headers=headers).json()
+    for name, hits, misses in (("part_detail", 1, 3), ("lookups", 1, 3)):
+        assert stats[name]["hits"] - before[name]["hits"] == hits
+        assert stats[name]["misses"] - before[name]["misses"] == misses
+    assert stats["part_detail"]["size"] == 1
+    assert stats["lookups"]["size"] == 3
+
+
+def test_part_audit_keyset_pages_and_field_filter(client: TestClient) -> None:
+    headers = _auth_headers(client)
+    _create_parts(client, headers, 1)
+    for price in range(1, 6):
+        client.put("/api/v1/warehouse/parts/1", json={"price": price}, headers=headers)
+    client.put("/api/v1/warehouse/parts/1", json={"name": "Renamed"}, headers=headers)
+
+    seen, cursor = [], None
+    while True:
+        params = {"page_size": 3, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/v1/warehouse/parts/1/audit", params=params, headers=headers).json()
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert [entry["action"] for entry in seen] == ["update"] * 6 + ["create"]
+    assert seen[0]["changes"] == {"name": "Renamed"}
+    assert len({entry["id"] for entry in seen}) == 7
+
+    priced = client.get("/api/v1/warehouse/parts/1/audit", params={"field": "price", "action": "update"}, headers=headers)
+    assert [entry["changes"]["price"] for entry in priced.json()["items"]] == ["5", "4", "3", "2", "1"]
+    bad = client.get("/api/v1/warehouse/parts/1/audit", params={"cursor": "nope"}, headers=headers)
+    assert bad.status_code == 400
+
+
+def test_part_changes_delta_sync(client: TestClient) -> None:
+    headers = _auth_headers(client)
+    _create_parts(client, headers, 5)
+
+    def sync(token, limit=1000):
+        params = {"limit": limit, **({"since": token} if token else {})}
+        response = client.get("/api/v1/warehouse/parts/changes", params=params, headers=headers)
+        assert response.status_code == 200
+        return response.json()
+
+    client.delete("/api/v1/warehouse/parts/5", headers=headers)
+    downloaded, token = [], None
+    while True:
+        page = sync(token, limit=2)
+        downloaded.extend(item["id"] for item in page["upserts"])
+        assert page["deleted"] == []
+        token = page["next_token"]
+        if not page["has_more"]:
+            break
+    assert sorted(downloaded) == [1, 2, 3, 4]
+    assert sync(token) == {"upserts": [], "deleted": [], "next_token": token, "has_more": False}
+
+    client.put("/api/v1/warehouse/parts/1", json={"name": "Renamed"}, headers=headers)
+    client.delete("/api/v1/warehouse/parts/2", headers=headers)
+    client.request("PATCH", "/api/v1/warehouse/parts", json={"ids": [3], "changes": {"price": 4}}, headers=headers)
+    client.post(
+        "/api/v1/warehouse/parts/stock-adjustments", json={"lines": [{"part_code": "P-003", "delta": 1}]}, headers=headers
+    )
+    changes = sync(token)
+    assert {item["id"]: item["name"] for item in changes["upserts"]} == {1: "Renamed", 3: "Part 2", 4: "Part 0"}
+    assert changes["deleted"] == [2]
+    assert sync(changes["next_token"])["upserts"] == []
+    assert client.get("/api/v1/warehouse/parts/changes", params={"since": "bad"}, headers=headers).status_code == 400
+
+
+def test_inventory_valuation_rollup_and_reconcile(client: TestClient, db_session) -> None:
+    from sqlalchemy import update
+    from sqlalchemy.orm import sessionmaker
+
+    from erp.backend.core.locks import release_job_lock, try_job_lock
+    from erp.backend.models.warehouse import Category, Part
+    from erp.backend.services.valuation_jobs import ValuationReconciler
+    from erp.backend.services.warehouse import VALUATION_RECONCILE_LOCK, ValuationDeltas
+
+    headers = _auth_headers(client)
+    db_session.add(Category(name="Bearings"))
+    db_session.commit()
+    for code, price, qty in (("V-1", 10, 2), ("V-2", "2.50", 4), ("V-3", 1, 1)):
+        client.post(
+            "/api/v1/warehouse/parts",
+            json={"part_code": code, "name": code, "price": price, "qty_on_hand": qty},
+            headers=headers,
+        )
+    client.put("/api/v1/warehouse/parts/1", json={"category_id": 1}, headers=headers)
+    client.delete("/api/v1/warehouse/parts/3", headers=headers)
+    client.request("PATCH", "/api/v1/warehouse/parts", json={"ids": [2], "changes": {"currency": "EUR"}}, headers=headers)
+    client.post(
+        "/api/v1/warehouse/parts/stock-adjustments", json={"lines": [{"part_code": "V-1", "delta": 3}]}, headers=headers
+    )
+    csv_content = "part_code,name,qty_on_hand,price,currency\nV-4,V-4,5,2,USD\nV-1,V-1,5,12,USD\n"
+    client.post(
+        "/api/v1/warehouse/parts/import",
+        files={"upload": ("parts.csv", csv_content, "text/csv")},
+        params={"mapping": json.dumps({}), "mode": "upsert"},
+        headers=headers,
+    )
+
+    deltas = ValuationDeltas()
+    for category_id, location_id, currency in ((2, 1, "USD"), (1, 2, "USD"), (1, 1, "USD"), (1, 1, "EUR")):
+        deltas.add({"category_id": category_id, "location_id": location_id, "currency": currency, "qty_on_hand": 1})
+    assert [(row["category_id"], row["location_id"], row["currency"]) for row in deltas.rows()] == [
+        (1, 1, "EUR"),
+        (1, 1, "USD"),
+        (1, 2, "USD"),
+        (2, 1, "USD"),
+    ]
+
+    valuation = client.get("/api/v1/warehouse/valuation", headers=headers).json()
+    rows = {(row["category"], row["currency"]): (row["parts"], float(row["value"])) for row in valuation["rows"]}
+    assert rows == {("Bearings", "USD"): (1, 60.0), (None, "EUR"): (1, 10.0), (None, "USD"): (1, 10.0)}
+    assert {total["currency"]: float(total["value"]) for total in valuation["totals"]} == {"USD": 70.0, "EUR": 10.0}
+    assert client.post("/api/v1/warehouse/valuation/reconcile", headers=headers).json() == {"corrected": 0}
+
+    db_session.execute(update(Part).where(Part.id == 4).values(qty_on_hand=6))
+    db_session.commit()
+    reconciler = ValuationReconciler(sessionmaker(bind=db_session.bind), interval_seconds=0)
+    holder = sessionmaker(bind=db_session.bind)()
+    holder.begin()
+    assert try_job_lock(holder, VALUATION_RECONCILE_LOCK)
+    assert reconciler.run_once() is None
+    assert client.post("/api/v1/warehouse/valuation/reconcile", headers=headers).status_code == 409
+    release_job_lock(holder, VALUATION_RECONCILE_LOCK)
+    holder.rollback()
+    holder.close()
+    assert reconciler.run_once() == 1
+    valuation = client.get("/api/v1/warehouse/valuation", headers=headers).json()
+    assert {total["currency"]: float(total["value"]) for total in valuation["totals"]}["USD"] == 72.0
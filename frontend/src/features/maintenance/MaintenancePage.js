@@ -1,7 +1,7 @@
 import { jsx as _jsx, jsxs as _jsxs } from "react/jsx-runtime";
 import { zodResolver } from "@hookform/resolvers/zod";
 import { useMutation, useQuery, useQueryClient } from "@tanstack/react-query";
-import { useEffect } from "react";
+import { useEffect, useState } from "react";
 import { useForm } from "react-hook-form";
 import { z } from "zod";
 import { Button } from "../../components/ui/button";
@@ -40,7 +40,13 @@ export function MaintenancePage() {
     const equipmentQuery = useQuery({ queryKey: ["equipment"], queryFn: () => listEquipment() });
     const templatesQuery = useQuery({ queryKey: ["pmTemplates"], queryFn: () => listPmTemplates() });
     const plansQuery = useQuery({ queryKey: ["pmPlans"], queryFn: () => listPmPlans() });
-    const workOrdersQuery = useQuery({ queryKey: ["workOrders"], queryFn: () => listWorkOrders() });
+    // An empty status shows the default open view (Open and InProgress).
+    const [workOrderStatus, setWorkOrderStatus] = useState("");
+    const [workOrderCursor, setWorkOrderCursor] = useState(undefined);
+    const workOrdersQuery = useQuery({
+        queryKey: ["workOrders", workOrderStatus, workOrderCursor],
+        queryFn: () => listWorkOrders({ status: workOrderStatus || undefined, cursor: workOrderCursor })
+    });
     const historyQuery = useQuery({ queryKey: ["maintenanceHistory"], queryFn: () => listMaintenanceHistory() });
     const canManage = user?.role === "admin" || user?.role === "root";
     const equipmentForm = useForm({
@@ -144,7 +150,7 @@ export function MaintenancePage() {
                                         summary: values.summary || undefined,
                                         due_date: values.due_date || undefined
                                     });
-                                }, submitLabel: createWorkOrderMutation.isPending ? "Saving..." : "Create work order", children: [_jsx(FormField, { label: _jsx(Label, { htmlFor: "wo-equipment", children: "Equipment" }), error: workOrderForm.formState.errors.equipment_id, required: true, children: _jsxs(Select, { id: "wo-equipment", value: String(workOrderForm.watch("equipment_id")), onChange: (event) => workOrderForm.setValue("equipment_id", Number(event.target.value)), children: [_jsx("option", { value: "0", children: "Select" }), equipmentQuery.data?.map((equipment) => (_jsx("option", { value: equipment.id, children: equipment.name }, equipment.id)))] }) }), _jsx(FormField, { label: _jsx(Label, { htmlFor: "wo-type", children: "Type" }), error: workOrderForm.formState.errors.type, required: true, children: _jsxs(Select, { id: "wo-type", value: workOrderForm.watch("type"), onChange: (event) => workOrderForm.setValue("type", event.target.value), children: [_jsx("option", { value: "PM", children: "PM" }), _jsx("option", { value: "CM", children: "CM" })] }) }), _jsx(FormField, { label: _jsx(Label, { htmlFor: "wo-summary", children: "Summary" }), error: workOrderForm.formState.errors.summary, children: _jsx(Input, { id: "wo-summary", ...workOrderForm.register("summary") }) }), _jsx(FormField, { label: _jsx(Label, { htmlFor: "wo-due", children: "Due date" }), error: workOrderForm.formState.errors.due_date, children: _jsx(Input, { id: "wo-due", type: "date", ...workOrderForm.register("due_date") }) })] })), _jsx("div", { className: "space-y-2", children: workOrdersQuery.data?.map((order) => (_jsx(WorkOrderCard, { order: order, onUpdate: (status) => updateWorkOrderMutation.mutate({ id: order.id, status }) }, order.id))) })] })] }), _jsxs(Card, { children: [_jsx(CardHeader, { children: _jsx("h2", { className: "text-xl font-semibold", children: "History" }) }), _jsx(CardContent, { className: "space-y-2", children: historyQuery.isLoading ? (_jsx("div", { children: "Loading..." })) : historyQuery.data && historyQuery.data.length > 0 ? (historyQuery.data.map((record) => (_jsxs("div", { className: "rounded-md border p-3", children: [_jsxs("div", { className: "font-medium", children: ["Work order #", record.work_order_id] }), _jsxs("div", { className: "text-xs text-muted-foreground", children: ["Downtime: ", record.downtime_min] }), _jsxs("div", { className: "text-xs text-muted-foreground", children: ["Recorded: ", record.recorded_at] }), _jsx("div", { className: "mt-2 text-sm", children: record.summary })] }, record.id)))) : (_jsx("div", { className: "text-sm text-muted-foreground", children: "No history available." })) })] })] }));
+                                }, submitLabel: createWorkOrderMutation.isPending ? "Saving..." : "Create work order", children: [_jsx(FormField, { label: _jsx(Label, { htmlFor: "wo-equipment", children: "Equipment" }), error: workOrderForm.formState.errors.equipment_id, required: true, children: _jsxs(Select, { id: "wo-equipment", value: String(workOrderForm.watch("equipment_id")), onChange: (event) => workOrderForm.setValue("equipment_id", Number(event.target.value)), children: [_jsx("option", { value: "0", children: "Select" }), equipmentQuery.data?.map((equipment) => (_jsx("option", { value: equipment.id, children: equipment.name }, equipment.id)))] }) }), _jsx(FormField, { label: _jsx(Label, { htmlFor: "wo-type", children: "Type" }), error: workOrderForm.formState.errors.type, required: true, children: _jsxs(Select, { id: "wo-type", value: workOrderForm.watch("type"), onChange: (event) => workOrderForm.setValue("type", event.target.value), children: [_jsx("option", { value: "PM", children: "PM" }), _jsx("option", { value: "CM", children: "CM" })] }) }), _jsx(FormField, { label: _jsx(Label, { htmlFor: "wo-summary", children: "Summary" }), error: workOrderForm.formState.errors.summary, children: _jsx(Input, { id: "wo-summary", ...workOrderForm.register("summary") }) }), _jsx(FormField, { label: _jsx(Label, { htmlFor: "wo-due", children: "Due date" }), error: workOrderForm.formState.errors.due_date, children: _jsx(Input, { id: "wo-due", type: "date", ...workOrderForm.register("due_date") }) })] })), _jsxs("div", { className: "flex items-center gap-2", children: [_jsxs(Select, { id: "wo-filter", "aria-label": "Work order status", value: workOrderStatus, onChange: (event) => { setWorkOrderStatus(event.target.value); setWorkOrderCursor(undefined); }, children: [_jsx("option", { value: "", children: "Open & in progress" }), _jsx("option", { value: "Open", children: "Open" }), _jsx("option", { value: "InProgress", children: "In progress" }), _jsx("option", { value: "Done", children: "Done" }), _jsx("option", { value: "Canceled", children: "Canceled" })] }), _jsx(Button, { variant: "secondary", disabled: !workOrdersQuery.data?.prev_cursor, onClick: () => setWorkOrderCursor(workOrdersQuery.data?.prev_cursor ?? undefined), children: "Previous" }), _jsx(Button, { variant: "secondary", disabled: !workOrdersQuery.data?.next_cursor, onClick: () => setWorkOrderCursor(workOrdersQuery.data?.next_cursor ?? undefined), children: "Next" })] }), _jsx("div", { className: "space-y-2", children: workOrdersQuery.data?.items.map((order) => (_jsx(WorkOrderCard, { order: order, onUpdate: (status) => updateWorkOrderMutation.mutate({ id: order.id, status }) }, order.id))) })] })] }), _jsxs(Card, { children: [_jsx(CardHeader, { children: _jsx("h2", { className: "text-xl font-semibold", children: "History" }) }), _jsx(CardContent, { className: "space-y-2", children: historyQuery.isLoading ? (_jsx("div", { children: "Loading..." })) : historyQuery.data && historyQuery.data.length > 0 ? (historyQuery.data.map((record) => (_jsxs("div", { className: "rounded-md border p-3", children: [_jsxs("div", { className: "font-medium", children: ["Work order #", record.work_order_id] }), _jsxs("div", { className: "text-xs text-muted-foreground", children: ["Downtime: ", record.downtime_min] }), _jsxs("div", { className: "text-xs text-muted-foreground", children: ["Recorded: ", record.recorded_at] }), _jsx("div", { className: "mt-2 text-sm", children: record.summary })] }, record.id)))) : (_jsx("div", { className: "text-sm text-muted-foreground", children: "No history available." })) })] })] }));
 }
 function WorkOrderCard({ order, onUpdate }) {
     return (_jsxs("div", { className: "flex flex-wrap items-center justify-between gap-2 rounded-md border p-3", children: [_jsxs("div", { children: [_jsx("div", { className: "font-medium", children: order.summary ?? `Work order #${order.id}` }), _jsxs("div", { className: "text-xs text-muted-foreground", children: ["Status: ", order.status] })] }), _jsxs(Select, { value: order.status, onChange: (event) => onUpdate(event.target.value), children: [_jsx("option", { value: "Open", children: "Open" }), _jsx("option", { value: "InProgress", children: "InProgress" }), _jsx("option", { value: "Done", children: "Done" }), _jsx("option", { value: "Canceled", children: "Canceled" })] })] }));
@@ -1,6 +1,6 @@
 import { zodResolver } from "@hookform/resolvers/zod";
 import { useMutation, useQuery, useQueryClient } from "@tanstack/react-query";
-import { useEffect } from "react";
+import { useEffect, useState } from "react";
 import { useForm } from "react-hook-form";
 import { z } from "zod";
 
@@ -68,7 +68,13 @@ export function MaintenancePage(): JSX.Element {
   const equipmentQuery = useQuery({ queryKey: ["equipment"], queryFn: () => listEquipment() });
   const templatesQuery = useQuery({ queryKey: ["pmTemplates"], queryFn: () => listPmTemplates() });
   const plansQuery = useQuery({ queryKey: ["pmPlans"], queryFn: () => listPmPlans() });
-  const workOrdersQuery = useQuery({ queryKey: ["workOrders"], queryFn: () => listWorkOrders() });
+  // An empty status shows the default open view (Open and InProgress).
+  const [workOrderStatus, setWorkOrderStatus] = useState<WorkOrderStatus | "">("");
+  const [workOrderCursor, setWorkOrderCursor] = useState<string | undefined>(undefined);
+  const workOrdersQuery = useQuery({
+    queryKey: ["workOrders", workOrderStatus, workOrderCursor],
+    queryFn: () => listWorkOrders({ status: workOrderStatus || undefined, cursor: workOrderCursor })
+  });
   const historyQuery = useQuery({ queryKey: ["maintenanceHistory"], queryFn: () => listMaintenanceHistory() });
 
   const canManage = user?.role === "admin" || user?.role === "root";
@@ -364,8 +370,39 @@ export function MaintenancePage(): JSX.Element {
               </FormField>
             </Form>
           )}
+          <div className="flex items-center gap-2">
+            <Select
+              id="wo-filter"
+              aria-label="Work order status"
+              value={workOrderStatus}
+              onChange={(event) => {
+                setWorkOrderStatus(event.target.value as WorkOrderStatus | "");
+                setWorkOrderCursor(undefined);
+              }}
+            >
+              <option value="">Open &amp; in progress</option>
+              <option value="Open">Open</option>
+              <option value="InProgress">In progress</option>
+              <option value="Done">Done</option>
+              <option value="Canceled">Canceled</option>
+            </Select>
+            <Button
+              variant="secondary"
+              disabled={!workOrdersQuery.data?.prev_cursor}
+              onClick={() => setWorkOrderCursor(workOrdersQuery.data?.prev_cursor ?? undefined)}
+            >
+              Previous
+            </Button>
+            <Button
+              variant="secondary"
+              disabled={!workOrdersQuery.data?.next_cursor}
+              onClick={() => setWorkOrderCursor(workOrdersQuery.data?.next_cursor ?? undefined)}
+            >
+              Next
+            </Button>
+          </div>
           <div className="space-y-2">
-            {workOrdersQuery.data?.map((order) => (
+            {workOrdersQuery.data?.items.map((order) => (
               <WorkOrderCard key={order.id} order={order} onUpdate={(status) => updateWorkOrderMutation.mutate({ id: order.id, status })} />
             ))}
           </div>
@@ -54,7 +54,9 @@ export function WarehouseDetailPage(): JSX.Element {
               <div key={log.id} className="rounded-md border p-2">
                 <div className="text-sm font-medium">{log.action}</div>
                 <div className="text-xs text-muted-foreground">User: {log.user_id ?? "system"}</div>
-                {log.changes && <pre className="mt-2 whitespace-pre-wrap text-xs">{log.changes}</pre>}
+                {log.changes && (
+                  <pre className="mt-2 whitespace-pre-wrap text-xs">{JSON.stringify(log.changes, null, 2)}</pre>
+                )}
               </div>
             ))
           ) : (
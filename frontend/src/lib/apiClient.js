@@ -73,7 +73,7 @@ export async function exportParts(params) {
 }
 export async function listAuditLogs(partId) {
     const { data } = await apiClient.get(`/warehouse/parts/${partId}/audit`);
-    return data;
+    return data.items;
 }
 export async function listEquipment() {
     const { data } = await apiClient.get("/maintenance/equipment");
@@ -103,8 +103,8 @@ export async function generateDueWorkOrders() {
     const { data } = await apiClient.post("/maintenance/pm/generate-due", {});
     return data;
 }
-export async function listWorkOrders() {
-    const { data } = await apiClient.get("/maintenance/work-orders");
+export async function listWorkOrders(params = {}) {
+    const { data } = await apiClient.get("/maintenance/work-orders", { params });
     return data;
 }
 export async function createWorkOrder(payload) {
@@ -100,7 +100,8 @@ export interface AuditLogEntry {
   entity_id: number;
   action: string;
   user_id: number | null;
-  changes: string | null;
+  changes: Record<string, unknown> | null;
+  created_at: string;
 }
 
 export interface ListPartsParams {
@@ -173,6 +174,19 @@ export interface WorkOrder {
   completed_at: string | null;
 }
 
+export interface WorkOrderPage {
+  items: WorkOrder[];
+  page_size: number;
+  next_cursor: string | null;
+  prev_cursor: string | null;
+}
+
+export interface ListWorkOrdersParams {
+  status?: WorkOrderStatus;
+  cursor?: string;
+  page_size?: number;
+}
+
 export interface WorkOrderPayload {
   equipment_id: number;
   type: WorkOrderType;
@@ -369,8 +383,8 @@ export async function exportParts(params: ListPartsParams): Promise<Blob> {
 }
 
 export async function listAuditLogs(partId: number): Promise<AuditLogEntry[]> {
-  const { data } = await apiClient.get<AuditLogEntry[]>(`/warehouse/parts/${partId}/audit`);
-  return data;
+  const { data } = await apiClient.get<{ items: AuditLogEntry[] }>(`/warehouse/parts/${partId}/audit`);
+  return data.items;
 }
 
 export async function listEquipment(): Promise<Equipment[]> {
@@ -408,8 +422,8 @@ export async function generateDueWorkOrders(): Promise<GenerateDueResponse> {
   return data;
 }
 
-export async function listWorkOrders(): Promise<WorkOrder[]> {
-  const { data } = await apiClient.get<WorkOrder[]>("/maintenance/work-orders");
+export async function listWorkOrders(params: ListWorkOrdersParams = {}): Promise<WorkOrderPage> {
+  const { data } = await apiClient.get<WorkOrderPage>("/maintenance/work-orders", { params });
   return data;
 }
 
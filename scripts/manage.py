@@ -9,9 +9,11 @@ from erp.backend.core.database import (
     session_scope,
 )
 from erp.backend.models.user import User, UserRole
+from erp.backend.repositories.search import get_part_search_backend
 from erp.backend.repositories.user import UserRepository
 from erp.backend.schemas.users import UserCreateRequest, UserResetPasswordRequest, UserUpdateRequest
 from erp.backend.services.users import UserService
+from erp.backend.services.valuation_jobs import valuation_reconciler
 
 
 def get_actor(repo: UserRepository, username: str) -> User:
@@ -32,6 +34,23 @@ def handle_init_db(_: argparse.Namespace) -> None:
     print(f"Created {table_count} tables in {url}.")
 
 
+def handle_rebuild_search_index(_: argparse.Namespace) -> None:
+    """Repopulate the parts text search index from the parts table."""
+
+    with session_scope() as session:
+        indexed = get_part_search_backend(session).rebuild()
+    print(f"Indexed {indexed} parts.")
+
+
+def handle_reconcile_valuation(_: argparse.Namespace) -> None:
+    """Correct drift between the valuation rollup and the parts table."""
+
+    corrected = valuation_reconciler.run_once()
+    if corrected is None:
+        raise SystemExit("Valuation reconcile is already running in another process")
+    print(f"Corrected {corrected} valuation groups.")
+
+
 def handle_create(args: argparse.Namespace) -> None:
     with session_scope() as session:
         repo = UserRepository(session)
@@ -126,6 +145,18 @@ def build_parser() -> argparse.ArgumentParser:
     )
     init_db_parser.set_defaults(func=handle_init_db)
 
+    search_parser = subparsers.add_parser(
+        "rebuild-search-index",
+        help="Rebuild the parts text search index.",
+    )
+    search_parser.set_defaults(func=handle_rebuild_search_index)
+
+    valuation_parser = subparsers.add_parser(
+        "reconcile-valuation",
+        help="Correct drift in the inventory valuation rollup.",
+    )
+    valuation_parser.set_defaults(func=handle_reconcile_valuation)
+
     users_parser = subparsers.add_parser("users", help="User management commands")
     users_parser.add_argument(
         "--actor", default="root", help="Username performing the action (must be root)"